@@ -3,25 +3,228 @@
 import streamlit as st
 
 import json
+import math
 import re
 
-from src.gcs import read_json, write_json
-from src.params import BUCKET, CONFIG_DIR
-DOMAIN_RX = re.compile(r'^[a-z0-9.-]+\.[a-z]{2,}$', re.I)
+from src.config import load_config_versioned, patch_config, publish_domain_matcher
+from src.domains import (
+    StagedDomainList, parse_domain_import, export_domain_lists, domain_rules, split_wildcards,
+    WILDCARD_PREFIX, SUBDOMAIN_KEYS
+)
+from src.jsonpatch import PatchError, make_patch, list_set_patch, pointer
+from src.storage import PreconditionFailed
+
+# Exact domains, or `*.example.com` rules that also cover every subdomain (saved under the
+# SUBDOMAIN_KEYS of the config, never inside the exact lists)
+DOMAIN_RX = re.compile(r'^(\*\.)?[a-z0-9.-]+\.[a-z]{2,}$', re.I)
+DOMAIN_PAGE_SIZE = 25
+
+def _publish_matcher(automation: dict, result):
+    """Publish the compiled domain matcher for a saved config and report list overlaps."""
+    matcher = publish_domain_matcher(automation, result.generation)
+    if matcher.overlaps:
+        st.warning(
+            '⚠️ Domains present in both lists (draft takes precedence): '
+            + ', '.join(f"`{x['domain']}`" for x in matcher.overlaps)
+        )
+
+def _domain_list_editor(key: str, title: str, placeholder: str):
+    """Paginated, filterable editor for one domain list; changes are staged until Save."""
+    domains = st.session_state[f'{key}list']
+
+    st.markdown(f'#### {title}')
+    left, right = st.columns([0.48, 0.52])
+
+    with left:
+        c1, c2 = st.columns([0.7, 0.3])
+        new_domain = c1.text_input(
+            f'add_{key}_domain', placeholder=placeholder, label_visibility='collapsed'
+        )
+        if c2.button('Add', key=f'{key}_add'):
+            d = (new_domain or '').strip().lower()
+            if d:
+                if not DOMAIN_RX.match(d):
+                    st.error('Invalid domain format')
+                elif not domains.add(d):
+                    st.warning(f'`{d}` ya está en la lista')
+
+        st.caption(f'Usa `{WILDCARD_PREFIX}{placeholder}` para incluir también sus subdominios.')
+
+        query = st.text_input(
+            f'filter_{key}_domain', placeholder='Filtrar dominios...',
+            label_visibility='collapsed'
+        )
+        if domains.pending:
+            st.caption(f'➕ {len(domains.added)} · ➖ {len(domains.removed)} pendientes')
+
+    with right:
+        matches = domains.search(query)
+        pages = max(1, math.ceil(len(matches) / DOMAIN_PAGE_SIZE))
+        page = st.number_input(
+            f'Página (de {pages}) · {len(matches)} de {len(domains)} dominios',
+            min_value=1, max_value=pages, value=1, key=f'{key}_page'
+        )
+        visible = matches[(page - 1) * DOMAIN_PAGE_SIZE:page * DOMAIN_PAGE_SIZE]
+
+        edited = st.data_editor(
+            [
+                {
+                    'domain': d,
+                    'match': 'subdominios' if d.startswith(WILDCARD_PREFIX) else 'exacto',
+                    'new': d in domains.added,
+                    'delete': False,
+                }
+                for d in visible
+            ],
+            column_config={
+                'domain': st.column_config.TextColumn('Domain', disabled=True),
+                'match': st.column_config.TextColumn('Alcance', disabled=True, width='small'),
+                'new': st.column_config.CheckboxColumn('Nuevo', disabled=True, width='small'),
+                'delete': st.column_config.CheckboxColumn('🗑️', width='small'),
+            },
+            hide_index=True,
+            use_container_width=True,
+            key=f'{key}_page_editor_{domains.version}_{page}_{query}'
+        )
+        selected = [row['domain'] for row in edited if row['delete']]
+        if st.button(f'Eliminar seleccionados ({len(selected)})', key=f'{key}_delete',
+                     disabled=not selected):
+            for d in selected:
+                domains.remove(d)
+            st.rerun()
+
+def _apply_config_patch(ops) -> bool:
+    """Patch the admin config against the generation held in session and refresh the state."""
+    base = (st.session_state.automation_cfg, st.session_state.automation_cfg_generation)
+    try:
+        cfg, result = patch_config(ops, base=base)
+    except PatchError as e:
+        st.error(
+            f'❌ La configuración cambió mientras editabas ({e}). Recarga e intenta de nuevo.'
+        )
+        return False
+    except PreconditionFailed:
+        st.error('❌ Demasiadas ediciones simultáneas, intenta de nuevo.')
+        return False
+
+    st.session_state.automation_cfg = cfg
+    st.session_state.automation_cfg_generation = result.generation
+    auto = cfg.get('automation', dict())
+    st.session_state.automationlist.reset(domain_rules(auto, 'automationlist'))
+    st.session_state.draftlist.reset(domain_rules(auto, 'draftlist'))
+    _publish_matcher(auto, result)
+    return True
+
+def _save_lists() -> bool:
+    """Save the staged list changes as one JSON Patch and publish the matcher.
+
+    `*.` rules go to the subdomain key of their list without the prefix; removals are also
+    applied to the exact list so older `*.` entries stored there can be deleted.
+    """
+    changes = list()
+    for key in ('automationlist', 'draftlist'):
+        domains = st.session_state[key]
+        added, added_suffixes = split_wildcards(domains.added)
+        _, removed_suffixes = split_wildcards(domains.removed)
+        changes.append((key, added, domains.removed))
+        if added_suffixes or removed_suffixes:
+            changes.append((SUBDOMAIN_KEYS[key], added_suffixes, removed_suffixes))
+
+    def ops(doc: dict) -> list[dict]:
+        auto = doc.get('automation')
+        patch = list()
+        if not isinstance(auto, dict):
+            auto = dict()
+            patch.append({'op': 'add', 'path': pointer('automation'), 'value': auto})
+        for key, added, removed in changes:
+            current = auto.get(key, list())
+            if key not in auto:
+                patch.append({'op': 'add', 'path': pointer('automation', key), 'value': list()})
+            patch.extend(list_set_patch(pointer('automation', key), current, added, removed))
+        return patch
+
+    return _apply_config_patch(ops)
+
+def _domain_import_export():
+    """Bulk import from pasted text or a CSV/TXT upload, and CSV export of both lists."""
+    automationlist = st.session_state.automationlist
+    draftlist = st.session_state.draftlist
+
+    with st.expander('📥 Importar / exportar dominios'):
+        target = st.radio(
+            'Lista destino:', ['automation', 'draft'], horizontal=True, key='import_target'
+        )
+        pasted = st.text_area(
+            'Pegar dominios', height=120, key='import_text',
+            placeholder='uno por línea, o separados por comas / espacios (*.dominio.com '
+                        'para incluir subdominios)'
+        )
+        uploaded = st.file_uploader('o subir CSV/TXT', type=['csv', 'txt'], key='import_file')
+
+        text = pasted or ''
+        if uploaded is not None:
+            text += '\n' + uploaded.getvalue().decode('utf-8-sig', errors='replace')
+
+        if text.strip():
+            if target == 'automation':
+                into, other = automationlist, draftlist
+            else:
+                into, other = draftlist, automationlist
+            plan = parse_domain_import(text, DOMAIN_RX, into, other, target_name=target)
+
+            c1, c2, c3, c4 = st.columns(4)
+            c1.metric('Nuevos', len(plan['added']))
+            c2.metric('Movidos', len(plan['moved']))
+            c3.metric('Omitidos', len(plan['skipped']))
+            c4.metric('Inválidos', len(plan['invalid']))
+            for label, key in (
+                ('Nuevos', 'added'), ('Movidos desde la otra lista', 'moved'),
+                ('Omitidos (ya presentes, repetidos o de la otra lista)', 'skipped'),
+                ('Inválidos', 'invalid')
+            ):
+                if plan[key]:
+                    st.caption(f'{label}: ' + ', '.join(f'`{d}`' for d in plan[key][:50])
+                               + (' …' if len(plan[key]) > 50 else ''))
+
+            if automationlist.pending or draftlist.pending:
+                st.caption(
+                    'Los cambios pendientes de las listas se guardan junto con la importación.'
+                )
+            if st.button('Importar y guardar', key='import_apply',
+                         disabled=not (plan['added'] or plan['moved'])):
+                for d in plan['moved']:
+                    other.remove(d)
+                for d in plan['added'] + plan['moved']:
+                    into.add(d)
+                if _save_lists():
+                    st.success(
+                        f"✅ {len(plan['added'])} añadidos, "
+                        f"{len(plan['moved'])} movidos a {target}"
+                    )
+
+        st.download_button(
+            '📤 Exportar listas (CSV)',
+            export_domain_lists(automationlist.items(), draftlist.items()),
+            file_name='automation_domains.csv',
+            mime='text/csv',
+            key='export_domains'
+        )
 
 def admin_automation():
     """Component that allows to modify GCS Admin Config File for Mail Handler automation."""
 
     if 'automation_cfg' not in st.session_state:
-        st.session_state.automation_cfg = read_json(BUCKET, CONFIG_DIR)
+        cfg, generation = load_config_versioned()
+        st.session_state.automation_cfg = cfg
+        st.session_state.automation_cfg_generation = generation
     
     cfg = st.session_state.automation_cfg
-    auto = cfg.get('automation', {'automationlist': list(), 'draftlist': list()})
+    auto = cfg.get('automation', dict())
 
     if 'automationlist' not in st.session_state:
-        st.session_state.automationlist = list(dict.fromkeys(auto.get('automationlist', list())))
+        st.session_state.automationlist = StagedDomainList(domain_rules(auto, 'automationlist'))
     if 'draftlist' not in st.session_state:
-        st.session_state.draftlist = list(dict.fromkeys(auto.get('draftlist', list())))
+        st.session_state.draftlist = StagedDomainList(domain_rules(auto, 'draftlist'))
 
     st.subheader('Automation')
     
@@ -50,22 +253,18 @@ def admin_automation():
             if st.button("Guardar JSON", key="save_raw_json"):
                 try:
                     new_automation_config = json.loads(edited_json)
-                    
-                    cfg['automation'] = new_automation_config
-                    write_json(BUCKET, CONFIG_DIR, cfg)
-                    st.session_state.automation_cfg = cfg
-                    
-                    st.session_state.automationlist = list(dict.fromkeys(new_automation_config.get('automationlist', [])))
-                    st.session_state.draftlist = list(dict.fromkeys(new_automation_config.get('draftlist', [])))
-                    
-                    st.success("✅ JSON guardado exitosamente")
-                    st.rerun()
-                    
+                    # Without a stored `automation` key the patch is a plain `add`
+                    current = {'automation': cfg['automation']} if 'automation' in cfg else dict()
+                    ops = make_patch(current, {'automation': new_automation_config})
+                    if _apply_config_patch(ops):
+                        st.success("✅ JSON guardado exitosamente")
+                        st.rerun()
+
                 except json.JSONDecodeError as e:
                     st.error(f"❌ Error en el formato JSON: {e}")
                 except Exception as e:
                     st.error(f"❌ Error al guardar: {e}")
-        
+
         with col2:
             if st.button("Validar JSON", key="validate_json"):
                 try:
@@ -78,74 +277,30 @@ def admin_automation():
         
     else:
         
-        st.markdown('#### Automation List (envío automático)')
-        auto_left, auto_right = st.columns([0.48, 0.52])
-
-        with auto_left:
-            c1, c2 = st.columns([0.7, 0.3])
-            new_auto_domain = c1.text_input(
-                'add_auto_domain', placeholder='thegrowth.pro', label_visibility='collapsed'
-            )
-
-            if c2.button('Add', key='automation_add'):
-                d = (new_auto_domain or '').strip().lower()
-                if d:
-                    if not DOMAIN_RX.match(d):
-                        st.error('Invalid domain format')
-                    elif d not in st.session_state.automationlist:
-                        st.session_state.automationlist.append(d)
-                        st.rerun()
+        _domain_list_editor('automation', 'Automation List (envío automático)', 'thegrowth.pro')
+        _domain_list_editor('draft', 'Draft List (solo borradores)', 'example.com')
+        _domain_import_export()
 
-        with auto_right:
-            auto_to_delete = list()
-            for i, d in enumerate(st.session_state.automationlist):
-                r2, r1 = st.columns([0.1, 0.8])
-                r1.markdown(f'<span style="font-size:0.9rem;">`{d}`</span>', unsafe_allow_html=True)
-                if r2.button('🗑️', key=f'automation_delete_{i}'):
-                    auto_to_delete.append(d)
-            
-            if auto_to_delete:
-                st.session_state.automationlist = [d for d in st.session_state.automationlist if d not in auto_to_delete]
-                st.rerun()
-
-        st.markdown('#### Draft List (solo borradores)')
-        draft_left, draft_right = st.columns([0.48, 0.52])
-
-        with draft_left:
-            c1, c2 = st.columns([0.7, 0.3])
-            new_draft_domain = c1.text_input(
-                'add_draft_domain', placeholder='example.com', label_visibility='collapsed'
-            )
-
-            if c2.button('Add', key='draft_add'):
-                d = (new_draft_domain or '').strip().lower()
-                if d:
-                    if not DOMAIN_RX.match(d):
-                        st.error('Invalid domain format')
-                    elif d not in st.session_state.draftlist:
-                        st.session_state.draftlist.append(d)
-                        st.rerun()
+        automationlist = st.session_state.automationlist
+        draftlist = st.session_state.draftlist
+        pending = automationlist.pending + draftlist.pending
+        if pending:
+            st.info(f'{pending} cambio(s) sin guardar')
 
-        with draft_right:
-            draft_to_delete = list()
-            for i, d in enumerate(st.session_state.draftlist):
-                r2, r1 = st.columns([0.1, 0.8])
-                r1.markdown(f'<span style="font-size:0.9rem;">`{d}`</span>', unsafe_allow_html=True)
-                if r2.button('🗑️', key=f'draft_delete_{i}'):
-                    draft_to_delete.append(d)
-            
-            if draft_to_delete:
-                st.session_state.draftlist = [d for d in st.session_state.draftlist if d not in draft_to_delete]
-                st.rerun()
-
-        if st.button('Save', key='automation_save'):
-            cfg['automation'] = {
-                'automationlist': st.session_state.automationlist,
-                'draftlist': st.session_state.draftlist
-            }
-            write_json(BUCKET, CONFIG_DIR, cfg)
-            st.session_state.automation_cfg = cfg
-            st.success('Saved successfully')
+        save_col, discard_col, reload_col = st.columns([1, 1.5, 2.5])
+        if save_col.button('Save', key='automation_save', disabled=not pending):
+            if _save_lists():
+                st.success('Saved successfully')
+        if discard_col.button('Descartar cambios', key='automation_discard', disabled=not pending):
+            automationlist.discard()
+            draftlist.discard()
+            st.rerun()
+        if reload_col.button('🔄 Recargar', key='automation_reload'):
+            for key in (
+                'automation_cfg', 'automation_cfg_generation', 'automationlist', 'draftlist'
+            ):
+                st.session_state.pop(key, None)
+            st.rerun()
 
     st.markdown("""
     <style>
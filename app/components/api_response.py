@@ -2,10 +2,16 @@
 
 import streamlit as st
 
-from datetime import datetime
+import altair as alt
+
 import json
 import re
 
+from src.intervals import (
+    freeblock_arrays, freeblocks_frame, source_tz, intersection, union, check_proposed_slots,
+    heatmap_frame
+)
+
 def _strip_trackers(html: str) -> str:
     """Remove tracking images and styles from HTML."""
     return re.sub(r'<img[^>]*display:none;[^>]*>', '', html, flags=re.IGNORECASE) if html else html
@@ -17,44 +23,59 @@ def _first_dict(*candidates):
             return c
     return None
 
-def _fmt_dt(s: str) -> str:
-    """Format datetime string to a more readable format."""
-    try:
-        return datetime.fromisoformat(s.replace('Z', '+00:00')).strftime('%Y-%m-%d %H:%M')
-    except Exception:
-        return s
-
-def _dur(start: str, end: str) -> str:
-    """Calculate duration in hours between two datetime strings."""
-    try:
-        a = datetime.fromisoformat(start.replace('Z', '+00:00'))
-        b = datetime.fromisoformat(end.replace('Z', '+00:00'))
-        h = (b - a).total_seconds() / 3600
-        return f'{h:.1f}h'
-    except Exception:
-        return ''
-
 def _table_freeblocks(data: dict, max_rows: int = None):
     """Render a table of freeblocks with email, start, end, and duration."""
-    rows = list()
-    for email, slots in (data or dict()).items():
-        for s in slots:
-            rows.append({
-                'email': email,
-                'start': _fmt_dt(s.get('start', '')),
-                'end': _fmt_dt(s.get('end', '')),
-                'dur': _dur(s.get('start', ''), s.get('end', ''))
-            })
-    if not rows:
+    rows = freeblocks_frame(data, source_tz(data))
+    if rows.empty:
         st.write('—')
         return
     if max_rows and len(rows) > max_rows:
         st.caption(f'Showing {max_rows}/{len(rows)} rows')
-        rows = rows[:max_rows]
+        rows = rows.head(max_rows)
     else:
         st.caption(f'Total: {len(rows)} slots')
     st.dataframe(rows, use_container_width=True, hide_index=True)
 
+def _freeblocks_analysis(freeblocks: dict, best_slots: dict | None):
+    """Check the proposed slots against every seller's free time and chart the overlap."""
+    tz = source_tz(freeblocks)
+    arrays = freeblock_arrays(freeblocks)
+    common = intersection(arrays)
+    anyone = union(arrays)
+
+    c1, c2, c3 = st.columns(3)
+    c1.metric('Sellers', len(arrays))
+    c2.metric('All free', f'{int((common[:, 1] - common[:, 0]).sum()) / 60:.1f}h')
+    c3.metric('Anyone free', f'{int((anyone[:, 1] - anyone[:, 0]).sum()) / 60:.1f}h')
+
+    proposed = (best_slots or dict()).get('proposed_slots') or list()
+    if proposed:
+        checks = check_proposed_slots(proposed, arrays, tz)
+        for row in checks:
+            if not row['parsed']:
+                row['check'] = '⚠️ unparsed'
+            else:
+                row['check'] = '✅' if row['fits'] else '❌'
+        if any(row['parsed'] and not row['fits'] for row in checks):
+            st.error('❌ Some proposed slots are outside the sellers\' free time')
+        st.dataframe(
+            [{k: row[k] for k in ('check', 'seller', 'slot', 'all_free')} for row in checks],
+            use_container_width=True,
+            hide_index=True
+        )
+
+    heatmap = heatmap_frame(arrays, tz)
+    if not heatmap.empty:
+        st.altair_chart(
+            alt.Chart(heatmap).mark_rect().encode(
+                x=alt.X('time:O', title='Time'),
+                y=alt.Y('date:O', title=None, sort=None),
+                color=alt.Color('free:Q', title='Free sellers', scale=alt.Scale(scheme='greens')),
+                tooltip=['date', 'time', 'free']
+            ),
+            use_container_width=True
+        )
+
 def _slots_block(text: str | None):
     """Render a block of text with slots, removing empty lines."""
     if not text:
@@ -253,6 +274,7 @@ def api_response(status_code: int, text: str, json_obj: dict | None, request_pay
             if isinstance(freeblocks, str):
                 st.text(freeblocks)
             else:
+                _freeblocks_analysis(freeblocks, best_slots)
                 _table_freeblocks(freeblocks)
         else:
             st.write('—')
@@ -2,7 +2,7 @@
 
 import streamlit as st
 
-from src.auth import load_auth, validate_hmac
+from src.auth import lookup_user_versioned, validate_hmac
 
 def auth_form():
     """Render the authentication form."""
@@ -20,8 +20,7 @@ def auth_form():
         st.stop()
 
     email = email.strip().lower()
-    auth_data = load_auth()
-    auth_entry = auth_data.get(email)
+    auth_entry, generation = lookup_user_versioned(email)
 
     if not auth_entry:
         st.error('No account found for this email.')
@@ -29,6 +28,7 @@ def auth_form():
 
     if validate_hmac(email, api_key, st.secrets['security']['master_key']):
         st.session_state['user'] = {**auth_entry, 'email': email}
+        st.session_state['_auth_generation'] = generation
         st.success('Login successful!')
         st.rerun()
 
@@ -2,7 +2,9 @@
 
 import streamlit as st
 
-from src.gcs import read_text, write_text
+from src.gcs import read_text_versioned
+from src.manifest import write_text_tracked, PostWriteError
+from src.utils import show_write_result
 from src.params import BUCKET, CLIENT_DIR
 
 EXT = '.txt'
@@ -14,7 +16,9 @@ def domain_to_blob(domain: str) -> str:
 def client_editor(domain: str):
     """Create an editor to edit TGP Client Data files (.txt)."""
     blob_name = domain_to_blob(domain)
-    current_text = read_text(BUCKET, blob_name)
+    generation_key = f'generation_{blob_name}'
+    current_text, generation = read_text_versioned(BUCKET, blob_name)
+    st.session_state.setdefault(generation_key, generation)
 
     st.subheader(f'Edit: {domain}')
     edited = st.text_area('Content', value=current_text, height=600, key='client_txt')
@@ -23,10 +27,27 @@ def client_editor(domain: str):
 
     with col1:
         if st.button('Save'):
-            write_text(BUCKET, blob_name, edited, content_type='text/plain')
-            st.success('Saved.')
+            try:
+                result = write_text_tracked(
+                    BUCKET,
+                    CLIENT_DIR,
+                    EXT,
+                    blob_name,
+                    edited,
+                    content_type='text/plain',
+                    if_generation_match=st.session_state[generation_key]
+                )
+            except PostWriteError as e:
+                st.session_state[generation_key] = e.result.generation
+                st.warning(f'⚠️ {e}')
+            else:
+                if not result.conflict:
+                    st.session_state[generation_key] = result.generation
+                show_write_result(result, domain)
 
     with col2:
         if st.button('Reload'):
-            st.session_state['client_txt'] = read_text(BUCKET, blob_name)
+            st.session_state['client_txt'], st.session_state[generation_key] = (
+                read_text_versioned(BUCKET, blob_name)
+            )
             st.info('Reloaded.')
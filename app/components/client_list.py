@@ -2,7 +2,7 @@
 
 import streamlit as st
 
-from src.gcs import list_files_with_prefix, write_text
+from src.manifest import list_manifest_files, write_text_tracked, ManifestUpdateError
 from src.utils import domain_to_blob, blob_to_domain
 from src.params import BUCKET, CLIENT_DIR
 
@@ -10,7 +10,7 @@ EXT = '.txt'
 
 def client_list():
     """Component that allows to select a client from TGP Clients with data."""
-    blobs = list_files_with_prefix(BUCKET, CLIENT_DIR, EXT)
+    blobs = list_manifest_files(BUCKET, CLIENT_DIR, EXT)
     domains = sorted([blob_to_domain(b, CLIENT_DIR, EXT) for b in blobs])
 
     st.subheader('Existing Clients')
@@ -31,8 +31,18 @@ def client_list():
             if blob_name in blobs:
                 st.warning('This client already exists.')
             else:
-                write_text(BUCKET, blob_name, '', content_type='text/plain')
-                st.success(f'{new_domain} created. Reload to edit.')
-                st.rerun()
+                try:
+                    result = write_text_tracked(
+                        BUCKET, CLIENT_DIR, EXT, blob_name, '',
+                        content_type='text/plain', if_generation_match=0
+                    )
+                except ManifestUpdateError:
+                    st.warning(f'{new_domain} created, but the client index refresh failed.')
+                else:
+                    if result.written:
+                        st.success(f'{new_domain} created. Reload to edit.')
+                        st.rerun()
+                    else:
+                        st.warning('This client already exists.')
 
     return selected
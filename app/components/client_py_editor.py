@@ -3,14 +3,57 @@
 import streamlit as st
 from streamlit_ace import st_ace
 
-from src.clients import load_client_file, save_client_file
+from src.clients import (
+    load_client_file_versioned, save_client_file, parse_client_config, compile_calendar_rules,
+    ClientConfigError, WEEKDAYS
+)
+from src.manifest import PostWriteError
+from src.utils import show_write_result, show_issues
+from src.validation import validate, has_errors, KIND_CLIENT
+
+def _calendar_preview(client_name: str, code: str):
+    """Preview the weekly availability compiled from `calendar_rules`."""
+    try:
+        config = parse_client_config(client_name, code)
+    except ClientConfigError:
+        return
+    rules = compile_calendar_rules(config.calendar_rules)
+    compiled = rules.to_dict()
+
+    with st.expander('🗓️ Calendar preview', expanded=bool(rules.unparsed)):
+        st.caption(f'Zona horaria: **{rules.timezone}**')
+        st.dataframe(
+            [
+                {
+                    'day': day,
+                    'available': ', '.join(f'{a}–{b}' for a, b in compiled['days'][day]) or '—',
+                }
+                for day in WEEKDAYS
+            ],
+            use_container_width=True,
+            hide_index=True
+        )
+        for note in rules.assumptions:
+            st.info(f'ℹ️ {note}')
+        if rules.unparsed:
+            st.warning(
+                'Lines not understood by the calendar compiler:\n'
+                + '\n'.join(f'- line {n}: `{text}`' for n, text in rules.unparsed)
+            )
 
 def client_py_editor(client_name: str):
     """Create an editor to edit client configuration files (.py) using ACE editor."""
     
     try:
+        ace_key = f'ace_client_{client_name}'
+        generation_key = f'generation_client_{client_name}'
+
         # Load current code
-        current_code = load_client_file(client_name)
+        current_code, generation = load_client_file_versioned(client_name)
+        if ace_key not in st.session_state:
+            # The editor is (re)filled with `current_code` on this run: saves must match its
+            # generation
+            st.session_state[generation_key] = generation
         
         st.subheader(f'Editing: `{client_name}.py`')
         
@@ -30,26 +73,40 @@ def client_py_editor(client_name: str):
             show_gutter=True,
             show_print_margin=True,
             height=500,
-            key=f'ace_client_{client_name}'
+            key=ace_key
         )
 
+        issues = validate(edited_code, KIND_CLIENT)
+
         # Action buttons
         col1, col2, col3 = st.columns([1, 1, 2])
         
         with col1:
             if st.button('💾 Save', use_container_width=True):
-                try:
-                    save_client_file(client_name, edited_code)
-                    st.success(f'✅ Saved `{client_name}.py`')
-                except Exception as e:
-                    st.error(f'❌ Error saving: {e}')
+                if has_errors(issues):
+                    st.error('❌ Fix the errors below before saving.')
+                else:
+                    try:
+                        result = save_client_file(
+                            client_name,
+                            edited_code,
+                            if_generation_match=st.session_state[generation_key]
+                        )
+                        if not result.conflict:
+                            st.session_state[generation_key] = result.generation
+                        show_write_result(result, f'{client_name}.py')
+                    except PostWriteError as e:
+                        st.session_state[generation_key] = e.result.generation
+                        st.warning(f'⚠️ {e}')
+                    except Exception as e:
+                        st.error(f'❌ Error saving: {e}')
 
         with col2:
             if st.button('🔄 Reload', use_container_width=True):
                 try:
                     # Force reload by removing from session state
-                    if f'ace_client_{client_name}' in st.session_state:
-                        del st.session_state[f'ace_client_{client_name}']
+                    st.session_state.pop(ace_key, None)
+                    st.session_state.pop(generation_key, None)
                     st.rerun()
                 except Exception as e:
                     st.error(f'❌ Error reloading: {e}')
@@ -79,15 +136,12 @@ CLIENT_CONFIG = {
 }
             ''', language='python')
 
-        # Validation warnings
-        if 'CLIENT_CONFIG' not in edited_code:
-            st.warning('⚠️ Make sure your file contains `CLIENT_CONFIG` dictionary.')
-        
-        if '"description"' not in edited_code:
-            st.warning('⚠️ Make sure `CLIENT_CONFIG` contains a `"description"` field.')
-            
-        if '"calendar_rules"' not in edited_code:
-            st.warning('⚠️ Make sure `CLIENT_CONFIG` contains a `"calendar_rules"` field.')
+        # Validation
+        show_issues(issues, f'{client_name}.py')
+
+        # Compiled calendar rules
+        if not has_errors(issues):
+            _calendar_preview(client_name, edited_code)
 
     except Exception as e:
         st.error(f'❌ Error loading client configuration: {e}')
@@ -0,0 +1,124 @@
+# app/components/load_tester.py
+
+import streamlit as st
+
+import altair as alt
+import pandas as pd
+
+from datetime import datetime
+import time
+
+from src.loadtest import (
+    LOADTEST_MAX_INFLIGHT,
+    PERCENTILES,
+    load_test,
+    latency_histogram,
+    samples_frame,
+    summarize_samples,
+    timeline
+)
+from src.scenarios import ENDPOINTS, CLASSIFICATION, CREATE_MEETING, scenario_payloads
+from src.gcs import fetch_id_token
+
+def _metrics(summary: dict):
+    cols = st.columns(7)
+    dropped = f"{summary['dropped']} dropped" if summary['dropped'] else None
+    cols[0].metric('Requests', summary['requests'], delta=dropped, delta_color='off')
+    cols[1].metric('Throughput', f"{summary['throughput_rps']} rps")
+    cols[2].metric('Errors', f"{summary['error_rate']:.1%}")
+    cols[3].metric('In flight', summary['inflight'])
+    for col, p in zip(cols[4:], PERCENTILES):
+        value = summary[f'p{p}_ms']
+        col.metric(f'p{p}', '—' if value is None else f'{value:.0f} ms')
+
+def _histogram(samples: list[dict], summary: dict):
+    bins = latency_histogram(samples)
+    if bins.empty:
+        st.caption('No successful requests yet')
+        return
+    bars = alt.Chart(bins).mark_bar().encode(
+        x=alt.X('start_ms:Q', bin='binned', title='Latency (ms)'),
+        x2='end_ms:Q',
+        y=alt.Y('count:Q', title='Requests'),
+        tooltip=['start_ms', 'end_ms', 'count']
+    )
+    marks = pd.DataFrame([
+        {'percentile': f'p{p}', 'ms': summary[f'p{p}_ms']} for p in PERCENTILES
+    ])
+    rules = alt.Chart(marks).mark_rule(color='red', strokeDash=[4, 2]).encode(
+        x='ms:Q', tooltip=['percentile', 'ms']
+    )
+    st.altair_chart(bars + rules, use_container_width=True)
+
+# Creating meetings has side effects in the TGP App, so it is never load tested
+LOAD_ENDPOINTS = [e for e in ENDPOINTS if e != CREATE_MEETING]
+
+def load_tester(service_url: str, key: str = 'load_tester'):
+    """Drive one endpoint with its scenario payloads and report throughput and latency."""
+    st.warning('Load tests hit the live API (and its LLM quota); keep runs short.')
+    endpoint = st.selectbox(
+        'Endpoint', LOAD_ENDPOINTS, index=LOAD_ENDPOINTS.index(CLASSIFICATION),
+        key=f'{key}_endpoint'
+    )
+    mode = st.radio('Load model', ['Target RPS', 'Concurrency'], horizontal=True)
+    if mode == 'Target RPS':
+        rps = st.number_input('Requests per second', 0.1, 100.0, 2.0, step=0.5)
+        max_inflight = st.number_input('Max in flight', 1, 256, LOADTEST_MAX_INFLIGHT)
+        concurrency = None
+    else:
+        concurrency = st.number_input('Concurrent workers', 1, 64, 4)
+        rps, max_inflight = None, LOADTEST_MAX_INFLIGHT
+    duration = st.slider('Duration (s)', 5, 600, 30, step=5)
+
+    payloads = scenario_payloads(endpoint)
+    st.caption(f'{len(payloads)} scenario payloads sent round-robin')
+
+    if st.button('🚦 Start load test', type='primary'):
+        id_token = fetch_id_token(service_url)
+        live = st.empty()
+        started = time.perf_counter()
+
+        def _progress(summary: dict, samples: list[dict]):
+            with live.container():
+                _metrics(summary)
+                _histogram(samples, summary)
+
+        samples = load_test(
+            f"{service_url}/{ENDPOINTS[endpoint]['path']}",
+            payloads,
+            duration,
+            rps=rps,
+            concurrency=concurrency,
+            headers={'Authorization': f'Bearer {id_token}'},
+            max_inflight=max_inflight,
+            on_progress=_progress
+        )
+        live.empty()
+        elapsed = time.perf_counter() - started
+        st.session_state[f'{key}_results'] = {
+            'endpoint': endpoint,
+            'samples': samples,
+            'summary': summarize_samples(samples, elapsed),
+            'finished_at': datetime.now().strftime('%Y%m%d_%H%M%S'),
+        }
+
+    results = st.session_state.get(f'{key}_results')
+    if not results:
+        return
+    samples, summary = results['samples'], results['summary']
+    st.subheader(f"Results · {results['endpoint']}")
+    _metrics(summary)
+    _histogram(samples, summary)
+
+    per_second = timeline(samples)
+    if not per_second.empty:
+        st.line_chart(per_second, x='second', y=['requests', 'errors', 'dropped'])
+    st.json(summary['status_codes'])
+
+    st.download_button(
+        '📥 Download raw samples (CSV)',
+        samples_frame(samples).to_csv(index=False),
+        file_name=f"load_test_{results['finished_at']}.csv",
+        mime='text/csv',
+        key=f'{key}_download'
+    )
@@ -2,14 +2,72 @@
 
 import streamlit as st
 
-def prompt_tree(tree: dict, on_select):
-    """Render a collapsible file tree and invoke `on_select(blob_name)` when a file is clicked."""
-    def _render(tree, parent_key=''):
-        for key, value in tree.items():
-            if isinstance(value, dict):
-                with st.expander(f'📁 {key}', expanded=True):
-                    _render(value, parent_key + key + '/')
-            else:
-                if st.button(f'📝 {key}', key=parent_key + key):
-                    on_select(value)
+INDENT = '\u2003'
+
+def _prune(tree: dict, query: str, path: str = '') -> dict:
+    """Keep only files whose relative path contains `query`, and the folders leading to them."""
+    pruned = dict()
+    for key, value in tree.items():
+        if isinstance(value, dict):
+            sub = _prune(value, query, path + key + '/')
+            if sub:
+                pruned[key] = sub
+        elif query in (path + key).lower():
+            pruned[key] = value
+    return pruned
+
+def _compact(tokens: int) -> str:
+    return f'{tokens / 1000:.1f}k' if tokens >= 1000 else str(tokens)
+
+def prompt_tree(
+    load_folder,
+    on_select,
+    key: str = 'prompt_tree',
+    tokens: dict | None = None,
+    load_tree=None
+):
+    """Render a lazy file tree and invoke `on_select(blob_name)` when a file is clicked.
+
+    Folders start collapsed. `load_folder(rel_path)` returns one level (sub-folders map to
+    dicts, files to blob names) and is only called for the root and the expanded folders;
+    the expanded set lives in the session. With `load_tree` a filter is shown: it prunes
+    the whole tree before anything is rendered and shows every remaining folder open.
+    `tokens` maps blob names to a token estimate shown next to each file.
+    """
+    tokens = tokens or dict()
+    expanded = st.session_state.setdefault(f'{key}_expanded', set())
+
+    query = ''
+    if load_tree:
+        query = st.text_input(
+            f'{key}_filter', placeholder='Filtrar prompts...', label_visibility='collapsed'
+        ).strip().lower()
+    if query:
+        tree = _prune(load_tree(), query)
+        if not tree:
+            st.caption('Sin resultados')
+            return
+    else:
+        tree = load_folder('')
+
+    def _render(node: dict, parent_key: str = '', depth: int = 0):
+        folders = sorted(k for k, v in node.items() if isinstance(v, dict))
+        files = sorted(k for k, v in node.items() if not isinstance(v, dict))
+        for name in folders:
+            path = parent_key + name + '/'
+            is_open = bool(query) or path in expanded
+            icon = '📂' if is_open else '📁'
+            # While filtering every folder stays open, so a click only toggles without a filter
+            clicked = st.button(f'{INDENT * depth}{icon} {name}', key=f'{key}_dir_{path}')
+            if clicked and not query:
+                expanded.symmetric_difference_update({path})
+                st.rerun()
+            if is_open:
+                _render(node[name] if query else load_folder(path), path, depth + 1)
+        for name in files:
+            blob_name = node[name]
+            size = f' · ~{_compact(tokens[blob_name])}' if blob_name in tokens else ''
+            if st.button(f'{INDENT * depth}📝 {name}{size}', key=f'{key}_{parent_key}{name}'):
+                on_select(blob_name)
+
     _render(tree)
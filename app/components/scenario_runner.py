@@ -0,0 +1,83 @@
+# app/components/scenario_runner.py
+
+import streamlit as st
+
+import pandas as pd
+
+import time
+
+from src.regression import (
+    REGRESSION_WORKERS,
+    REGRESSION_MAX_WORKERS,
+    run_scenarios,
+    scenario_cases,
+    summarize
+)
+from src.scenarios import ENDPOINTS, CREATE_MEETING
+from src.gcs import fetch_id_token
+
+LEADING_COLUMNS = ['passed', 'endpoint', 'scenario', 'status_code', 'latency_ms']
+HIDDEN_COLUMNS = ['response', 'failures']
+# Creating meetings has side effects in the TGP App, so it must be picked explicitly
+DEFAULT_ENDPOINTS = [e for e in ENDPOINTS if e != CREATE_MEETING]
+
+def _frame(rows: list[dict]) -> pd.DataFrame:
+    frame = pd.DataFrame(rows)
+    fields = [c for c in frame.columns if c not in LEADING_COLUMNS + HIDDEN_COLUMNS]
+    frame = frame[LEADING_COLUMNS + fields + ['failures']]
+    frame['failures'] = frame['failures'].map('; '.join)
+    frame['passed'] = frame['passed'].map(lambda p: {True: '✅', False: '❌'}.get(p, '⚪'))
+    return frame
+
+def _show_results(rows: list[dict], summary: dict):
+    cols = st.columns(5)
+    cols[0].metric('Passed', f"{summary['passed']}/{summary['total'] - summary['unchecked']}")
+    cols[1].metric('Failed', summary['failed'])
+    cols[2].metric('Wall time', f"{summary['wall_seconds']}s")
+    cols[3].metric('Median latency', f"{summary['median_ms']} ms")
+    cols[4].metric('Max latency', f"{summary['max_ms']} ms")
+
+    if summary['unchecked']:
+        st.caption(f"⚪ {summary['unchecked']} scenarios have no expected result and only "
+                   'need a successful response')
+    st.dataframe(_frame(rows), use_container_width=True, hide_index=True)
+
+    labels = [f"{r['endpoint']} · {r['scenario']}" for r in rows]
+    with st.expander('Response details'):
+        choice = st.selectbox('Scenario', range(len(rows)), format_func=labels.__getitem__)
+        row = rows[choice]
+        for failure in row['failures']:
+            st.error(failure)
+        if isinstance(row['response'], (dict, list)):
+            st.json(row['response'])
+        else:
+            st.code(row['response'] or '')
+
+def scenario_runner(service_url: str, key: str = 'scenario_runner'):
+    """Run every curated scenario of the chosen endpoints concurrently, streaming results."""
+    endpoints = st.multiselect('Endpoints', list(ENDPOINTS), default=DEFAULT_ENDPOINTS)
+    if CREATE_MEETING in endpoints:
+        st.warning(f'{CREATE_MEETING} scenarios create real meetings in the TGP App.')
+    workers = st.slider(
+        'Concurrent requests', 1, REGRESSION_MAX_WORKERS, REGRESSION_WORKERS,
+        help='Requests in flight at the same time'
+    )
+    cases = scenario_cases(endpoints)
+    st.caption(f'{len(cases)} scenarios selected')
+
+    if st.button('▶️ Run all scenarios', disabled=not cases, type='primary'):
+        id_token = fetch_id_token(service_url)
+        progress = st.progress(0.0, text='Running scenarios...')
+        table = st.empty()
+        rows, started = list(), time.perf_counter()
+        for row in run_scenarios(service_url, id_token, cases, workers=workers):
+            rows.append(row)
+            progress.progress(len(rows) / len(cases), text=f'{len(rows)}/{len(cases)} done')
+            table.dataframe(_frame(rows), use_container_width=True, hide_index=True)
+        progress.empty()
+        table.empty()
+        st.session_state[f'{key}_results'] = (rows, summarize(rows, time.perf_counter() - started))
+
+    results = st.session_state.get(f'{key}_results')
+    if results:
+        _show_results(*results)
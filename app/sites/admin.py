@@ -3,6 +3,9 @@
 import streamlit as st
 
 from components import admin_automation
+from src.gcs import pool_stats, cache_stats, clear_cache
+from src.manifest import rebuild_all_manifests
+from src.clients import rebuild_client_mirrors
 from src.layout import setup_layout
 
 setup_layout(page_title='ChatTGP - Admin Panel')
@@ -10,3 +13,33 @@ setup_layout(page_title='ChatTGP - Admin Panel')
 st.title('Admin Panel')
 
 admin_automation()
+
+with st.expander('Storage diagnostics'):
+    st.caption('Shared storage client and HTTP connection pool reuse for this process.')
+    st.json(pool_stats())
+    st.caption('Blob cache (generation-validated, LRU by size).')
+    st.json(cache_stats())
+    if st.button('Clear blob cache', key='clear_blob_cache'):
+        clear_cache()
+        st.rerun()
+
+    st.caption(
+        'Listings of prompts and clients are served from per-area manifest files. '
+        'Rebuild them if files were added or removed outside this app.'
+    )
+    if st.button('Rebuild manifests', key='rebuild_manifests'):
+        with st.spinner('Listing bucket...'):
+            counts = rebuild_all_manifests()
+        st.success('Manifests rebuilt: ' + ', '.join(f'`{k}` ({v})' for k, v in counts.items()))
+
+    st.caption(
+        'Client configurations are mirrored as JSON (one file per client plus an all-clients '
+        'bundle). Rebuild the mirrors after editing client files outside this app.'
+    )
+    if st.button('Rebuild client mirrors', key='rebuild_client_mirrors'):
+        with st.spinner('Compiling client configurations...'):
+            errors = rebuild_client_mirrors()
+        if errors:
+            st.warning('\n'.join(f'- ⚠️ `{k}`: {v}' for k, v in errors.items()))
+        else:
+            st.success('✅ Client mirrors rebuilt')
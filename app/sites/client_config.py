@@ -3,6 +3,8 @@
 import streamlit as st
 
 from src.layout import setup_layout, protect_page
+from src.clients import prefetch_client_files
+from src.utils import prefetch_once
 from components import client_py_list, client_py_editor
 
 setup_layout(page_title='ChatTGP - Client Configuration')
@@ -18,6 +20,8 @@ st.markdown("""
 These configurations are used by the AI to provide personalized responses.
 """)
 
+prefetch_once('clients', 'Loading client configurations...', prefetch_client_files)
+
 left, right = st.columns([0.35, 0.65])
 
 with left:
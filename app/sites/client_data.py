@@ -3,6 +3,10 @@
 import streamlit as st
 
 from src.layout import setup_layout, protect_page
+from src.gcs import prefetch_blobs
+from src.manifest import list_manifest_files
+from src.params import BUCKET, CLIENT_DIR
+from src.utils import prefetch_once
 from components import client_list, client_editor
 
 setup_layout(page_title='ChatTGP - Client Data')
@@ -10,6 +14,13 @@ user = protect_page('editor')
 
 st.title('Client Data')
 
+def prefetch_client_data(on_progress=None) -> dict:
+    return prefetch_blobs(
+        BUCKET, list_manifest_files(BUCKET, CLIENT_DIR, '.txt'), on_progress=on_progress
+    )
+
+prefetch_once('client_data', 'Loading client data...', prefetch_client_data)
+
 left, right = st.columns([0.35, 0.65])
 
 with left:
@@ -4,8 +4,17 @@ import streamlit as st
 
 from streamlit_ace import st_ace
 
-from src.prompts import get_prompt_file_tree, load_prompt_file, save_prompt_file
+from src.prompts import (
+    get_prompt_file_tree, get_prompt_folder, load_prompt_file_versioned, save_prompt_file,
+    prefetch_prompt_files, load_prompt_history, load_prompt_version, prompt_token_sizes
+)
+from src.tokens import token_stats
+from src.bundle import publish_prompt_bundle, load_current_pointer, BundleError
+from src.history import diff_versions
 from src.layout import setup_layout, protect_page
+from src.utils import show_write_result, show_issues, prefetch_once
+from src.validation import validate, has_errors, KIND_PROMPT
+from src.manifest import PostWriteError
 from components import prompt_tree
 
 setup_layout(page_title='ChatTGP - Prompt Engineering')
@@ -14,15 +23,50 @@ user = protect_page('editor')
 
 st.title('Prompt Editor')
 
-tree = get_prompt_file_tree()
+prefetch_once('prompts', 'Loading prompts...', prefetch_prompt_files)
 
 def handle_file_select(blob_name):
     st.session_state['selected_prompt'] = blob_name
 
 col_left, col_right = st.columns([1, 3])
 
+sizes = prompt_token_sizes()
+
 with col_left:
-    prompt_tree(tree, handle_file_select)
+    prompt_tree(
+        get_prompt_folder,
+        handle_file_select,
+        tokens={x['blob']: x['tokens'] for x in sizes},
+        load_tree=get_prompt_file_tree
+    )
+
+    with st.expander('🚀 Publish bundle'):
+        pointer = load_current_pointer()
+        if pointer:
+            st.caption(
+                f"Current: `{pointer['bundle_id']}` · {pointer['files']} files · "
+                f"{pointer['created_at']} · {pointer['author'] or '-'}"
+            )
+        else:
+            st.caption('Nothing published yet.')
+
+        if st.button('Publish', key='publish_bundle'):
+            try:
+                with st.spinner('Validating and bundling prompts...'):
+                    pointer = publish_prompt_bundle(author=user.get('email'))
+                st.success(f"✅ Published bundle `{pointer['bundle_id']}`")
+            except BundleError as e:
+                st.error(f'❌ {e}')
+                for path, problems in e.issues.items():
+                    st.markdown(f'`{path}`\n' + '\n'.join(f'- {x}' for x in problems))
+
+    with st.expander('📏 Largest prompts'):
+        st.caption(f"~{sum(x['tokens'] for x in sizes):,} tokens across {len(sizes)} prompts")
+        st.dataframe(
+            [{'prompt': x['prompt'], 'tokens': x['tokens']} for x in sizes[:15]],
+            use_container_width=True,
+            hide_index=True
+        )
 
 # TODO: Convert the col_right into a component.
 
@@ -35,7 +79,17 @@ with col_right:
 
         st.subheader(f'Editing: `{internal_path}`')
 
-        code = load_prompt_file(prompt_name)
+        ace_key = f'ace_{prompt_name}'
+        generation_key = f'generation_{prompt_name}'
+        warning_key = f'save_warning_{prompt_name}'
+
+        if warning_key in st.session_state:
+            st.warning(f'⚠️ {st.session_state.pop(warning_key)}')
+
+        code, generation = load_prompt_file_versioned(prompt_name)
+        if ace_key not in st.session_state:
+            # The editor is (re)filled with `code` on this run: saves must match its generation
+            st.session_state[generation_key] = generation
 
         edited = st_ace(
             value=code,
@@ -48,12 +102,101 @@ with col_right:
             show_gutter=True,
             show_print_margin=True,
             height=500,
-            key=f'ace_{prompt_name}'
+            key=ace_key
         )
 
-        if st.button('Save'):
-            try:
-                save_prompt_file(prompt_name, edited)
-                st.success(f'✅ Saved `{internal_path}`')
-            except Exception as e:
-                st.error(f'❌ Error saving `{internal_path}`: {e}')
+        issues = validate(edited, KIND_PROMPT)
+
+        editor_stats = token_stats(edited or '')
+        delta = editor_stats['tokens'] - token_stats(code)['tokens']
+        st.caption(
+            f"~{editor_stats['tokens']:,} tokens ({delta:+,} vs saved) · "
+            f"{editor_stats['chars']:,} chars · {editor_stats['lines']:,} lines"
+        )
+
+        col_save, col_reload, _ = st.columns([1, 1, 4])
+
+        with col_save:
+            if st.button('Save'):
+                if has_errors(issues):
+                    st.error('❌ Fix the errors below before saving.')
+                else:
+                    try:
+                        result = save_prompt_file(
+                            prompt_name,
+                            edited,
+                            if_generation_match=st.session_state[generation_key],
+                            author=user.get('email'),
+                            baseline=code
+                        )
+                        if not result.conflict:
+                            st.session_state[generation_key] = result.generation
+                        show_write_result(result, internal_path)
+                    except PostWriteError as e:
+                        st.session_state[generation_key] = e.result.generation
+                        st.warning(f'⚠️ {e}')
+                    except Exception as e:
+                        st.error(f'❌ Error saving `{internal_path}`: {e}')
+
+        with col_reload:
+            if st.button('Reload'):
+                st.session_state.pop(ace_key, None)
+                st.session_state.pop(generation_key, None)
+                st.rerun()
+
+        show_issues(issues, internal_path)
+
+        with st.expander('🕘 History'):
+            versions = load_prompt_history(prompt_name)
+            if not versions:
+                st.caption('No saved versions yet. History starts with the next save.')
+            else:
+                st.dataframe(
+                    [
+                        {
+                            'saved_at': v['saved_at'],
+                            'author': v['author'] or '-',
+                            'size': v['size'],
+                            'sha256': v['sha256'][:12],
+                        }
+                        for v in versions
+                    ],
+                    use_container_width=True,
+                    hide_index=True
+                )
+                selected = st.selectbox(
+                    'Compare editor with version',
+                    range(len(versions)),
+                    format_func=lambda i: (
+                        f"{versions[i]['saved_at']} · {versions[i]['sha256'][:12]}"
+                    ),
+                    key=f'history_{prompt_name}'
+                )
+                version = versions[selected]
+                old_code = load_prompt_version(version['sha256'])
+                diff = diff_versions(
+                    old_code, edited or code, version['sha256'][:12], 'editor'
+                )
+                if diff:
+                    st.code(diff, language='diff')
+                else:
+                    st.caption('Identical to the editor content.')
+
+                if st.button('Restore this version', key=f'restore_{prompt_name}'):
+                    try:
+                        result = save_prompt_file(
+                            prompt_name,
+                            old_code,
+                            if_generation_match=st.session_state[generation_key],
+                            author=user.get('email'),
+                            baseline=code
+                        )
+                    except PostWriteError as e:
+                        result = e.result
+                        st.session_state[warning_key] = str(e)
+                    if result.conflict:
+                        show_write_result(result, internal_path)
+                    else:
+                        st.session_state[generation_key] = result.generation
+                        st.session_state.pop(ace_key, None)
+                        st.rerun()
@@ -0,0 +1,40 @@
+# app/sites/search.py
+
+import streamlit as st
+
+import time
+
+from src.layout import setup_layout, protect_page
+from src.search import search, search_index
+from src.params import BUCKET
+
+setup_layout(page_title='ChatTGP - Search')
+
+user = protect_page('editor')
+
+st.title('Search')
+st.caption('Busca en prompts, configuraciones de clientes y client data (legacy).')
+
+query = st.text_input(
+    'search_query', placeholder='miércoles, horario de atención, ...',
+    label_visibility='collapsed'
+)
+
+if query.strip():
+    start = time.perf_counter()
+    results = search(query)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    st.caption(f'{len(results)} resultado(s) en {elapsed_ms:.1f} ms')
+    for hit in results:
+        st.markdown(f"**`{hit['name']}`** · score {hit['score']}")
+        st.code(
+            '\n'.join(f'{line:>4} | {text}' for line, text in hit['snippets']),
+            language=None
+        )
+
+with st.expander('Index'):
+    index = search_index()
+    st.json(index.stats())
+    if st.button('Refresh index', key='search_refresh'):
+        st.json(index.refresh(BUCKET, force=True))
@@ -8,11 +8,15 @@ import json
 from src.layout import setup_layout, protect_page
 from components.api_form import api_form, close_thread_form, close_thread_sent_form, create_meeting_form
 from components.api_response import api_response
-from src.gcs import fetch_id_token
+from components.scenario_runner import scenario_runner
+from components.load_tester import load_tester
+from src.gcs import fetch_id_token, warm_id_token
 
 setup_layout(page_title='ChatTGP - AI Testing')
 user = protect_page('editor')
 
+warm_id_token(st.secrets['api']['base_url'])
+
 
 def _display_close_thread_response(status_code: int, text: str, json_obj: dict | None, request_payload: dict):
     """Display response for close thread endpoint."""
@@ -179,6 +183,14 @@ def _display_create_meeting_response(status_code: int, text: str, json_obj: dict
 
 st.title('AI Endpoint Testing')
 
+mode = st.radio('Mode', ['Single request', 'Run all scenarios', 'Load test'], horizontal=True)
+if mode == 'Run all scenarios':
+    scenario_runner(st.secrets['api']['base_url'])
+    st.stop()
+if mode == 'Load test':
+    load_tester(st.secrets['api']['base_url'])
+    st.stop()
+
 # Endpoint selector
 endpoint_option = st.selectbox(
     'Select Endpoint',
@@ -2,8 +2,80 @@
 
 import streamlit as st
 
+from src.auth import (
+    auth_layout, list_users, lookup_user_versioned, save_user, delete_user, hmac_hash,
+    migrate_auth_to_shards, AUTH_LAYOUT_SINGLE, AUTH_LAYOUT_SHARDED
+)
 from src.layout import setup_layout
 
 setup_layout(page_title='ChatTGP - User Settings')
 
 st.title('User Settings')
+
+users = list_users()
+st.caption(f'Auth storage layout: **{auth_layout()}** · {len(users)} users')
+st.dataframe(
+    [
+        {'email': email, 'role': entry.get('role', ''), 'name': entry.get('name', '')}
+        for email, entry in sorted(users.items())
+    ],
+    use_container_width=True,
+    hide_index=True
+)
+
+ROLES = ['admin', 'editor', 'viewer']
+
+with st.expander('Add or update a user'):
+    with st.form('save_user_form'):
+        email = st.text_input('Email').strip().lower()
+        name = st.text_input('Name')
+        role = st.selectbox('Role', ROLES, index=1)
+        submitted = st.form_submit_button('Save user')
+    if submitted:
+        if '@' not in email:
+            st.warning('Please enter a valid email.')
+        else:
+            # Keep fields this form does not edit (e.g. permissions); in the sharded layout
+            # the record generation guards against concurrent edits of the same user
+            existing, generation = lookup_user_versioned(email)
+            sharded = auth_layout() == AUTH_LAYOUT_SHARDED
+            result = save_user(
+                email,
+                {**(existing or dict()), 'role': role, 'name': name},
+                if_generation_match=(generation or 0) if sharded else None
+            )
+            if result.conflict:
+                st.error('❌ Users were changed by someone else. Reload and try again.')
+            else:
+                st.session_state['saved_user'] = email
+                st.rerun()
+
+if saved := st.session_state.pop('saved_user', None):
+    st.success(f'✅ {saved} saved. API key (share it privately):')
+    st.code(hmac_hash(saved, st.secrets['security']['master_key']))
+
+if users:
+    with st.expander('Remove a user'):
+        to_remove = st.selectbox('User', sorted(users), key='remove_user')
+        if st.button('Remove user', key='remove_user_button'):
+            if delete_user(to_remove).conflict:
+                st.error('❌ Users were changed by someone else. Reload and try again.')
+            else:
+                st.session_state['removed_user'] = to_remove
+                st.rerun()
+
+if removed := st.session_state.pop('removed_user', None):
+    st.success(f'✅ {removed} removed.')
+
+if auth_layout() == AUTH_LAYOUT_SINGLE:
+    with st.expander('Migrate to sharded auth storage'):
+        st.markdown(
+            'Copies every user into its own small record plus a compact index, so logins '
+            'fetch one record and user updates are single-object writes. The current auth '
+            'file is left untouched. Set `auth_layout = "sharded"` in the `gcs` secrets once '
+            'the migration finished.'
+        )
+        if st.button('Migrate users', key='migrate_auth'):
+            with st.spinner('Migrating users...'):
+                count = migrate_auth_to_shards()
+            st.success(f'Migrated {count} users.')
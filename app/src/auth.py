@@ -2,10 +2,92 @@
 
 import streamlit as st
 
+import threading
 import hashlib
 import hmac
+import json
+import time
 
-from src.gcs import read_json, write_json
+from src.gcs import (
+    read_text, read_text_versioned, read_json, write_json, update_json, stat_blob, delete_blob,
+    WriteResult, WRITE_WRITTEN
+)
+from src.storage import NotFound
+
+AUTH_REVALIDATE_SECONDS = 15.0
+AUTH_LAYOUT_SINGLE = 'single'
+AUTH_LAYOUT_SHARDED = 'sharded'
+AUTH_SHARDS_FOLDER = 'auth/users'
+AUTH_SHARDS_INDEX = '_index.json'
+
+class _AuthIndex:
+    """Parsed auth file shared by all sessions, revalidated against the blob generation."""
+
+    def __init__(self):
+        self.users = dict()
+        self.generation = None
+        self.checked_at = 0.0
+        self.lock = threading.Lock()
+
+@st.cache_resource(show_spinner=False)
+def _auth_index() -> _AuthIndex:
+    """Return the process-wide auth index."""
+    return _AuthIndex()
+
+def _auth_blob() -> tuple[str, str]:
+    return st.secrets['gcs']['bucket'], st.secrets['gcs']['auth_file']
+
+def auth_layout() -> str:
+    """Auth storage layout: one JSON file (`single`) or one blob per user (`sharded`)."""
+    return st.secrets['gcs'].get('auth_layout', AUTH_LAYOUT_SINGLE)
+
+def email_key(email: str) -> str:
+    """Stable hashed key of an email, used to name its shard."""
+    return hashlib.sha256(email.strip().lower().encode()).hexdigest()
+
+def _shards_folder() -> str:
+    return st.secrets['gcs'].get('auth_shards_folder', AUTH_SHARDS_FOLDER).rstrip('/')
+
+def _record_blob(email: str) -> str:
+    return f'{_shards_folder()}/{email_key(email)}.json'
+
+def _shards_index_blob() -> str:
+    return f'{_shards_folder()}/{AUTH_SHARDS_INDEX}'
+
+def _index_entry(email: str, entry: dict) -> dict:
+    return {'email': email, 'role': entry.get('role', ''), 'name': entry.get('name', '')}
+
+def _load_record(email: str) -> tuple[dict | None, int | None]:
+    """Fetch a single user's shard: (entry, generation), or (None, None) when absent."""
+    try:
+        text, generation = read_text_versioned(
+            st.secrets['gcs']['bucket'], _record_blob(email)
+        )
+    except NotFound:
+        return None, None
+    record = json.loads(text)
+    record.pop('email', None)
+    return record, generation
+
+def _load_index(index: _AuthIndex):
+    """Download and parse the auth file into `index` (caller holds the lock)."""
+    text, generation = read_text_versioned(*_auth_blob())
+    index.users = {email.lower(): entry for email, entry in json.loads(text).items()}
+    index.generation = generation
+    index.checked_at = time.monotonic()
+
+def auth_index(max_age: float = AUTH_REVALIDATE_SECONDS) -> _AuthIndex:
+    """Return the parsed auth index, checking the blob generation at most every `max_age` s."""
+    index = _auth_index()
+    with index.lock:
+        if index.generation is not None and time.monotonic() - index.checked_at < max_age:
+            return index
+        info = stat_blob(*_auth_blob())
+        if info is not None and info.generation == index.generation:
+            index.checked_at = time.monotonic()
+        else:
+            _load_index(index)
+    return index
 
 def hmac_hash(email: str, master_key: str) -> str:
     """Generate HMAC hash for the given email and master key."""
@@ -16,12 +98,149 @@ def validate_hmac(email: str, key: str, master_key: str) -> bool:
     return hmac.compare_digest(hmac_hash(email, master_key).encode(), key.encode())
 
 def load_auth():
-    """Load authentication data from Google Cloud Storage."""
-    return read_json(st.secrets['gcs']['bucket'], st.secrets['gcs']['auth_file'])
+    """Load authentication data (in sharded layout, the compact user index)."""
+    if auth_layout() == AUTH_LAYOUT_SHARDED:
+        return list_users()
+    return auth_index().users
+
+def lookup_user_versioned(email: str) -> tuple[dict | None, int | None]:
+    """Return (auth entry, generation it was read at) for `email`.
+
+    Single layout: in-memory lookup in the auth index. Sharded layout: fetch only this
+    user's record.
+    """
+    email = email.strip().lower()
+    if auth_layout() == AUTH_LAYOUT_SHARDED:
+        return _load_record(email)
+    index = auth_index()
+    return index.users.get(email), index.generation
+
+def list_users() -> dict:
+    """Return users keyed by email (role and name only in sharded layout)."""
+    if auth_layout() == AUTH_LAYOUT_SHARDED:
+        try:
+            index = read_json(st.secrets['gcs']['bucket'], _shards_index_blob())
+        except NotFound:
+            return dict()
+        return {x['email']: x for x in index.values()}
+    return auth_index().users
+
+def save_auth(data: dict) -> WriteResult:
+    """Save authentication data to Google Cloud Storage (single-file layout)."""
+    index = _auth_index()
+    with index.lock:
+        result = write_json(*_auth_blob(), data, if_generation_match=index.generation)
+        if result.conflict:
+            _load_index(index)
+        else:
+            index.users = {email.lower(): entry for email, entry in data.items()}
+            index.generation = result.generation
+            index.checked_at = time.monotonic()
+    return result
+
+def save_user(email: str, entry: dict, if_generation_match: int | None = None) -> WriteResult:
+    """Create or update one user.
+
+    Sharded layout: a single-object write of the user's record with a generation
+    precondition, then an index update. Single layout: rewrite of the auth file.
+    """
+    email = email.strip().lower()
+    if auth_layout() != AUTH_LAYOUT_SHARDED:
+        return save_auth({**auth_index(0).users, email: entry})
+
+    result = write_json(
+        st.secrets['gcs']['bucket'],
+        _record_blob(email),
+        {**entry, 'email': email},
+        if_generation_match=if_generation_match
+    )
+    if result.written:
+        update_json(
+            st.secrets['gcs']['bucket'],
+            _shards_index_blob(),
+            lambda index: index.update({email_key(email): _index_entry(email, entry)}),
+            default=dict
+        )
+    return result
+
+def delete_user(email: str) -> WriteResult:
+    """Remove one user from the auth storage.
+
+    Single layout: rewrite of the auth file, which reports a conflict when it was changed
+    by someone else meanwhile. Sharded layout: delete of the user's record, then an index
+    update.
+    """
+    email = email.strip().lower()
+    if auth_layout() != AUTH_LAYOUT_SHARDED:
+        users = dict(auth_index(0).users)
+        users.pop(email, None)
+        return save_auth(users)
+
+    try:
+        delete_blob(st.secrets['gcs']['bucket'], _record_blob(email))
+    except NotFound:
+        pass
+    update_json(
+        st.secrets['gcs']['bucket'],
+        _shards_index_blob(),
+        lambda index: index.pop(email_key(email), None),
+        default=dict
+    )
+    return WriteResult(WRITE_WRITTEN)
+
+def migrate_auth_to_shards() -> int:
+    """Copy the single auth file into per-user records plus index; returns the user count.
+
+    The single file is left untouched, so switching `auth_layout` back is a safe rollback.
+    """
+    bucket_name, auth_file = _auth_blob()
+    users = {
+        email.lower(): entry
+        for email, entry in json.loads(read_text(bucket_name, auth_file)).items()
+    }
+    for email, entry in users.items():
+        write_json(bucket_name, _record_blob(email), {**entry, 'email': email})
+    write_json(
+        bucket_name,
+        _shards_index_blob(),
+        {email_key(email): _index_entry(email, entry) for email, entry in users.items()}
+    )
+    return len(users)
+
+def _session_generation(email: str) -> int | None:
+    """Current auth generation for `email`, checked cheaply (metadata only)."""
+    if auth_layout() != AUTH_LAYOUT_SHARDED:
+        return auth_index().generation
+
+    now = time.monotonic()
+    if now - st.session_state.get('_auth_checked_at', 0.0) < AUTH_REVALIDATE_SECONDS:
+        return st.session_state.get('_auth_generation')
+    st.session_state['_auth_checked_at'] = now
+    info = stat_blob(st.secrets['gcs']['bucket'], _record_blob(email))
+    return info.generation if info is not None else None
+
+def refresh_session_user() -> dict | None:
+    """Re-check the session user's role and permissions when their auth data changed.
+
+    Costs a metadata check at most every AUTH_REVALIDATE_SECONDS and no download unless
+    the generation moved. Returns None (and drops the user) when access was revoked.
+    """
+    user = st.session_state.get('user')
+    if user is None:
+        return None
+
+    generation = _session_generation(user['email'])
+    if generation is not None and st.session_state.get('_auth_generation') == generation:
+        return user
+
+    entry, generation = lookup_user_versioned(user['email'])
+    if entry is None:
+        st.session_state.pop('user')
+        return None
 
-def save_auth(data: dict):
-    """Save authentication data to Google Cloud Storage."""
-    write_json(st.secrets['gcs']['bucket'], st.secrets['gcs']['auth_file'], data)
+    st.session_state['user'] = {**entry, 'email': user['email']}
+    st.session_state['_auth_generation'] = generation
+    return st.session_state['user']
 
 def has_permission(user: dict, permission: str) -> bool:
     """Check if the user has the specified permission."""
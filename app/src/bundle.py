@@ -0,0 +1,252 @@
+# app/src/bundle.py
+
+import streamlit as st
+
+from datetime import datetime, timezone
+import hashlib
+import zipfile
+import json
+import ast
+import io
+
+from src.gcs import read_text_versioned, write_bytes, write_json, stat_blob, prefetch_blobs
+from src.manifest import manifest_blob, load_manifest
+from src.validation import validate_many, has_errors, KIND_PROMPT
+from src.storage import NotFound
+
+BUNDLES_FOLDER = 'bundles'
+BUNDLE_VERSION = 1
+BUNDLE_MANIFEST = 'manifest.json'
+POINTER_NAME = 'current.json'
+PROMPT_EXT = '.py'
+
+class BundleError(Exception):
+    """Publishing was aborted; `issues` maps prompt paths to their problems."""
+
+    def __init__(self, message: str, issues: dict | None = None):
+        super().__init__(message)
+        self.issues = issues or dict()
+
+def bundles_folder() -> str:
+    return st.secrets['gcs'].get('bundles_folder', BUNDLES_FOLDER).rstrip('/')
+
+def pointer_blob() -> str:
+    """Small blob naming the bundle the backend should load."""
+    return f'{bundles_folder()}/{POINTER_NAME}'
+
+def _module_name(rel_path: str) -> str:
+    """`zero_effort/classify.py` -> `zero_effort.classify`; packages drop `__init__`."""
+    parts = rel_path.removesuffix(PROMPT_EXT).split('/')
+    if parts[-1] == '__init__':
+        parts = parts[:-1]
+    return '.'.join(parts)
+
+def _defined_names(tree: ast.Module) -> set[str]:
+    names = set()
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names.add(node.name)
+        elif isinstance(node, ast.Assign):
+            names.update(t.id for t in node.targets if isinstance(t, ast.Name))
+        elif isinstance(node, ast.AnnAssign) and isinstance(node.target, ast.Name):
+            names.add(node.target.id)
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            names.update((a.asname or a.name).split('.')[0] for a in node.names)
+    return names
+
+def resolve_imports(sources: dict[str, str], root: str) -> tuple[dict, dict]:
+    """Resolve imports between prompt modules.
+
+    `sources` maps paths relative to the prompts folder to code; `root` is the prompts
+    folder name, accepted as an absolute import prefix. Returns (dependencies per path,
+    issues per path) for imports that point into the prompts package but do not resolve.
+    """
+    modules = {_module_name(path): path for path in sources}
+    packages = {'.'.join(m.split('.')[:i]) for m in modules for i in range(1, m.count('.') + 1)}
+    top_level = {m.split('.')[0] for m in modules} | {root}
+    trees = {path: ast.parse(code) for path, code in sources.items()}
+    defined = {path: _defined_names(tree) for path, tree in trees.items()}
+
+    def _target(name: str, line: int, problems: list[str]) -> str | None:
+        parts = name.split('.') if name else list()
+        if parts and parts[0] == root:
+            parts = parts[1:]
+        module = '.'.join(parts)
+        if module in modules:
+            return module
+        if module not in packages and module != '':
+            problems.append(f'L{line}: cannot resolve import `{name}`')
+        return None
+
+    deps, issues = dict(), dict()
+    for path, tree in trees.items():
+        own = _module_name(path).split('.')
+        package = own if path.endswith('__init__.py') else own[:-1]
+        deps[path], problems = set(), list()
+
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    if alias.name.split('.')[0] in top_level:
+                        module = _target(alias.name, node.lineno, problems)
+                        if module:
+                            deps[path].add(modules[module])
+            elif isinstance(node, ast.ImportFrom):
+                if node.level:
+                    keep = len(package) - node.level + 1
+                    if keep < 0:
+                        problems.append(f'L{node.lineno}: relative import beyond the prompts root')
+                        continue
+                    name = '.'.join(package[:keep] + ([node.module] if node.module else list()))
+                elif (node.module or '').split('.')[0] in top_level:
+                    name = node.module
+                else:
+                    continue
+                module = _target(name, node.lineno, problems)
+                prefix = name.removeprefix(root + '.') if name != root else ''
+                for alias in node.names:
+                    sub = f'{prefix}.{alias.name}' if prefix else alias.name
+                    if sub in modules:
+                        deps[path].add(modules[sub])
+                    elif module and (alias.name == '*' or alias.name in defined[modules[module]]):
+                        deps[path].add(modules[module])
+                    elif sub not in packages:
+                        problems.append(f'L{node.lineno}: `{alias.name}` not found in `{name}`')
+        deps[path].discard(path)
+        if problems:
+            issues[path] = problems
+    return deps, issues
+
+def _load_order(deps: dict[str, set]) -> list[str]:
+    """Dependencies-first order; raises BundleError on import cycles."""
+    order, state = list(), dict()
+
+    def _visit(path: str, stack: list[str]):
+        if state.get(path) == 'done':
+            return
+        if state.get(path) == 'active':
+            cycle = stack[stack.index(path):] + [path]
+            raise BundleError('Import cycle: ' + ' -> '.join(cycle))
+        state[path] = 'active'
+        for dep in sorted(deps[path]):
+            _visit(dep, stack + [path])
+        state[path] = 'done'
+        order.append(path)
+
+    for path in sorted(deps):
+        _visit(path, list())
+    return order
+
+def _snapshot(bucket_name: str, prefix: str) -> tuple[dict[str, str], dict[str, int], int]:
+    """Read every prompt at the generations recorded in one version of the manifest."""
+    load_manifest(bucket_name, prefix, PROMPT_EXT)
+    text, manifest_generation = read_text_versioned(bucket_name, manifest_blob(prefix))
+    files = json.loads(text)['files']
+
+    errors = prefetch_blobs(bucket_name, list(files))
+    if errors:
+        raise BundleError(f'Could not read {len(errors)} prompt(s)', {
+            name: [str(e)] for name, e in errors.items()
+        })
+
+    root_prefix = prefix.rstrip('/') + '/'
+    sources, generations = dict(), dict()
+    for name, entry in files.items():
+        code, generation = read_text_versioned(bucket_name, name)
+        if generation != entry['generation']:
+            raise BundleError(f'`{name}` changed while publishing, try again')
+        rel_path = name.removeprefix(root_prefix)
+        sources[rel_path] = code
+        generations[rel_path] = generation
+    return sources, generations, manifest_generation
+
+def build_bundle(
+    sources: dict[str, str],
+    generations: dict[str, int],
+    deps: dict[str, set],
+    order: list[str],
+    author: str | None = None
+) -> tuple[bytes, dict]:
+    """Zip the prompts with a manifest of hashes, generations and the import order."""
+    files = {
+        path: {
+            'sha256': hashlib.sha256(sources[path].encode('utf-8')).hexdigest(),
+            'size': len(sources[path].encode('utf-8')),
+            'generation': generations[path],
+            'imports': sorted(deps[path]),
+        }
+        for path in sorted(sources)
+    }
+    digest = hashlib.sha256(
+        json.dumps({p: f['sha256'] for p, f in files.items()}, sort_keys=True).encode('utf-8')
+    ).hexdigest()
+    manifest = {
+        'version': BUNDLE_VERSION,
+        'bundle_id': digest[:16],
+        'sha256': digest,
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'author': author,
+        'load_order': order,
+        'files': files,
+    }
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr(BUNDLE_MANIFEST, json.dumps(manifest, indent=2))
+        for path in sorted(sources):
+            archive.writestr(path, sources[path])
+    return buffer.getvalue(), manifest
+
+def publish_prompt_bundle(author: str | None = None) -> dict:
+    """Validate, snapshot and bundle all prompts, then point `current.json` at the bundle.
+
+    Raises BundleError (with per-file issues) on validation or import problems, and when
+    a prompt was saved while publishing; the pointer is only flipped for a consistent
+    snapshot. Returns the pointer document.
+    """
+    bucket_name = st.secrets['gcs']['bucket']
+    prefix = st.secrets['gcs']['prompts_folder']
+    sources, generations, manifest_generation = _snapshot(bucket_name, prefix)
+
+    validation = validate_many(sources, KIND_PROMPT)
+    errors = {p: [str(x) for x in v] for p, v in validation.items() if has_errors(v)}
+    if errors:
+        raise BundleError(f'{len(errors)} prompt(s) failed validation', errors)
+
+    deps, issues = resolve_imports(sources, prefix.strip('/').split('/')[-1])
+    if issues:
+        raise BundleError(f'{len(issues)} prompt(s) have unresolved imports', issues)
+    order = _load_order(deps)
+
+    data, manifest = build_bundle(sources, generations, deps, order, author=author)
+    blob_name = f"{bundles_folder()}/{manifest['bundle_id']}/prompts.zip"
+    write_bytes(bucket_name, blob_name, data, content_type='application/zip')
+
+    current = stat_blob(bucket_name, manifest_blob(prefix))
+    if current is None or current.generation != manifest_generation:
+        raise BundleError('Prompts were saved while publishing; the pointer was not updated')
+
+    try:
+        _, pointer_generation = read_text_versioned(bucket_name, pointer_blob())
+    except NotFound:
+        pointer_generation = 0
+    pointer = {
+        'bundle_id': manifest['bundle_id'],
+        'blob': blob_name,
+        'sha256': manifest['sha256'],
+        'created_at': manifest['created_at'],
+        'author': author,
+        'files': len(manifest['files']),
+        'source_manifest_generation': manifest_generation,
+    }
+    if write_json(bucket_name, pointer_blob(), pointer, pointer_generation).conflict:
+        raise BundleError('Another publish updated the pointer at the same time, try again')
+    return pointer
+
+def load_current_pointer() -> dict | None:
+    """The published bundle pointer, or None when nothing was published yet."""
+    try:
+        text, _ = read_text_versioned(st.secrets['gcs']['bucket'], pointer_blob())
+    except NotFound:
+        return None
+    return json.loads(text)
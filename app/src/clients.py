@@ -2,7 +2,375 @@
 
 import streamlit as st
 
-from src.gcs import read_text, write_text, list_files_with_prefix
+from dataclasses import dataclass, asdict, field, replace
+from datetime import datetime, time
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+import unicodedata
+import threading
+import ast
+import re
+
+from src.gcs import (
+    read_text, read_text_versioned, write_json, update_json, prefetch_blobs, WriteResult
+)
+from src.constants import DEFAULT_TIMEZONE
+from src.manifest import (
+    write_text_tracked, list_manifest_files, ManifestUpdateError, PostWriteError
+)
+
+CLIENTS_PREFIX = 'clients'
+CLIENT_EXT = '.py'
+CLIENT_CONFIG_NAME = 'CLIENT_CONFIG'
+CLIENTS_COMPILED_PREFIX = 'clients_compiled'
+CLIENTS_BUNDLE_NAME = '_all.json'
+CLIENTS_BUNDLE_VERSION = 1
+
+class ClientConfigError(ValueError):
+    """A client file does not define a usable `CLIENT_CONFIG` literal."""
+
+@dataclass(frozen=True, slots=True)
+class ClientConfig:
+    name: str
+    description: str
+    calendar_rules: str
+    extra: dict = field(default_factory=dict)
+    generation: int | None = None
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+def client_config_node(tree: ast.Module) -> ast.Assign | ast.AnnAssign | None:
+    """Last top-level `CLIENT_CONFIG = ...` or `CLIENT_CONFIG: T = ...` that has a value."""
+    found = None
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(
+            isinstance(t, ast.Name) and t.id == CLIENT_CONFIG_NAME for t in node.targets
+        ):
+            found = node
+        elif (
+            isinstance(node, ast.AnnAssign) and node.value is not None
+            and isinstance(node.target, ast.Name) and node.target.id == CLIENT_CONFIG_NAME
+        ):
+            found = node
+    return found
+
+def client_config_from_tree(
+    client_name: str,
+    tree: ast.Module,
+    generation: int | None = None
+) -> ClientConfig:
+    """Evaluate `CLIENT_CONFIG` of a parsed module with `ast.literal_eval`.
+
+    Error messages do not name the client; parse_client_config adds it.
+    """
+    node = client_config_node(tree)
+    if node is None:
+        raise ClientConfigError(f'`{CLIENT_CONFIG_NAME}` is not defined')
+
+    try:
+        config = ast.literal_eval(node.value)
+    except (ValueError, TypeError):
+        raise ClientConfigError(f'`{CLIENT_CONFIG_NAME}` is not a literal')
+    if not isinstance(config, dict) or not all(
+        isinstance(k, str) and isinstance(v, str) for k, v in config.items()
+    ):
+        raise ClientConfigError(f'`{CLIENT_CONFIG_NAME}` must map strings to strings')
+
+    extra = dict(config)
+    try:
+        description = extra.pop('description').strip()
+        calendar_rules = extra.pop('calendar_rules').strip()
+    except KeyError as e:
+        raise ClientConfigError(f'missing required key {e}')
+    return ClientConfig(client_name, description, calendar_rules, extra, generation)
+
+def parse_client_config(client_name: str, code: str, generation: int | None = None) -> ClientConfig:
+    """Evaluate `CLIENT_CONFIG` with `ast.literal_eval` (no code is executed)."""
+    try:
+        tree = ast.parse(code)
+    except SyntaxError as e:
+        raise ClientConfigError(f'{client_name}: syntax error on line {e.lineno or 1}: {e.msg}')
+    except ValueError as e:
+        # e.g. null bytes in the source (Python <= 3.11)
+        raise ClientConfigError(f'{client_name}: {e}')
+    try:
+        return client_config_from_tree(client_name, tree, generation)
+    except ClientConfigError as e:
+        raise ClientConfigError(f'{client_name}: {e}') from None
+
+class _ConfigCache:
+    """Parsed configs keyed by client, reused while the blob generation is unchanged."""
+
+    def __init__(self):
+        self._configs = dict()
+        self._lock = threading.Lock()
+
+    def get(self, client_name: str, generation: int) -> ClientConfig | None:
+        with self._lock:
+            config = self._configs.get(client_name)
+        return config if config is not None and config.generation == generation else None
+
+    def put(self, config: ClientConfig):
+        with self._lock:
+            self._configs[config.name] = config
+
+@st.cache_resource(show_spinner=False)
+def _config_cache() -> _ConfigCache:
+    return _ConfigCache()
+
+def load_client_config(client_name) -> ClientConfig:
+    """Load and parse a client configuration, parsing each blob generation only once."""
+    code, generation = load_client_file_versioned(client_name)
+    cache = _config_cache()
+    config = cache.get(client_name, generation)
+    if config is None:
+        config = parse_client_config(client_name, code, generation)
+        cache.put(config)
+    return config
+
+WEEKDAYS = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+# Keys are accent-folded (see _fold), so `miércoles` and `sábados` match too
+DAY_NAMES = {
+    'lunes': 0, 'martes': 1, 'miercoles': 2, 'jueves': 3, 'viernes': 4, 'sabado': 5,
+    'sabados': 5, 'domingo': 6, 'domingos': 6,
+    **{day: i for i, day in enumerate(WEEKDAYS)},
+    **{day + 's': i for i, day in enumerate(WEEKDAYS)},
+}
+DEFAULT_WORKDAYS = (0, 1, 2, 3, 4)
+SLOT_MINUTES = 15
+DAY_RX = '|'.join(sorted(DAY_NAMES, key=len, reverse=True))
+DAY_RANGE_RX = re.compile(rf'\b({DAY_RX})\s*(?:a|-|–|hasta)\s*({DAY_RX})\b')
+DAY_WORD_RX = re.compile(rf'\b({DAY_RX})\b')
+NEGATION_RX = re.compile(r'^(no|nunca|sin)\b')
+# A label colon (`Horario: ...`), never the one inside a time such as `9:00`
+LABEL_RX = re.compile(r'(?<!\d):|:(?!\d)')
+DIGIT_RX = re.compile(r'\d')
+TIME_RANGE_RX = re.compile(
+    r'(\d{1,2})(?:[:.](\d{2}))?\s*(am|pm|hrs?|h)?\s*(?:a|-|–|hasta)\s*'
+    r'(\d{1,2})(?:[:.](\d{2}))?\s*(am|pm|hrs?|h)?\b'
+)
+RULE_KEYS = (
+    ('days_off', re.compile(
+        r'^dias? no (disponibles?|habiles|laborables)|^no (disponible|agendar|atender|trabaja)'
+    )),
+    ('days_on', re.compile(r'^dias? (disponibles?|habiles|laborables|de atencion)')),
+    ('hours', re.compile(r'^(horario|atencion|disponibilidad)')),
+    ('blocked', re.compile(r'^(almuerzo|colacion|pausa|descanso|bloqueado)')),
+    ('timezone', re.compile(r'^(zona horaria|huso horario|time ?zone)')),
+)
+
+def _fold(text: str) -> str:
+    decomposed = unicodedata.normalize('NFKD', text.lower())
+    return ''.join(c for c in decomposed if not unicodedata.combining(c))
+
+def _minutes(hour: str, minute: str | None, suffix: str | None) -> int:
+    h = int(hour)
+    if suffix == 'pm' and h < 12:
+        h += 12
+    elif suffix == 'am' and h == 12:
+        h = 0
+    return min(h * 60 + int(minute or 0), 24 * 60)
+
+def _time_ranges(text: str) -> list[tuple[int, int]]:
+    ranges = list()
+    for h1, m1, s1, h2, m2, s2 in TIME_RANGE_RX.findall(text):
+        start, end = _minutes(h1, m1, s1 or None), _minutes(h2, m2, s2 or None)
+        if start < end:
+            ranges.append((start, end))
+    return ranges
+
+def _days(text: str) -> set[int]:
+    days = set()
+    for first, last in DAY_RANGE_RX.findall(text):
+        a, b = DAY_NAMES[first], DAY_NAMES[last]
+        days.update(range(a, b + 1) if a <= b else (*range(a, 7), *range(0, b + 1)))
+    days.update(DAY_NAMES[d] for d in DAY_WORD_RX.findall(DAY_RANGE_RX.sub(' ', text)))
+    return days
+
+def _subtract(intervals: list[tuple[int, int]], start: int, end: int) -> list[tuple[int, int]]:
+    result = list()
+    for a, b in intervals:
+        if end <= a or start >= b:
+            result.append((a, b))
+            continue
+        if a < start:
+            result.append((a, start))
+        if end < b:
+            result.append((end, b))
+    return result
+
+def _hhmm(minutes: int) -> str:
+    return f'{minutes // 60:02d}:{minutes % 60:02d}'
+
+@dataclass(frozen=True, slots=True)
+class CalendarRules:
+    """Weekly availability compiled from free-text `calendar_rules` (local times)."""
+    timezone: str
+    days: tuple
+    unparsed: tuple = ()
+    assumptions: tuple = ()
+
+    def mask(self) -> list[str]:
+        """Per-day bitmask (bit i = slot i of SLOT_MINUTES) as hex strings, Monday first."""
+        masks = list()
+        for intervals in self.days:
+            bits = 0
+            for start, end in intervals:
+                for slot in range(start // SLOT_MINUTES, -(-end // SLOT_MINUTES)):
+                    bits |= 1 << slot
+            masks.append(f'{bits:x}')
+        return masks
+
+    def is_available(self, start: datetime, end: datetime) -> bool:
+        """Whether an aware [start, end) range lies inside the availability of one local day."""
+        tz = ZoneInfo(self.timezone)
+        local_start, local_end = start.astimezone(tz), end.astimezone(tz)
+        if local_start.date() != local_end.date() and local_end.time() != time(0):
+            return False
+        a = local_start.hour * 60 + local_start.minute
+        b = (local_end.hour * 60 + local_end.minute) or 24 * 60
+        return any(s <= a and b <= e for s, e in self.days[local_start.weekday()])
+
+    def to_dict(self) -> dict:
+        return {
+            'timezone': self.timezone,
+            'slot_minutes': SLOT_MINUTES,
+            'days': {
+                WEEKDAYS[i]: [[_hhmm(a), _hhmm(b)] for a, b in intervals]
+                for i, intervals in enumerate(self.days)
+            },
+            'mask': self.mask(),
+            'unparsed': [{'line': n, 'text': t} for n, t in self.unparsed],
+            'assumptions': list(self.assumptions),
+        }
+
+def compile_calendar_rules(text: str) -> CalendarRules:
+    """Compile rules such as `Horario de atención: 8:00 a 18:00`, `Almuerzo: 14:00 a 15:00`,
+    `Días no disponibles: miércoles`, `No agendar los sábados` and
+    `Zona horaria: America/Santiago`.
+
+    Lines that carry a value but match no rule are returned in `unparsed`; defaults
+    that had to be assumed (workdays, timezone) are listed in `assumptions`; Monday to
+    Friday is only assumed when no line names the available days.
+    """
+    timezone, days_on, days_off = None, set(), set()
+    hours, day_hours, blocked = list(), dict(), list()
+    scheduled, unparsed, assumptions = set(), list(), list()
+
+    for number, raw in enumerate((text or '').splitlines(), start=1):
+        line = raw.strip().lstrip('-*•').strip()
+        folded = _fold(line)
+        label = LABEL_RX.search(folded)
+        if not DIGIT_RX.search(folded) and NEGATION_RX.search(folded) and _days(folded):
+            # Free-form exclusions such as `No agendar los sábados`
+            days_off.update(_days(folded))
+            continue
+        if not label and NEGATION_RX.search(folded) and _time_ranges(folded):
+            # `No agendar viernes 16 a 18` blocks that range on the named days
+            blocked.extend((_days(folded), a, b) for a, b in _time_ranges(folded))
+            continue
+        if not line or folded.endswith(':') or (not label and not _time_ranges(folded)):
+            if line and not folded.endswith(':'):
+                unparsed.append((number, line))
+            continue
+
+        # Unlabelled lines such as `Lunes a viernes de 9:00 a 18:00` are opening hours
+        if label:
+            key, value = folded[:label.start()], folded[label.end():]
+        else:
+            key, value = 'horario', folded
+        kind = next((k for k, rx in RULE_KEYS if rx.search(key.strip())), None)
+        value = value.strip()
+
+        if kind == 'timezone':
+            candidate = LABEL_RX.split(line, maxsplit=1)[-1].strip()
+            try:
+                ZoneInfo(candidate)
+                timezone = candidate
+            except (ZoneInfoNotFoundError, ValueError):
+                unparsed.append((number, line))
+        elif kind in ('days_on', 'days_off') and _days(value):
+            (days_on if kind == 'days_on' else days_off).update(_days(value))
+        elif kind in ('hours', 'blocked', None) and _time_ranges(value):
+            scope = _days(value) | (_days(key) if kind is None else set())
+            if kind is None and not scope:
+                unparsed.append((number, line))
+                continue
+            if kind == 'hours':
+                scheduled |= scope
+            for start, end in _time_ranges(value):
+                if kind == 'blocked':
+                    blocked.append((scope, start, end))
+                elif scope:
+                    for day in scope:
+                        day_hours.setdefault(day, list()).append((start, end))
+                else:
+                    hours.append((start, end))
+        else:
+            unparsed.append((number, line))
+
+    if timezone is None:
+        timezone = DEFAULT_TIMEZONE
+        assumptions.append(f'Zona horaria no indicada, se asume {DEFAULT_TIMEZONE}')
+    if not days_on and not scheduled:
+        days_on = set(DEFAULT_WORKDAYS)
+        assumptions.append('Días disponibles no indicados, se asume lunes a viernes')
+    days_on |= set(day_hours)
+    if not hours and not day_hours:
+        assumptions.append('Horario no indicado, sin disponibilidad')
+
+    days = list()
+    for day in range(7):
+        intervals = list()
+        if day in days_on and day not in days_off:
+            intervals = sorted(day_hours.get(day, hours))
+            for scope, start, end in blocked:
+                if not scope or day in scope:
+                    intervals = _subtract(intervals, start, end)
+        days.append(tuple(intervals))
+    return CalendarRules(timezone, tuple(days), tuple(unparsed), tuple(assumptions))
+
+def client_mirror_blob(client_name) -> str:
+    """Compiled JSON mirror of a client configuration."""
+    return f'{CLIENTS_COMPILED_PREFIX}/{client_name}.json'
+
+def clients_bundle_blob() -> str:
+    """All compiled client configurations in one JSON document."""
+    return f'{CLIENTS_COMPILED_PREFIX}/{CLIENTS_BUNDLE_NAME}'
+
+def _bundle_default() -> dict:
+    return {'version': CLIENTS_BUNDLE_VERSION, 'clients': dict()}
+
+def _mirror(config: ClientConfig) -> dict:
+    """Mirror document: the parsed config plus its compiled calendar rules."""
+    return {**config.to_dict(), 'calendar': compile_calendar_rules(config.calendar_rules).to_dict()}
+
+def compile_client_config(config: ClientConfig):
+    """Write the JSON mirror of one client and merge it into the all-clients bundle."""
+    bucket_name = st.secrets['gcs']['bucket']
+    data = _mirror(config)
+    write_json(bucket_name, client_mirror_blob(config.name), data)
+    update_json(
+        bucket_name, clients_bundle_blob(),
+        lambda bundle: bundle['clients'].update({config.name: data}),
+        default=_bundle_default
+    )
+
+def rebuild_client_mirrors() -> dict[str, str]:
+    """Recompile every client; returns the clients that failed to parse with the reason."""
+    bucket_name = st.secrets['gcs']['bucket']
+    prefetch_client_files()
+    compiled, errors = dict(), dict()
+    for client_name in get_client_files():
+        try:
+            config = load_client_config(client_name)
+        except ClientConfigError as e:
+            errors[client_name] = str(e)
+            continue
+        compiled[client_name] = _mirror(config)
+        write_json(bucket_name, client_mirror_blob(client_name), compiled[client_name])
+    write_json(bucket_name, clients_bundle_blob(), {**_bundle_default(), 'clients': compiled})
+    return errors
 
 def load_client_file(client_name):
     """Load a client configuration file from GCS."""
@@ -11,21 +379,61 @@ def load_client_file(client_name):
         f'clients/{client_name}.py'
     )
 
-def save_client_file(client_name, code):
-    """Save a client configuration file to GCS."""
-    write_text(
+def load_client_file_versioned(client_name) -> tuple[str, int]:
+    """Load a client configuration file from GCS together with its generation."""
+    return read_text_versioned(
         st.secrets['gcs']['bucket'],
-        f'clients/{client_name}.py',
-        code,
-        content_type='text/x-python'
+        f'clients/{client_name}.py'
     )
 
+def save_client_file(client_name, code, if_generation_match: int | None = None) -> WriteResult:
+    """Save a client file, record it in the clients manifest and refresh its JSON mirror.
+
+    The config is parsed first, so an invalid file raises ClientConfigError without
+    writing anything. Calendar rules never block a save: lines the compiler does not
+    understand are reported in the mirror's `unparsed`. PostWriteError (with the
+    WriteResult) means the file was saved but the manifest or mirror update failed.
+    """
+    config = parse_client_config(client_name, code)
+    blob_name = f'clients/{client_name}.py'
+    failure = None
+    try:
+        result = write_text_tracked(
+            st.secrets['gcs']['bucket'],
+            CLIENTS_PREFIX,
+            CLIENT_EXT,
+            blob_name,
+            code,
+            content_type='text/x-python',
+            if_generation_match=if_generation_match
+        )
+    except ManifestUpdateError as e:
+        result, failure = e.result, e
+    if result.written:
+        config = replace(config, generation=result.generation)
+        _config_cache().put(config)
+        try:
+            compile_client_config(config)
+        except Exception as e:
+            failure = failure or PostWriteError(blob_name, result, 'JSON mirror update', e)
+    if failure:
+        raise failure
+    return result
+
 def list_client_files():
-    """List all client configuration files in GCS."""
-    return list_files_with_prefix(
+    """List all client configuration files in GCS (from the clients manifest)."""
+    return list_manifest_files(
+        st.secrets['gcs']['bucket'],
+        CLIENTS_PREFIX,
+        CLIENT_EXT
+    )
+
+def prefetch_client_files(on_progress=None) -> dict:
+    """Load every client configuration file into the blob cache in one concurrent pass."""
+    return prefetch_blobs(
         st.secrets['gcs']['bucket'],
-        'clients',
-        '.py'
+        list_client_files(),
+        on_progress=on_progress
     )
 
 def get_client_files():
@@ -61,6 +469,6 @@ CLIENT_CONFIG = {{
     """
 }}'''.format(client_name=client_name)
     
-    save_client_file(client_name, template)
+    save_client_file(client_name, template, if_generation_match=0)
     return template
 
@@ -2,7 +2,16 @@
 
 import streamlit as st
 
-from src.gcs import read_json, write_json
+import json
+
+from src.gcs import (
+    read_json, read_text_versioned, write_json, write_text, WriteResult, JSON_UPDATE_RETRIES
+)
+from src.domains import DomainMatcher, domain_rules
+from src.jsonpatch import apply_patch
+from src.storage import PreconditionFailed
+
+DOMAIN_MATCHER_SUFFIX = '.domains.json'
 
 def load_config():
     """Load configuration from GCS."""
@@ -11,10 +20,61 @@ def load_config():
         st.secrets['gcs']['config_file']
     )
 
-def save_config(data: dict):
+def save_config(data: dict) -> WriteResult:
     """Save configuration to GCS."""
-    write_json(
+    return write_json(
         st.secrets['gcs']['bucket'],
         st.secrets['gcs']['config_file'],
         data
     )
+
+def load_config_versioned() -> tuple[dict, int]:
+    """Load the configuration together with its generation."""
+    text, generation = read_text_versioned(
+        st.secrets['gcs']['bucket'],
+        st.secrets['gcs']['config_file']
+    )
+    return json.loads(text), generation
+
+def patch_config(
+    ops,
+    base: tuple[dict, int] | None = None,
+    retries: int = JSON_UPDATE_RETRIES
+) -> tuple[dict, WriteResult]:
+    """Apply a JSON Patch to the configuration under a generation precondition.
+
+    `ops` is a list of patch ops or a callable building them from the current document (for
+    index-based ops). `base` is the (document, generation) the caller already holds; the
+    config is only re-read when that generation turns out to be stale. Returns the stored
+    document and the write result; raises PatchError when the patch no longer applies and
+    PreconditionFailed after `retries` concurrent updates.
+    """
+    bucket_name = st.secrets['gcs']['bucket']
+    blob_name = st.secrets['gcs']['config_file']
+    for _ in range(retries):
+        doc, generation = base if base is not None else load_config_versioned()
+        new = apply_patch(doc, ops(doc) if callable(ops) else ops)
+        result = write_json(bucket_name, blob_name, new, if_generation_match=generation)
+        if not result.conflict:
+            return new, result
+        base = None
+    raise PreconditionFailed(f'{bucket_name}/{blob_name}: too many concurrent updates')
+
+def domain_matcher_blob() -> str:
+    """Blob holding the compiled domain matcher, next to the config file."""
+    return st.secrets['gcs']['config_file'].removesuffix('.json') + DOMAIN_MATCHER_SUFFIX
+
+def publish_domain_matcher(automation: dict, source_generation: int | None) -> DomainMatcher:
+    """Compile the automation/draft lists and their subdomain rules into the matcher artifact."""
+    matcher = DomainMatcher.compile(
+        domain_rules(automation, 'automationlist'),
+        domain_rules(automation, 'draftlist'),
+        source_generation=source_generation
+    )
+    write_text(
+        st.secrets['gcs']['bucket'],
+        domain_matcher_blob(),
+        matcher.dumps(),
+        content_type='application/json'
+    )
+    return matcher
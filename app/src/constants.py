@@ -0,0 +1,6 @@
+# app/src/constants.py
+
+# Constants shared by modules that must not depend on streamlit or the storage stack
+
+# Timezone assumed for clients whose calendar rules do not name one
+DEFAULT_TIMEZONE = 'America/Santiago'
@@ -0,0 +1,303 @@
+# app/src/domains.py
+
+import csv
+import io
+import json
+import re
+
+AUTOMATION = 'automation'
+DRAFT = 'draft'
+WILDCARD_PREFIX = '*.'
+MATCHER_VERSION = 1
+# Subdomain rules are stored apart from the exact lists, which other consumers of the
+# admin config match literally: `{"draftlist_subdomains": ["example.com"]}` is shown
+# and matched as `*.example.com`
+SUBDOMAIN_KEYS = {
+    'automationlist': 'automationlist_subdomains',
+    'draftlist': 'draftlist_subdomains',
+}
+
+def normalize_domain(value: str) -> str:
+    """Lower-case a domain (or the domain part of an email) and strip surrounding dots."""
+    if '@' in value:
+        value = value.rsplit('@', 1)[-1]
+    return value.strip().lower().strip('.')
+
+def reverse_labels(domain: str) -> str:
+    """`mail.example.com` -> `com.example.mail`, so shared suffixes sort together."""
+    return '.'.join(reversed(domain.split('.')))
+
+def split_wildcards(domains) -> tuple[set[str], set[str]]:
+    """(exact domains, suffixes of `*.` rules without the prefix)."""
+    exact, suffixes = set(), set()
+    for domain in domains:
+        if domain.startswith(WILDCARD_PREFIX):
+            suffixes.add(domain.removeprefix(WILDCARD_PREFIX))
+        else:
+            exact.add(domain)
+    return exact, suffixes
+
+def domain_rules(automation: dict, list_key: str) -> list[str]:
+    """Exact entries of `list_key` plus its subdomain rules in `*.` form."""
+    suffixes = automation.get(SUBDOMAIN_KEYS[list_key], list())
+    return list(automation.get(list_key, list())) + [WILDCARD_PREFIX + s for s in suffixes]
+
+class DomainMatcher:
+    """Classify a sender domain against the automation and draft lists.
+
+    Entries are exact domains (`example.com`) or wildcard subdomain rules (`*.example.com`,
+    matching any subdomain but not the apex). Lookups hash at most one key per label, so
+    cost depends on the label count of the domain, not on the list sizes. Exact entries win
+    over wildcards, the most specific wildcard wins, and draft wins over automation when
+    both lists hold the same rule.
+    """
+
+    __slots__ = ('exact', 'wildcard', 'overlaps', 'source_generation')
+
+    def __init__(
+        self,
+        exact: dict[str, str],
+        wildcard: dict[str, str],
+        overlaps: list[dict] | None = None,
+        source_generation: int | None = None
+    ):
+        self.exact = exact
+        self.wildcard = wildcard
+        self.overlaps = overlaps or list()
+        self.source_generation = source_generation
+
+    @classmethod
+    def compile(
+        cls,
+        automationlist: list[str],
+        draftlist: list[str],
+        source_generation: int | None = None
+    ) -> 'DomainMatcher':
+        """Build a matcher from the raw lists, recording rules present in both lists."""
+        exact, wildcard, overlaps = dict(), dict(), list()
+
+        for list_name, domains in ((AUTOMATION, automationlist), (DRAFT, draftlist)):
+            for raw in domains:
+                domain = normalize_domain(raw)
+                is_wildcard = domain.startswith(WILDCARD_PREFIX)
+                target = wildcard if is_wildcard else exact
+                key = domain.removeprefix(WILDCARD_PREFIX)
+                if not key:
+                    continue
+                if target.get(key, list_name) != list_name:
+                    overlaps.append({'domain': domain, 'automation': domain, 'draft': domain})
+                    target[key] = DRAFT
+                else:
+                    target[key] = list_name
+
+        matcher = cls(exact, wildcard, overlaps, source_generation)
+        for domain, list_name in exact.items():
+            covering = matcher._wildcard_match(domain)
+            if covering is not None and covering[1] != list_name:
+                rule = WILDCARD_PREFIX + covering[0]
+                overlaps.append({
+                    'domain': domain,
+                    AUTOMATION: domain if list_name == AUTOMATION else rule,
+                    DRAFT: domain if list_name == DRAFT else rule,
+                })
+        return matcher
+
+    def _wildcard_match(self, domain: str) -> tuple[str, str] | None:
+        """Most specific wildcard rule covering `domain`: (suffix, list name)."""
+        if not self.wildcard:
+            return None
+        labels = domain.split('.')
+        for i in range(1, len(labels)):
+            suffix = '.'.join(labels[i:])
+            list_name = self.wildcard.get(suffix)
+            if list_name is not None:
+                return suffix, list_name
+        return None
+
+    def classify(self, value: str) -> str | None:
+        """Return `automation`, `draft` or None for a domain or email address."""
+        domain = normalize_domain(value)
+        list_name = self.exact.get(domain)
+        if list_name is not None:
+            return list_name
+        match = self._wildcard_match(domain)
+        return match[1] if match is not None else None
+
+    def to_dict(self) -> dict:
+        """Serialize as sorted arrays keyed by reversed labels (binary-searchable)."""
+        return {
+            'version': MATCHER_VERSION,
+            'source_generation': self.source_generation,
+            'exact': sorted([reverse_labels(d), x] for d, x in self.exact.items()),
+            'wildcard': sorted([reverse_labels(d), x] for d, x in self.wildcard.items()),
+            'overlaps': self.overlaps,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'DomainMatcher':
+        if data.get('version') != MATCHER_VERSION:
+            raise ValueError(f"Unsupported matcher version: {data.get('version')}")
+        return cls(
+            {reverse_labels(k): v for k, v in data['exact']},
+            {reverse_labels(k): v for k, v in data['wildcard']},
+            data.get('overlaps'),
+            data.get('source_generation')
+        )
+
+    def dumps(self) -> str:
+        return json.dumps(self.to_dict(), separators=(',', ':'))
+
+    @classmethod
+    def loads(cls, text: str) -> 'DomainMatcher':
+        return cls.from_dict(json.loads(text))
+
+def load_matcher(path: str) -> DomainMatcher:
+    """Load a compiled matcher artifact from a local file."""
+    with open(path, encoding='utf-8') as f:
+        return DomainMatcher.loads(f.read())
+
+class StagedDomainList:
+    """A domain list with staged additions and removals, committed with a single save.
+
+    The effective list is kept sorted and cached, so filtering and paging touch only the
+    visible page instead of re-deriving the list on every rerun.
+    """
+
+    def __init__(self, domains: list[str]):
+        self.base = set(domains)
+        self.added = set()
+        self.removed = set()
+        self._items = None
+        self._search = (None, None)
+        self.version = 0
+
+    def __contains__(self, domain: str) -> bool:
+        return domain in self.added or (domain in self.base and domain not in self.removed)
+
+    def __len__(self) -> int:
+        return len(self.items())
+
+    def _changed(self):
+        self.version += 1
+        self._items = None
+        self._search = (None, None)
+
+    def add(self, domain: str) -> bool:
+        """Stage `domain` for addition; returns False when already present."""
+        if domain in self:
+            return False
+        if domain in self.removed:
+            self.removed.discard(domain)
+        else:
+            self.added.add(domain)
+        self._changed()
+        return True
+
+    def remove(self, domain: str) -> bool:
+        """Stage `domain` for removal; returns False when not present."""
+        if domain not in self:
+            return False
+        if domain in self.added:
+            self.added.discard(domain)
+        else:
+            self.removed.add(domain)
+        self._changed()
+        return True
+
+    def items(self) -> list[str]:
+        """Sorted effective list (base plus staged changes)."""
+        if self._items is None:
+            self._items = sorted((self.base - self.removed) | self.added)
+        return self._items
+
+    def search(self, query: str) -> list[str]:
+        """Sorted domains containing `query` (cached for the last query)."""
+        query = (query or '').strip().lower()
+        if not query:
+            return self.items()
+        if self._search[0] != query:
+            self._search = (query, [d for d in self.items() if query in d])
+        return self._search[1]
+
+    @property
+    def pending(self) -> int:
+        return len(self.added) + len(self.removed)
+
+    def discard(self):
+        """Drop every staged change."""
+        self.added.clear()
+        self.removed.clear()
+        self._changed()
+
+    def reset(self, domains: list[str]):
+        """Replace the base list (e.g. with the stored one) and drop staged changes."""
+        self.base = set(domains)
+        self.added.clear()
+        self.removed.clear()
+        self._changed()
+
+def parse_domain_import(
+    text: str,
+    pattern: re.Pattern,
+    target: StagedDomainList,
+    other: StagedDomainList,
+    target_name: str | None = None
+) -> dict:
+    """Validate and classify pasted or CSV domains in one pass.
+
+    Cells may be separated by commas, semicolons or whitespace; email addresses are reduced
+    to their domain. A CSV with a `domain` header (as produced by `export_domain_lists`)
+    only contributes that column; when it also has a `list` column, rows of a list other
+    than `target_name` are skipped. Returns `added`, `moved` (present in the other list),
+    `skipped` (already in the target list, repeated or exported from the other list) and
+    `invalid` lists.
+    """
+    plan = {'added': list(), 'moved': list(), 'skipped': list(), 'invalid': list()}
+    seen = set()
+    rows = list(csv.reader(io.StringIO(text)))
+    if rows and rows[0] and rows[0][0].strip().lower() == 'domain':
+        header = [cell.strip().lower() for cell in rows[0]]
+        list_col = header.index('list') if 'list' in header else None
+        selected = list()
+        for row in rows[1:]:
+            if not row:
+                continue
+            has_list = list_col is not None and len(row) > list_col
+            row_list = row[list_col].strip().lower() if has_list else ''
+            if target_name and row_list and row_list != target_name:
+                plan['skipped'].append(row[0].strip().lower())
+                continue
+            selected.append(row[:1])
+        rows = selected
+    for line in rows:
+        for cell in line:
+            for raw in re.split(r'[\s;]+', cell):
+                raw = raw.strip().strip('\'"')
+                if not raw:
+                    continue
+                domain = raw.rsplit('@', 1)[-1].lower().strip('.')
+                if not pattern.match(domain):
+                    plan['invalid'].append(raw)
+                elif domain in seen or domain in target:
+                    plan['skipped'].append(domain)
+                elif domain in other:
+                    plan['moved'].append(domain)
+                else:
+                    plan['added'].append(domain)
+                seen.add(domain)
+    return plan
+
+def export_domain_lists(automationlist: list[str], draftlist: list[str]) -> str:
+    """CSV with one `domain,list,match` row per entry of both lists.
+
+    `match` is `subdomains` for `*.` rules and `exact` otherwise; the domain column keeps
+    the `*.` prefix so the file imports back unchanged.
+    """
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(['domain', 'list', 'match'])
+    for list_name, domains in ((AUTOMATION, automationlist), (DRAFT, draftlist)):
+        for domain in domains:
+            match = 'subdomains' if domain.startswith(WILDCARD_PREFIX) else 'exact'
+            writer.writerow([domain, list_name, match])
+    return out.getvalue()
@@ -4,69 +4,456 @@ import streamlit as st
 
 from google.auth.transport import requests as google_requests
 from google.oauth2 import service_account
-from google.cloud import storage
+from google.auth import jwt
+import google_crc32c
 
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Iterator
+import threading
+import base64
 import json
+import time
 
-def _client() -> storage.Client:
-    """Create a Google Cloud Storage client."""
-    if st.secrets['env']['mode'] == 'cloud':
-        return storage.Client(credentials=service_account.Credentials.from_service_account_info(
-            st.secrets['gcp_credentials']
-        ))
-    return storage.Client()
+from src.storage import (
+    StorageBackend, BlobInfo, NotFound, PreconditionFailed, LIST_PAGE_SIZE,
+    get_backend, backend_builds, md5_b64
+)
+
+CACHE_TTL_SECONDS = 5.0
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+PREFETCH_WORKERS = 16
+JSON_UPDATE_RETRIES = 5
+ID_TOKEN_REFRESH_MARGIN = 300
+ID_TOKEN_RETRY_SECONDS = 30
+ID_TOKEN_MIN_VALIDITY = 60
+
+WRITE_WRITTEN = 'written'
+WRITE_SKIPPED = 'skipped'
+WRITE_CONFLICT = 'conflict'
+
+def _backend() -> StorageBackend:
+    """Return the shared storage backend (Cloud Storage, memory or local directory)."""
+    return get_backend()
+
+def pool_stats() -> dict:
+    """Report reuse of the shared storage backend and its HTTP connection pool."""
+    return {**_backend().stats(), 'client_misses': backend_builds()}
+
+class _CacheEntry:
+    """Cached blob content with the generation it was downloaded at."""
+    __slots__ = ('data', 'generation', 'checked_at')
+
+    def __init__(self, data: bytes, generation: int, checked_at: float):
+        self.data = data
+        self.generation = generation
+        self.checked_at = checked_at
+
+class _BlobCache:
+    """Thread-safe LRU cache of blob contents, bounded by total size in bytes."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'revalidated': 0, 'downloads': 0, 'evictions': 0}
+
+    def get(self, key: tuple) -> _CacheEntry | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: tuple, data: bytes, generation: int):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old.data)
+            if len(data) > self.max_bytes:
+                return
+            self._entries[key] = _CacheEntry(data, generation, time.monotonic())
+            self._size += len(data)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted.data)
+                self._stats['evictions'] += 1
+
+    def invalidate(self, key: tuple):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._size -= len(entry.data)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def count(self, stat: str):
+        with self._lock:
+            self._stats[stat] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, 'entries': len(self._entries), 'bytes': self._size}
+
+@st.cache_resource(show_spinner=False)
+def _blob_cache() -> _BlobCache:
+    """Return the process-wide blob cache shared by all sessions."""
+    return _BlobCache(int(st.secrets['gcs'].get('cache_max_bytes', CACHE_MAX_BYTES)))
+
+def _cache_ttl() -> float:
+    """Seconds during which a cached blob is served without revalidation."""
+    return float(st.secrets['gcs'].get('cache_ttl_seconds', CACHE_TTL_SECONDS))
+
+def cache_stats() -> dict:
+    """Report hits, revalidations, downloads and size of the blob cache."""
+    return _blob_cache().stats()
+
+def clear_cache():
+    """Drop every cached blob."""
+    _blob_cache().clear()
+
+def _fetch(
+    cache: _BlobCache,
+    backend: StorageBackend,
+    bucket_name: str,
+    blob_name: str,
+    ttl: float
+) -> tuple[bytes, int]:
+    """Serve a blob from `cache` when fresh, revalidating by generation, else download it."""
+    key = (bucket_name, blob_name)
+    entry = cache.get(key)
+
+    if entry is not None and time.monotonic() - entry.checked_at < ttl:
+        cache.count('hits')
+        return entry.data, entry.generation
+
+    if entry is not None:
+        info = backend.stat(bucket_name, blob_name)
+        if info is None:
+            cache.invalidate(key)
+            raise NotFound(f'{bucket_name}/{blob_name}')
+        if info.generation == entry.generation:
+            entry.checked_at = time.monotonic()
+            cache.count('revalidated')
+            return entry.data, entry.generation
+
+    data, generation = backend.download(bucket_name, blob_name)
+    cache.count('downloads')
+    cache.put(key, data, generation)
+    return data, generation
+
+def _read_bytes(bucket_name: str, blob_name: str) -> tuple[bytes, int]:
+    """Read-through cached download, validated against the blob generation."""
+    return _fetch(_blob_cache(), _backend(), bucket_name, blob_name, _cache_ttl())
+
+def prefetch_blobs(
+    bucket_name: str,
+    blob_names: list[str],
+    max_workers: int = PREFETCH_WORKERS,
+    on_progress=None
+) -> dict[str, Exception]:
+    """Load `blob_names` into the blob cache concurrently on a bounded thread pool.
+
+    `on_progress(done, total, blob_name)` is called from the calling thread as downloads
+    complete. Returns the blobs that failed, mapped to their error.
+    """
+    if not blob_names:
+        return dict()
+
+    # Resolve Streamlit-managed resources here: worker threads have no script context.
+    cache, backend, ttl = _blob_cache(), _backend(), _cache_ttl()
+    errors = dict()
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(blob_names))) as pool:
+        futures = {
+            pool.submit(_fetch, cache, backend, bucket_name, name, ttl): name
+            for name in blob_names
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            name = futures[future]
+            if future.exception() is not None:
+                errors[name] = future.exception()
+            if on_progress:
+                on_progress(done, len(blob_names), name)
+
+    return errors
+
+def prefetch_prefix(
+    bucket_name: str,
+    prefix: str,
+    extension: str = '',
+    max_workers: int = PREFETCH_WORKERS,
+    on_progress=None
+) -> dict[str, Exception]:
+    """List every blob under `prefix` ending in `extension` and load them into the cache."""
+    return prefetch_blobs(
+        bucket_name,
+        list_files_with_prefix(bucket_name, prefix, extension),
+        max_workers=max_workers,
+        on_progress=on_progress
+    )
+
+@dataclass(frozen=True)
+class WriteResult:
+    """Outcome of a conditional write: `written`, `skipped` (unchanged) or `conflict`."""
+    status: str
+    generation: int | None = None
+
+    @property
+    def written(self) -> bool:
+        return self.status == WRITE_WRITTEN
+
+    @property
+    def skipped(self) -> bool:
+        return self.status == WRITE_SKIPPED
+
+    @property
+    def conflict(self) -> bool:
+        return self.status == WRITE_CONFLICT
+
+def _same_content(info: BlobInfo, data: bytes) -> bool:
+    """Compare local content against the stored MD5 (or CRC32C for composite objects)."""
+    if info.md5_hash:
+        return info.md5_hash == md5_b64(data)
+    if info.crc32c:
+        checksum = google_crc32c.Checksum(data).digest()
+        return info.crc32c == base64.b64encode(checksum).decode()
+    return False
 
 def read_text(bucket_name: str, blob_name: str) -> str:
     """Read text from a blob in a Google Cloud Storage bucket."""
-    blob = _client().bucket(bucket_name).blob(blob_name)
-    return blob.download_as_text()
+    return _read_bytes(bucket_name, blob_name)[0].decode('utf-8')
+
+def read_text_versioned(bucket_name: str, blob_name: str) -> tuple[str, int]:
+    """Read text from a blob together with the generation it was read at."""
+    data, generation = _read_bytes(bucket_name, blob_name)
+    return data.decode('utf-8'), generation
+
+def read_bytes(bucket_name: str, blob_name: str) -> bytes:
+    """Read raw bytes from a blob (through the blob cache)."""
+    return _read_bytes(bucket_name, blob_name)[0]
 
 def write_text(
     bucket_name: str,
     blob_name: str,
     content: str,
-    content_type: str = 'application/json'
-):
-    """Write text to a blob in a Google Cloud Storage bucket."""
-    blob = _client().bucket(bucket_name).blob(blob_name)
-    blob.upload_from_string(content, content_type=content_type)
+    content_type: str = 'application/json',
+    if_generation_match: int | None = None
+) -> WriteResult:
+    """Write text to a blob, skipping unchanged content and failing fast on concurrent edits.
+
+    `if_generation_match` is the generation the caller based its edit on (0 for a new blob).
+    When omitted, the generation observed right before uploading is used as precondition.
+    """
+    return write_bytes(
+        bucket_name, blob_name, content.encode('utf-8'), content_type, if_generation_match
+    )
+
+def write_bytes(
+    bucket_name: str,
+    blob_name: str,
+    data: bytes,
+    content_type: str = 'application/octet-stream',
+    if_generation_match: int | None = None
+) -> WriteResult:
+    """Write raw bytes to a blob with the same skip/conflict semantics as `write_text`."""
+    key = (bucket_name, blob_name)
+    cache = _blob_cache()
+    backend = _backend()
+
+    current = backend.stat(bucket_name, blob_name)
+    if current is None:
+        if if_generation_match:
+            cache.invalidate(key)
+            return WriteResult(WRITE_CONFLICT)
+        expected = 0
+    else:
+        if _same_content(current, data):
+            cache.put(key, data, current.generation)
+            return WriteResult(WRITE_SKIPPED, current.generation)
+        if if_generation_match is not None and current.generation != if_generation_match:
+            cache.invalidate(key)
+            return WriteResult(WRITE_CONFLICT, current.generation)
+        expected = current.generation
+
+    try:
+        info = backend.upload(
+            bucket_name, blob_name, data, content_type, if_generation_match=expected
+        )
+    except PreconditionFailed:
+        cache.invalidate(key)
+        return WriteResult(WRITE_CONFLICT)
+
+    cache.put(key, data, info.generation)
+    return WriteResult(WRITE_WRITTEN, info.generation)
+
+def stat_blob(bucket_name: str, blob_name: str) -> BlobInfo | None:
+    """Return blob metadata (a cheap metadata request), or None when it does not exist."""
+    return _backend().stat(bucket_name, blob_name)
+
+def delete_blob(bucket_name: str, blob_name: str, if_generation_match: int | None = None):
+    """Delete a blob and drop it from the blob cache."""
+    _blob_cache().invalidate((bucket_name, blob_name))
+    _backend().delete(bucket_name, blob_name, if_generation_match=if_generation_match)
 
 def read_json(bucket_name: str, blob_name: str) -> dict:
     """Read JSON from a blob in a Google Cloud Storage bucket."""
     return json.loads(read_text(bucket_name, blob_name))
 
-def write_json(bucket_name: str, blob_name: str, content: dict):
+def write_json(
+    bucket_name: str,
+    blob_name: str,
+    content: dict,
+    if_generation_match: int | None = None
+) -> WriteResult:
     """Write JSON to a blob in a Google Cloud Storage bucket."""
-    write_text(
+    return write_text(
         bucket_name,
         blob_name,
         json.dumps(content, indent=4),
-        content_type='application/json'
+        content_type='application/json',
+        if_generation_match=if_generation_match
     )
 
+def update_json(
+    bucket_name: str,
+    blob_name: str,
+    mutate,
+    default=None,
+    retries: int = JSON_UPDATE_RETRIES
+) -> dict:
+    """Read-modify-write a JSON blob under a generation precondition, retrying on conflicts.
+
+    `mutate(content)` edits the document in place; `default()` builds it when the blob does
+    not exist yet (otherwise NotFound is raised). Returns the stored document.
+    """
+    for _ in range(retries):
+        try:
+            text, generation = read_text_versioned(bucket_name, blob_name)
+            content = json.loads(text)
+        except NotFound:
+            if default is None:
+                raise
+            content, generation = default(), 0
+        mutate(content)
+        if not write_json(bucket_name, blob_name, content, if_generation_match=generation).conflict:
+            return content
+    raise PreconditionFailed(f'{bucket_name}/{blob_name}: too many concurrent updates')
+
+def iter_blobs(
+    bucket_name: str,
+    prefix: str,
+    extension: str = '',
+    page_size: int = LIST_PAGE_SIZE
+) -> Iterator[BlobInfo]:
+    """Stream blob metadata under `prefix`, fetching pages lazily with only the needed fields."""
+    yield from _backend().iter_blobs(bucket_name, prefix, extension, page_size=page_size)
+
+def iter_files_with_prefix(bucket_name: str, prefix: str, extension: str) -> Iterator[str]:
+    """Stream blob names under `prefix` ending in `extension`."""
+    for info in iter_blobs(bucket_name, prefix, extension):
+        yield info.name
+
 def list_files_with_prefix(bucket_name: str, prefix: str, extension: str) -> list[str]:
     """List files in a Google Cloud Storage bucket with a specific prefix."""
-    return [
-        blob.name for blob in _client().bucket(bucket_name).list_blobs(prefix=prefix)
-        if blob.name.endswith(extension)
-    ]
+    return list(iter_files_with_prefix(bucket_name, prefix, extension))
+
+def list_dir(
+    bucket_name: str,
+    prefix: str,
+    extension: str = ''
+) -> tuple[list[str], list[BlobInfo]]:
+    """List one directory level: returns (sub-folder prefixes, files directly under `prefix`)."""
+    prefix = prefix.rstrip('/') + '/' if prefix else ''
+    return _backend().list_dir(bucket_name, prefix, extension)
 
 def get_id_token_audience(service_url: str) -> str:
     """Extracts audience for ID token from service URL."""
     return service_url if service_url.startswith('https://') else f'https://{service_url}'
 
-def fetch_id_token(service_url: str) -> str:
-    """Generate and cache an ID token using service account credentials."""
-    key = f'_id_token::{service_url}'
-    if key in st.session_state:
-        return st.session_state[key]
-
-    credentials = service_account.IDTokenCredentials.from_service_account_info(
-        st.secrets['gcp_credentials'],
-        target_audience=get_id_token_audience(service_url)
-    )
+class _IdTokenCache:
+    """Process-wide ID tokens per audience, refreshed ahead of expiry on background threads."""
+
+    def __init__(self, service_account_info: dict):
+        self._info = dict(service_account_info)
+        self._tokens = dict()
+        self._locks = dict()
+        self._refreshers = set()
+        self._lock = threading.Lock()
 
-    credentials.refresh(google_requests.Request())
-    st.session_state[key] = credentials.token
+    def _audience_lock(self, audience: str) -> threading.Lock:
+        with self._lock:
+            return self._locks.setdefault(audience, threading.Lock())
+
+    def _fresh(self, audience: str, margin: float) -> tuple[str, float] | None:
+        current = self._tokens.get(audience)
+        if current is not None and current[1] - time.time() > margin:
+            return current
+        return None
+
+    def _refresh(self, audience: str, margin: float) -> tuple[str, float]:
+        """Mint a token unless another caller already did (single-flight per audience)."""
+        with self._audience_lock(audience):
+            current = self._fresh(audience, margin)
+            if current is not None:
+                return current
+            credentials = service_account.IDTokenCredentials.from_service_account_info(
+                self._info,
+                target_audience=audience
+            )
+            credentials.refresh(google_requests.Request())
+            exp = jwt.decode(credentials.token, verify=False)['exp']
+            self._tokens[audience] = (credentials.token, float(exp))
+            return self._tokens[audience]
+
+    def _refresh_loop(self, audience: str):
+        while True:
+            _, exp = self._tokens[audience]
+            time.sleep(max(exp - ID_TOKEN_REFRESH_MARGIN - time.time(), 0))
+            try:
+                self._refresh(audience, ID_TOKEN_REFRESH_MARGIN)
+            except Exception:
+                time.sleep(ID_TOKEN_RETRY_SECONDS)
+
+    def _ensure_refresher(self, audience: str):
+        with self._lock:
+            if audience in self._refreshers:
+                return
+            self._refreshers.add(audience)
+        threading.Thread(
+            target=self._refresh_loop, args=(audience,), name='id-token-refresh', daemon=True
+        ).start()
+
+    def get(self, audience: str) -> str:
+        """Return a token valid for at least a minute, minting synchronously when needed."""
+        current = (
+            self._fresh(audience, ID_TOKEN_MIN_VALIDITY)
+            or self._refresh(audience, ID_TOKEN_MIN_VALIDITY)
+        )
+        self._ensure_refresher(audience)
+        return current[0]
+
+    def warm(self, audience: str):
+        """Mint the first token for `audience` in the background."""
+        if self._fresh(audience, ID_TOKEN_MIN_VALIDITY) is None:
+            threading.Thread(
+                target=self.get, args=(audience,), name='id-token-warm', daemon=True
+            ).start()
+
+@st.cache_resource(show_spinner=False)
+def _id_token_cache() -> _IdTokenCache:
+    """Return the process-wide ID token cache."""
+    return _IdTokenCache(st.secrets['gcp_credentials'])
+
+def fetch_id_token(service_url: str) -> str:
+    """Return a cached ID token for the service, refreshed ahead of expiry in the background."""
+    return _id_token_cache().get(get_id_token_audience(service_url))
 
-    return credentials.token
+def warm_id_token(service_url: str):
+    """Start minting the service ID token in the background so the first request does not wait."""
+    _id_token_cache().warm(get_id_token_audience(service_url))
@@ -0,0 +1,98 @@
+# app/src/history.py
+
+import streamlit as st
+
+from datetime import datetime, timezone
+import difflib
+import hashlib
+
+from src.gcs import read_text, read_json, stat_blob, write_text, update_json
+from src.storage import NotFound
+
+HISTORY_FOLDER = 'history'
+HISTORY_VERSION = 1
+
+def history_folder() -> str:
+    """Bucket folder holding version objects and indexes (outside the prompts folder)."""
+    return st.secrets['gcs'].get('history_folder', HISTORY_FOLDER).rstrip('/')
+
+def content_digest(content: str) -> str:
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+def object_blob(digest: str) -> str:
+    """Content-addressed blob for a version, fanned out by the first two hex digits."""
+    return f'{history_folder()}/objects/{digest[:2]}/{digest}'
+
+def index_blob(blob_name: str) -> str:
+    """Per-file history index blob."""
+    return f'{history_folder()}/index/{blob_name}.json'
+
+def _store_object(bucket_name: str, content: str) -> str:
+    """Store `content` once under its digest; identical content is never uploaded twice."""
+    digest = content_digest(content)
+    name = object_blob(digest)
+    if stat_blob(bucket_name, name) is None:
+        write_text(bucket_name, name, content, content_type='text/plain', if_generation_match=0)
+    return digest
+
+def _version(digest: str, content: str, generation: int | None, author: str | None) -> dict:
+    return {
+        'sha256': digest,
+        'size': len(content.encode('utf-8')),
+        'generation': generation,
+        'author': author,
+        'saved_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+    }
+
+def record_version(
+    bucket_name: str,
+    blob_name: str,
+    content: str,
+    generation: int | None = None,
+    author: str | None = None,
+    baseline: str | None = None
+) -> dict:
+    """Append a saved version of `blob_name` to its history index.
+
+    `baseline` is the content the edit started from; it seeds the index the first time a
+    file gets history, so the pre-history version can be restored too.
+    """
+    digest = _store_object(bucket_name, content)
+    entry = _version(digest, content, generation, author)
+
+    seed = list()
+    if baseline is not None and baseline != content:
+        seed.append(_version(_store_object(bucket_name, baseline), baseline, None, None))
+
+    def _append(index: dict):
+        versions = index['versions']
+        if not versions or versions[-1]['sha256'] != digest:
+            versions.append(entry)
+
+    return update_json(
+        bucket_name,
+        index_blob(blob_name),
+        _append,
+        default=lambda: {'version': HISTORY_VERSION, 'blob': blob_name, 'versions': list(seed)}
+    )
+
+def load_history(bucket_name: str, blob_name: str) -> list[dict]:
+    """Versions of `blob_name`, newest first (reads only the index)."""
+    try:
+        index = read_json(bucket_name, index_blob(blob_name))
+    except NotFound:
+        return list()
+    return list(reversed(index['versions']))
+
+def load_version(bucket_name: str, digest: str) -> str:
+    """Content of a stored version."""
+    return read_text(bucket_name, object_blob(digest))
+
+def diff_versions(old: str, new: str, old_label: str, new_label: str) -> str:
+    """Unified line diff between two versions."""
+    return ''.join(difflib.unified_diff(
+        old.splitlines(keepends=True),
+        new.splitlines(keepends=True),
+        fromfile=old_label,
+        tofile=new_label
+    ))
@@ -0,0 +1,213 @@
+# app/src/intervals.py
+
+import numpy as np
+import pandas as pd
+
+from datetime import datetime, timezone, tzinfo
+from zoneinfo import ZoneInfo
+import re
+
+from src.constants import DEFAULT_TIMEZONE
+
+MEETING_MINUTES = 30
+HEATMAP_BIN_MINUTES = 30
+NS_PER_MINUTE = 60 * 10**9
+SLOT_RX = re.compile(
+    r'(\d{4}-\d{2}-\d{2})[ T](\d{1,2}:\d{2})(?::\d{2})?(Z|[+-]\d{2}:?\d{2})?'
+    r'(?:\s*(?:-|–|a|to)\s*(\d{1,2}:\d{2}))?'
+)
+
+def parse_minutes(values) -> np.ndarray:
+    """ISO-8601 strings (any offset) to int64 minutes since the epoch, parsed in one pass.
+
+    Unparseable values become -1.
+    """
+    parsed = pd.to_datetime(
+        pd.Series(values, dtype=object), utc=True, errors='coerce', format='ISO8601'
+    )
+    minutes = (parsed - pd.Timestamp(0, tz='UTC')) // pd.Timedelta(minutes=1)
+    return minutes.fillna(-1).to_numpy(dtype=np.int64)
+
+def source_tz(freeblocks: dict, zone: str = DEFAULT_TIMEZONE) -> tzinfo:
+    """Timezone used to display freeblocks as local wall times.
+
+    `zone` is used when it agrees with the offset of the first freeblock timestamp, so wall
+    times follow its DST changes; otherwise that timestamp's fixed offset is kept.
+    """
+    local = ZoneInfo(zone)
+    for slots in (freeblocks or dict()).values():
+        for s in slots or list():
+            try:
+                start = datetime.fromisoformat(s.get('start', '').replace('Z', '+00:00'))
+            except (ValueError, AttributeError):
+                continue
+            if start.tzinfo is None:
+                return timezone.utc
+            same = start.astimezone(local).utcoffset() == start.utcoffset()
+            return local if same else start.tzinfo
+    return local
+
+def merge(intervals: np.ndarray) -> np.ndarray:
+    """Sort and merge overlapping or touching [start, end) rows of an (n, 2) array."""
+    if len(intervals) == 0:
+        return intervals.reshape(0, 2)
+    intervals = intervals[np.argsort(intervals[:, 0], kind='stable')]
+    ends = np.maximum.accumulate(intervals[:, 1])
+    breaks = np.flatnonzero(intervals[1:, 0] > ends[:-1]) + 1
+    starts = np.concatenate(([0], breaks))
+    stops = np.concatenate((breaks - 1, [len(intervals) - 1]))
+    return np.column_stack((intervals[starts, 0], ends[stops]))
+
+def freeblock_arrays(freeblocks: dict) -> dict[str, np.ndarray]:
+    """Freeblocks per email ({email: [{start, end}, ...]}) as merged int64 minute arrays."""
+    emails, starts, ends = list(), list(), list()
+    for email, slots in (freeblocks or dict()).items():
+        for s in slots or list():
+            emails.append(email)
+            starts.append(s.get('start'))
+            ends.append(s.get('end'))
+
+    emails = np.asarray(emails, dtype=object)
+    all_starts, all_ends = parse_minutes(starts), parse_minutes(ends)
+    valid = (all_starts >= 0) & (all_ends > all_starts)
+
+    arrays = dict()
+    for email in (freeblocks or dict()):
+        mask = valid & (emails == email)
+        arrays[email] = merge(np.column_stack((all_starts[mask], all_ends[mask])))
+    return arrays
+
+def coverage(arrays: dict[str, np.ndarray]) -> tuple[np.ndarray, np.ndarray]:
+    """Sweep line over all sellers: (boundaries, free sellers in [b[i], b[i+1]))."""
+    blocks = [a for a in arrays.values() if len(a)]
+    if not blocks:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    stacked = np.concatenate(blocks)
+    points = np.concatenate((stacked[:, 0], stacked[:, 1]))
+    deltas = np.concatenate((np.ones(len(stacked), np.int64), -np.ones(len(stacked), np.int64)))
+    order = np.argsort(points, kind='stable')
+    boundaries, first = np.unique(points[order], return_index=True)
+    counts = np.add.reduceat(deltas[order], first).cumsum()
+    return boundaries, counts
+
+def _runs(boundaries: np.ndarray, keep: np.ndarray) -> np.ndarray:
+    """Merged intervals of the segments [b[i], b[i+1]) where keep[i] is set."""
+    idx = np.flatnonzero(keep[:-1])
+    return merge(np.column_stack((boundaries[idx], boundaries[idx + 1])))
+
+def intersection(arrays: dict[str, np.ndarray]) -> np.ndarray:
+    """Time where every seller is free."""
+    boundaries, counts = coverage(arrays)
+    if len(boundaries) == 0 or not arrays:
+        return np.empty((0, 2), dtype=np.int64)
+    return _runs(boundaries, counts >= len(arrays))
+
+def union(arrays: dict[str, np.ndarray]) -> np.ndarray:
+    """Time where at least one seller is free."""
+    boundaries, counts = coverage(arrays)
+    if len(boundaries) == 0:
+        return np.empty((0, 2), dtype=np.int64)
+    return _runs(boundaries, counts >= 1)
+
+def contains(intervals: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Vectorized check of [starts, ends) against merged, sorted intervals."""
+    if len(intervals) == 0:
+        return np.zeros(len(starts), dtype=bool)
+    idx = np.searchsorted(intervals[:, 0], starts, side='right') - 1
+    safe = np.clip(idx, 0, None)
+    return (idx >= 0) & (starts >= 0) & (ends <= intervals[safe, 1])
+
+def parse_slot(text: str, default_tz: tzinfo = timezone.utc) -> tuple[int, int] | None:
+    """`2025-05-12 10:00[-04:00][ - 10:30]` to (start, end) minutes; None when unparseable."""
+    match = SLOT_RX.search(text or '')
+    if not match:
+        return None
+    day, start, offset, end = match.groups()
+    offset = offset.replace('Z', '+00:00') if offset else ''
+    begin = datetime.fromisoformat(f'{day}T{int(start[:-3]):02d}{start[-3:]}{offset}')
+    if begin.tzinfo is None:
+        begin = begin.replace(tzinfo=default_tz)
+    a = int(begin.timestamp()) // 60
+    if end:
+        h, m = end.split(':')
+        b = a + (int(h) * 60 + int(m)) - (begin.hour * 60 + begin.minute)
+    else:
+        b = a + MEETING_MINUTES
+    return (a, b) if b > a else None
+
+def check_proposed_slots(
+    proposed: list,
+    arrays: dict[str, np.ndarray],
+    default_tz: tzinfo = timezone.utc
+) -> list[dict]:
+    """Check proposed slots (`[seller, slot]` pairs or slot strings) against freeblocks.
+
+    A slot naming a known seller must fit that seller's free time; otherwise it must fit
+    the time when anyone is free. Every result also says whether all sellers are free.
+    """
+    rows, starts, ends = list(), list(), list()
+    for item in proposed or list():
+        if isinstance(item, list) and len(item) >= 2:
+            seller, text = item[0], item[1]
+        else:
+            seller, text = None, item
+        parsed = parse_slot(str(text), default_tz)
+        rows.append({'seller': seller, 'slot': str(text), 'parsed': parsed is not None})
+        starts.append(parsed[0] if parsed else -1)
+        ends.append(parsed[1] if parsed else -1)
+
+    starts, ends = np.asarray(starts, np.int64), np.asarray(ends, np.int64)
+    in_union = contains(union(arrays), starts, ends)
+    in_all = contains(intersection(arrays), starts, ends)
+    by_seller = {email.lower(): a for email, a in arrays.items()}
+
+    for i, row in enumerate(rows):
+        seller = (row['seller'] or '').strip().lower()
+        own = by_seller.get(seller)
+        if own is not None:
+            row['fits'] = bool(contains(own, starts[i:i + 1], ends[i:i + 1])[0])
+        else:
+            row['fits'] = bool(in_union[i])
+        row['all_free'] = bool(in_all[i])
+    return rows
+
+def heatmap_frame(
+    arrays: dict[str, np.ndarray],
+    display_tz: tzinfo = timezone.utc,
+    bin_minutes: int = HEATMAP_BIN_MINUTES
+) -> pd.DataFrame:
+    """Free-seller count per time bin (date x time of day) for a timeline heatmap."""
+    boundaries, counts = coverage(arrays)
+    if len(boundaries) == 0:
+        return pd.DataFrame(columns=['date', 'time', 'free'])
+    first = boundaries[0] - boundaries[0] % bin_minutes
+    bins = np.arange(first, boundaries[-1], bin_minutes, dtype=np.int64)
+    idx = np.searchsorted(boundaries, bins, side='right') - 1
+    free = np.where(idx >= 0, counts[np.clip(idx, 0, None)], 0)
+    local = pd.to_datetime(bins * NS_PER_MINUTE, utc=True).tz_convert(display_tz)
+    frame = pd.DataFrame({
+        'date': local.strftime('%a %Y-%m-%d'),
+        'time': local.strftime('%H:%M'),
+        'free': free,
+    })
+    return frame[frame['free'] > 0]
+
+def freeblocks_frame(freeblocks: dict, display_tz: tzinfo = timezone.utc) -> pd.DataFrame:
+    """Freeblocks as a table (email, start, end, duration) parsed in one vectorized pass."""
+    emails, starts, ends = list(), list(), list()
+    for email, slots in (freeblocks or dict()).items():
+        for s in slots or list():
+            emails.append(email)
+            starts.append(s.get('start', ''))
+            ends.append(s.get('end', ''))
+    frame = pd.DataFrame({'email': emails, 'start': starts, 'end': ends})
+    a = pd.to_datetime(frame['start'], utc=True, errors='coerce', format='ISO8601')
+    b = pd.to_datetime(frame['end'], utc=True, errors='coerce', format='ISO8601')
+    a, b = a.dt.tz_convert(display_tz), b.dt.tz_convert(display_tz)
+    hours = (b - a).dt.total_seconds() / 3600
+    return pd.DataFrame({
+        'email': frame['email'],
+        'start': a.dt.strftime('%Y-%m-%d %H:%M').fillna(frame['start']),
+        'end': b.dt.strftime('%Y-%m-%d %H:%M').fillna(frame['end']),
+        'dur': hours.map(lambda h: f'{h:.1f}h', na_action='ignore').fillna(''),
+    })
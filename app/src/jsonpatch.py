@@ -0,0 +1,129 @@
+# app/src/jsonpatch.py
+
+import copy
+
+class PatchError(ValueError):
+    """A patch operation does not apply to the document (missing path or failed test)."""
+
+def _unescape(token: str) -> str:
+    return token.replace('~1', '/').replace('~0', '~')
+
+def _escape(token: str) -> str:
+    return str(token).replace('~', '~0').replace('/', '~1')
+
+def pointer(*tokens) -> str:
+    """Build a JSON Pointer (RFC 6901) from path tokens."""
+    return ''.join('/' + _escape(t) for t in tokens)
+
+def _split(path: str) -> list[str]:
+    if path == '':
+        return list()
+    if not path.startswith('/'):
+        raise PatchError(f'Invalid JSON pointer: {path!r}')
+    return [_unescape(t) for t in path[1:].split('/')]
+
+def _index(container: list, token: str, allow_end: bool = False) -> int:
+    if allow_end and token == '-':
+        return len(container)
+    if not token.isdigit():
+        raise PatchError(f'Invalid list index: {token!r}')
+    i = int(token)
+    if i > len(container) or (i == len(container) and not allow_end):
+        raise PatchError(f'List index out of range: {i}')
+    return i
+
+def _parent(doc, path: str):
+    tokens = _split(path)
+    if not tokens:
+        raise PatchError('Operation on the document root is not supported')
+    target = doc
+    for token in tokens[:-1]:
+        try:
+            target = target[_index(target, token)] if isinstance(target, list) else target[token]
+        except (KeyError, TypeError):
+            raise PatchError(f'Path not found: {path}')
+    return target, tokens[-1]
+
+def _get(doc, path: str):
+    target = doc
+    for token in _split(path):
+        try:
+            target = target[_index(target, token)] if isinstance(target, list) else target[token]
+        except (KeyError, TypeError):
+            raise PatchError(f'Path not found: {path}')
+    return target
+
+def apply_patch(doc, ops: list[dict]):
+    """Apply JSON Patch (RFC 6902) `add`, `remove`, `replace` and `test` ops to a copy of `doc`.
+
+    Raises PatchError when an op does not apply; the input document is never modified.
+    """
+    doc = copy.deepcopy(doc)
+    for op in ops:
+        kind, path = op['op'], op['path']
+        if kind == 'test':
+            if _get(doc, path) != op['value']:
+                raise PatchError(f'Test failed at {path}')
+            continue
+
+        parent, token = _parent(doc, path)
+        if isinstance(parent, list):
+            i = _index(parent, token, allow_end=(kind == 'add'))
+            if kind == 'add':
+                parent.insert(i, copy.deepcopy(op['value']))
+            elif kind == 'remove':
+                del parent[i]
+            elif kind == 'replace':
+                parent[i] = copy.deepcopy(op['value'])
+            else:
+                raise PatchError(f'Unsupported op: {kind}')
+        elif isinstance(parent, dict):
+            if kind in ('remove', 'replace') and token not in parent:
+                raise PatchError(f'Path not found: {path}')
+            if kind == 'remove':
+                del parent[token]
+            elif kind in ('add', 'replace'):
+                parent[token] = copy.deepcopy(op['value'])
+            else:
+                raise PatchError(f'Unsupported op: {kind}')
+        else:
+            raise PatchError(f'Path not found: {path}')
+    return doc
+
+def make_patch(old: dict, new: dict, path: str = '') -> list[dict]:
+    """Diff two JSON objects into a patch; changed non-object values are guarded by a `test`.
+
+    The guard makes the patch fail, rather than silently win, when applied to a document
+    where someone else changed the same value.
+    """
+    ops = list()
+    for key in old:
+        if key not in new:
+            ops.append({'op': 'test', 'path': path + pointer(key), 'value': old[key]})
+            ops.append({'op': 'remove', 'path': path + pointer(key)})
+    for key, value in new.items():
+        sub = path + pointer(key)
+        if key not in old:
+            ops.append({'op': 'add', 'path': sub, 'value': value})
+        elif isinstance(value, dict) and isinstance(old[key], dict):
+            ops.extend(make_patch(old[key], value, sub))
+        elif value != old[key]:
+            ops.append({'op': 'test', 'path': sub, 'value': old[key]})
+            ops.append({'op': 'replace', 'path': sub, 'value': value})
+    return ops
+
+def list_set_patch(path: str, current: list, added, removed) -> list[dict]:
+    """Ops that remove `removed` values from and append `added` values to the list `current`.
+
+    Indices are computed against `current`, so the ops must be rebuilt whenever the list is
+    re-read; each removal is guarded by a `test` of the value it deletes.
+    """
+    ops = list()
+    for i in sorted((i for i, v in enumerate(current) if v in removed), reverse=True):
+        ops.append({'op': 'test', 'path': f'{path}/{i}', 'value': current[i]})
+        ops.append({'op': 'remove', 'path': f'{path}/{i}'})
+    present = set(current)
+    for value in sorted(added):
+        if value not in present:
+            ops.append({'op': 'add', 'path': f'{path}/-', 'value': value})
+    return ops
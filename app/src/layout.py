@@ -4,6 +4,7 @@ import streamlit as st
 
 from src.params import PATHS, GITHUB_URL, REPORT_URL_MAIL, ABOUT_TEXT
 from src.utils import error_and_redirect
+from src.auth import refresh_session_user
 from components import session_box
 
 def setup_layout(page_title: str):
@@ -52,6 +53,10 @@ def setup_layout(page_title: str):
 
 def protect_page(required_role: str = None) -> dict:
     """Protect page and return user if authenticated and authorized."""
+    if 'user' in st.session_state and refresh_session_user() is None:
+        error_and_redirect('Your access has been revoked.', 'home')
+        st.stop()
+
     if 'user' not in st.session_state:
         error_and_redirect('You must be logged in.', 'home')
         st.stop()
@@ -114,6 +119,7 @@ def setup_pages():
             st.Page(PATHS['pages']['client_data'], title='Client Data (Legacy)', icon='📊'),
             st.Page(PATHS['pages']['client_config'], title='Client Configuration', icon='⚙️'),
             st.Page(PATHS['pages']['testing'], title='AI Testing', icon='🔍'),
+            st.Page(PATHS['pages']['search'], title='Search', icon='🔎'),
         ]
 
     nav = st.navigation(pages)
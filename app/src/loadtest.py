@@ -0,0 +1,182 @@
+# app/src/loadtest.py
+
+import httpx
+import numpy as np
+import pandas as pd
+
+from collections import Counter
+from itertools import cycle
+import contextlib
+import asyncio
+import time
+
+LOADTEST_TIMEOUT = 300
+LOADTEST_MAX_INFLIGHT = 64
+LOADTEST_PROGRESS_SECONDS = 1.0
+PERCENTILES = (50, 90, 99)
+DROPPED = 'dropped: in-flight limit reached'
+SAMPLE_COLUMNS = ['t', 'scenario', 'status_code', 'latency_ms', 'error']
+
+def _failed(sample: dict) -> bool:
+    return sample['error'] is not None or sample['status_code'] >= 400
+
+async def _send(client: httpx.AsyncClient, url: str, scenario: str, payload: dict, t0: float):
+    sent = time.perf_counter()
+    sample = {'t': round(sent - t0, 3), 'scenario': scenario, 'status_code': None, 'error': None}
+    try:
+        response = await client.post(url, json=payload)
+        sample['status_code'] = response.status_code
+    except httpx.HTTPError as e:
+        sample['error'] = f'{type(e).__name__}: {e}'
+    sample['latency_ms'] = round((time.perf_counter() - sent) * 1000, 1)
+    return sample
+
+async def run_load_test(
+    url: str,
+    payloads: list[tuple[str, dict]],
+    duration: float,
+    rps: float | None = None,
+    concurrency: int | None = None,
+    headers: dict | None = None,
+    max_inflight: int = LOADTEST_MAX_INFLIGHT,
+    timeout: float = LOADTEST_TIMEOUT,
+    on_progress=None,
+    progress_seconds: float = LOADTEST_PROGRESS_SECONDS
+) -> list[dict]:
+    """Drive `url` with (scenario, payload) pairs, cycled in order, for `duration` seconds.
+
+    With `rps` requests start on a fixed schedule (open model); when `max_inflight` are
+    already pending the request is recorded as dropped instead of delaying the schedule.
+    With `concurrency` that many workers send back to back (closed model). Requests
+    still pending at the deadline are awaited. `on_progress(summary, samples)` is called
+    every `progress_seconds` with the samples so far; an exception it raises stops the run
+    and is re-raised. Returns the raw samples.
+    """
+    if (rps is None) == (concurrency is None):
+        raise ValueError('Pass exactly one of rps or concurrency')
+    if (rps if concurrency is None else concurrency) <= 0:
+        raise ValueError('rps and concurrency must be positive')
+    if max_inflight <= 0:
+        raise ValueError('max_inflight must be positive')
+    if not payloads:
+        raise ValueError('No payloads to send')
+
+    pool_size = concurrency or max_inflight
+    limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+    samples, pending = list(), set()
+    source = cycle(payloads)
+
+    async def _report():
+        while True:
+            await asyncio.sleep(progress_seconds)
+            inflight = concurrency or len(pending)
+            summary = summarize_samples(samples, time.perf_counter() - t0, inflight)
+            on_progress(summary, samples)
+
+    def _check_reporter():
+        # Stop the run as soon as on_progress has raised instead of losing the error
+        if reporter and reporter.done():
+            reporter.result()
+
+    async def _worker(client: httpx.AsyncClient):
+        while time.perf_counter() < deadline:
+            _check_reporter()
+            scenario, payload = next(source)
+            samples.append(await _send(client, url, scenario, payload, t0))
+
+    async def _scheduled(client: httpx.AsyncClient, scenario: str, payload: dict):
+        samples.append(await _send(client, url, scenario, payload, t0))
+
+    async with httpx.AsyncClient(headers=headers, limits=limits, timeout=timeout) as client:
+        t0 = time.perf_counter()
+        deadline = t0 + duration
+        reporter = asyncio.create_task(_report()) if on_progress else None
+        try:
+            if concurrency is not None:
+                await asyncio.gather(*(_worker(client) for _ in range(concurrency)))
+            else:
+                i = 0
+                while (at := t0 + i / rps) < deadline:
+                    await asyncio.sleep(max(0.0, at - time.perf_counter()))
+                    _check_reporter()
+                    scenario, payload = next(source)
+                    i += 1
+                    if len(pending) >= max_inflight:
+                        samples.append({
+                            't': round(at - t0, 3), 'scenario': scenario, 'status_code': None,
+                            'latency_ms': None, 'error': DROPPED,
+                        })
+                        continue
+                    task = asyncio.create_task(_scheduled(client, scenario, payload))
+                    pending.add(task)
+                    task.add_done_callback(pending.discard)
+                if pending:
+                    await asyncio.gather(*pending)
+        finally:
+            if reporter:
+                reporter.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await reporter
+    if on_progress:
+        on_progress(summarize_samples(samples, time.perf_counter() - t0), samples)
+    return samples
+
+def load_test(*args, **kwargs) -> list[dict]:
+    """Blocking wrapper around run_load_test for scripts and Streamlit pages."""
+    return asyncio.run(run_load_test(*args, **kwargs))
+
+def summarize_samples(samples: list[dict], elapsed: float, inflight: int = 0) -> dict:
+    """Throughput, error rate and latency percentiles (successful requests only).
+
+    `requests`, `errors` and `throughput_rps` only count requests that were sent; the ones
+    dropped at the in-flight limit are reported as `dropped`.
+    """
+    sent = [s for s in samples if s['error'] != DROPPED]
+    failed = sum(_failed(s) for s in sent)
+    latencies = np.array([s['latency_ms'] for s in sent if not _failed(s)], dtype=float)
+    outcomes = Counter(str(s['status_code'] or s['error'].split(':')[0]) for s in samples)
+    summary = {
+        'elapsed_s': round(elapsed, 1),
+        'requests': len(sent),
+        'dropped': len(samples) - len(sent),
+        'inflight': inflight,
+        'errors': failed,
+        'error_rate': round(failed / len(sent), 4) if sent else 0.0,
+        'throughput_rps': round(len(sent) / elapsed, 2) if elapsed > 0 else 0.0,
+        'status_codes': dict(outcomes),
+    }
+    for p in PERCENTILES:
+        value = np.percentile(latencies, p) if len(latencies) else None
+        summary[f'p{p}_ms'] = None if value is None else round(float(value), 1)
+    summary['max_ms'] = round(float(latencies.max()), 1) if len(latencies) else None
+    return summary
+
+def samples_frame(samples: list[dict]) -> pd.DataFrame:
+    """Raw samples ordered by start time, ready for CSV export."""
+    frame = pd.DataFrame(samples, columns=SAMPLE_COLUMNS)
+    return frame.sort_values('t', kind='stable', ignore_index=True)
+
+def latency_histogram(samples: list[dict], bins: int = 30) -> pd.DataFrame:
+    """Counts of successful latencies per bin: (start_ms, end_ms, count)."""
+    latencies = np.array([s['latency_ms'] for s in samples if not _failed(s)], dtype=float)
+    if len(latencies) == 0:
+        return pd.DataFrame(columns=['start_ms', 'end_ms', 'count'])
+    counts, edges = np.histogram(latencies, bins=bins)
+    return pd.DataFrame({'start_ms': edges[:-1], 'end_ms': edges[1:], 'count': counts})
+
+def timeline(samples: list[dict]) -> pd.DataFrame:
+    """Sent requests, errors, dropped requests and p90 latency per second of the run."""
+    frame = samples_frame(samples)
+    if frame.empty:
+        return pd.DataFrame(columns=['second', 'requests', 'errors', 'dropped', 'p90_ms'])
+    frame['second'] = frame['t'].astype(int)
+    frame['dropped'] = frame['error'] == DROPPED
+    frame['failed'] = ~frame['dropped'] & (frame['error'].notna() | (frame['status_code'] >= 400))
+    frame['ok_ms'] = frame['latency_ms'].where(~frame['failed'] & ~frame['dropped'])
+    grouped = frame.groupby('second')
+    return pd.DataFrame({
+        'requests': grouped.size() - grouped['dropped'].sum(),
+        'errors': grouped['failed'].sum(),
+        'dropped': grouped['dropped'].sum(),
+        'p90_ms': grouped['ok_ms'].quantile(0.9),
+    }).reset_index()
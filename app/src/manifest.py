@@ -0,0 +1,118 @@
+# app/src/manifest.py
+
+import streamlit as st
+
+from datetime import datetime, timezone
+import json
+
+from src.gcs import (
+    read_text_versioned, write_text, write_json, update_json, iter_blobs, WriteResult
+)
+from src.storage import StorageError, NotFound, md5_b64
+
+MANIFEST_NAME = '.manifest.json'
+MANIFEST_VERSION = 1
+
+class PostWriteError(StorageError):
+    """The blob was written but a follow-up update (index, history, mirror) failed."""
+
+    def __init__(self, blob_name: str, result: WriteResult, step: str, cause: Exception):
+        super().__init__(f'{blob_name} was saved, but the {step} failed: {cause}')
+        self.result = result
+
+class ManifestUpdateError(PostWriteError):
+    """The blob was written but its area manifest could not be updated."""
+
+    def __init__(self, blob_name: str, result: WriteResult, cause: Exception):
+        super().__init__(blob_name, result, 'index refresh', cause)
+
+def manifest_areas() -> list[tuple[str, str]]:
+    """Bucket areas (prefix, extension) indexed by a manifest: prompts, clients, legacy data."""
+    return [
+        (st.secrets['gcs']['prompts_folder'], '.py'),
+        ('clients', '.py'),
+        (st.secrets['gcs']['clients_folder'], '.txt'),
+    ]
+
+def manifest_blob(prefix: str) -> str:
+    """Name of the manifest blob for a bucket area."""
+    return f"{prefix.rstrip('/')}/{MANIFEST_NAME}"
+
+def _area_prefix(prefix: str) -> str:
+    return prefix.rstrip('/') + '/'
+
+def _entry(generation: int, size: int, md5: str | None, updated: datetime | None) -> dict:
+    return {
+        'generation': generation,
+        'size': size,
+        'md5': md5,
+        'updated': (updated or datetime.now(timezone.utc)).isoformat(),
+    }
+
+def _empty(prefix: str, extension: str) -> dict:
+    return {'version': MANIFEST_VERSION, 'prefix': prefix, 'extension': extension, 'files': dict()}
+
+def rebuild_manifest(bucket_name: str, prefix: str, extension: str) -> dict:
+    """Rebuild an area manifest from a full listing and store it."""
+    manifest = _empty(prefix, extension)
+    for info in iter_blobs(bucket_name, _area_prefix(prefix), extension):
+        manifest['files'][info.name] = _entry(
+            info.generation, info.size, info.md5_hash, info.updated
+        )
+    write_json(bucket_name, manifest_blob(prefix), manifest)
+    return manifest
+
+def load_manifest(bucket_name: str, prefix: str, extension: str) -> dict:
+    """Return the area manifest, building it from a listing the first time."""
+    try:
+        text, _ = read_text_versioned(bucket_name, manifest_blob(prefix))
+    except NotFound:
+        return rebuild_manifest(bucket_name, prefix, extension)
+    return json.loads(text)
+
+def list_manifest_files(bucket_name: str, prefix: str, extension: str) -> list[str]:
+    """List the blob names of an area from its manifest instead of listing the bucket."""
+    return sorted(load_manifest(bucket_name, prefix, extension)['files'])
+
+def _update_manifest(bucket_name: str, prefix: str, extension: str, mutate):
+    """Apply `mutate(files)` to the manifest with a generation precondition, retrying."""
+    try:
+        update_json(bucket_name, manifest_blob(prefix), lambda manifest: mutate(manifest['files']))
+    except NotFound:
+        rebuild_manifest(bucket_name, prefix, extension)
+
+def write_text_tracked(
+    bucket_name: str,
+    prefix: str,
+    extension: str,
+    blob_name: str,
+    content: str,
+    content_type: str,
+    if_generation_match: int | None = None
+) -> WriteResult:
+    """Write a blob of a manifest area and record it in the area manifest.
+
+    Raises ManifestUpdateError when the blob was written but the manifest was not.
+    """
+    result = write_text(
+        bucket_name, blob_name, content, content_type=content_type,
+        if_generation_match=if_generation_match
+    )
+    if result.written:
+        data = content.encode('utf-8')
+        entry = _entry(result.generation, len(data), md5_b64(data), None)
+        try:
+            _update_manifest(
+                bucket_name, prefix, extension, lambda files: files.update({blob_name: entry})
+            )
+        except Exception as e:
+            raise ManifestUpdateError(blob_name, result, e) from e
+    return result
+
+def rebuild_all_manifests() -> dict[str, int]:
+    """Rebuild every area manifest; returns the number of files indexed per area."""
+    bucket_name = st.secrets['gcs']['bucket']
+    return {
+        prefix: len(rebuild_manifest(bucket_name, prefix, extension)['files'])
+        for prefix, extension in manifest_areas()
+    }
@@ -2,7 +2,15 @@
 
 import streamlit as st
 
-from src.gcs import read_text, write_text, list_files_with_prefix
+from src.gcs import read_text, read_text_versioned, prefetch_blobs, list_dir, WriteResult
+from src.manifest import (
+    write_text_tracked, list_manifest_files, load_manifest, ManifestUpdateError, PostWriteError
+)
+from src.history import record_version, load_history, load_version
+from src.tokens import token_stats
+
+PROMPT_EXT = '.py'
+PROMPT_FOLDER_TTL = 60
 
 def load_prompt_file(prompt_name):
     """Load a prompt file from GCS."""
@@ -11,23 +19,105 @@ def load_prompt_file(prompt_name):
         f'{st.secrets["gcs"]["prompts_folder"]}/{prompt_name}.py'
     )
 
-def save_prompt_file(prompt_name, code):
-    """Save a prompt file to GCS."""
-    write_text(
+def load_prompt_file_versioned(prompt_name) -> tuple[str, int]:
+    """Load a prompt file from GCS together with its generation."""
+    return read_text_versioned(
         st.secrets['gcs']['bucket'],
-        f'{st.secrets["gcs"]["prompts_folder"]}/{prompt_name}.py',
-        code,
-        content_type='text/x-python'
+        f'{st.secrets["gcs"]["prompts_folder"]}/{prompt_name}.py'
     )
 
+def save_prompt_file(
+    prompt_name,
+    code,
+    if_generation_match: int | None = None,
+    author: str | None = None,
+    baseline: str | None = None
+) -> WriteResult:
+    """Save a prompt file to GCS, record it in the prompts manifest and in its history.
+
+    Raises PostWriteError (with the WriteResult) when the prompt was saved but the
+    manifest or history update failed.
+    """
+    blob_name = f'{st.secrets["gcs"]["prompts_folder"]}/{prompt_name}.py'
+    failure = None
+    try:
+        result = write_text_tracked(
+            st.secrets['gcs']['bucket'],
+            st.secrets['gcs']['prompts_folder'],
+            PROMPT_EXT,
+            blob_name,
+            code,
+            content_type='text/x-python',
+            if_generation_match=if_generation_match
+        )
+    except ManifestUpdateError as e:
+        result, failure = e.result, e
+    if result.written:
+        try:
+            record_version(
+                st.secrets['gcs']['bucket'], blob_name, code,
+                generation=result.generation, author=author, baseline=baseline
+            )
+        except Exception as e:
+            failure = failure or PostWriteError(blob_name, result, 'history update', e)
+    if failure:
+        raise failure
+    return result
+
+def load_prompt_history(prompt_name) -> list[dict]:
+    """Saved versions of a prompt, newest first."""
+    return load_history(
+        st.secrets['gcs']['bucket'],
+        f'{st.secrets["gcs"]["prompts_folder"]}/{prompt_name}.py'
+    )
+
+def load_prompt_version(digest: str) -> str:
+    """Content of a saved prompt version."""
+    return load_version(st.secrets['gcs']['bucket'], digest)
+
 def list_prompt_files():
-    """List all prompt files in GCS."""
-    return list_files_with_prefix(
+    """List all prompt files in GCS (from the prompts manifest)."""
+    return list_manifest_files(
         st.secrets['gcs']['bucket'],
         st.secrets['gcs']['prompts_folder'],
-        '.py'
+        PROMPT_EXT
     )
 
+def prefetch_prompt_files(on_progress=None) -> dict:
+    """Load every prompt file into the blob cache in one concurrent pass."""
+    return prefetch_blobs(
+        st.secrets['gcs']['bucket'],
+        list_prompt_files(),
+        on_progress=on_progress
+    )
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _token_sizes(bucket_name: str, versions: tuple[tuple[str, int], ...]) -> dict[str, dict]:
+    """Token stats per prompt blob, cached on the (blob, generation) pairs of the manifest."""
+    names = [name for name, _ in versions]
+    errors = prefetch_blobs(bucket_name, names)
+    return {
+        name: token_stats(read_text(bucket_name, name)) for name in names if name not in errors
+    }
+
+def prompt_token_sizes() -> list[dict]:
+    """Token estimate and size of every prompt, largest first.
+
+    Only recomputed when a prompt generation in the manifest changes.
+    """
+    bucket_name = st.secrets['gcs']['bucket']
+    prefix = st.secrets['gcs']['prompts_folder']
+    files = load_manifest(bucket_name, prefix, PROMPT_EXT)['files']
+    versions = tuple(sorted(
+        (name, entry['generation']) for name, entry in files.items() if 'init' not in name
+    ))
+    root_prefix = prefix.rstrip('/') + '/'
+    rows = [
+        {'blob': name, 'prompt': name.removeprefix(root_prefix), **stats}
+        for name, stats in _token_sizes(bucket_name, versions).items()
+    ]
+    return sorted(rows, key=lambda x: -x['tokens'])
+
 def get_prompt_file_tree():
     """Return a nested dict representing the prompts folder tree."""
     files = [x for x in list_prompt_files() if 'init' not in x]
@@ -41,3 +131,18 @@ def get_prompt_file_tree():
             node = node.setdefault(part, dict())
         node[parts[-1]] = path
     return tree
+
+@st.cache_data(show_spinner=False, ttl=PROMPT_FOLDER_TTL)
+def get_prompt_folder(rel_path: str = '') -> dict:
+    """Return one level of the prompts tree: sub-folders map to empty dicts, files to blob names.
+
+    Lists that folder alone with the '/' delimiter, so expanding a folder does not read the
+    whole subtree.
+    """
+    root_prefix = st.secrets['gcs']['prompts_folder'].rstrip('/') + '/'
+    folders, files = list_dir(st.secrets['gcs']['bucket'], root_prefix + rel_path, PROMPT_EXT)
+    node = {x.rstrip('/').rsplit('/', 1)[-1]: dict() for x in folders}
+    for info in files:
+        if 'init' not in info.name:
+            node[info.name.rsplit('/', 1)[-1]] = info.name
+    return node
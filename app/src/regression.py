@@ -0,0 +1,108 @@
+# app/src/regression.py
+
+import requests
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from collections.abc import Iterator
+import time
+
+from src.scenarios import ENDPOINTS, extract_fields, check_expectations
+
+REGRESSION_WORKERS = 4
+REGRESSION_MAX_WORKERS = 8
+REGRESSION_TIMEOUT = 300
+
+def scenario_cases(endpoints: list[str]) -> list[tuple[str, str]]:
+    """(endpoint, scenario) pairs for every curated scenario of `endpoints`."""
+    return [(e, name) for e in endpoints for name in ENDPOINTS[e]['scenarios']]
+
+def _run_case(
+    session: requests.Session,
+    base_url: str,
+    endpoint: str,
+    scenario: str,
+    timeout: int
+) -> dict:
+    spec = ENDPOINTS[endpoint]
+    example = spec['scenarios'][scenario]
+    payload = spec['payload'](example)
+    row = {'endpoint': endpoint, 'scenario': scenario, 'status_code': None, 'latency_ms': None}
+
+    started = time.perf_counter()
+    try:
+        response = session.post(f"{base_url}/{spec['path']}", json=payload, timeout=timeout)
+    except requests.RequestException as e:
+        row['latency_ms'] = round((time.perf_counter() - started) * 1000)
+        return {**row, 'passed': False, 'failures': [f'request failed: {e}'], 'response': None}
+    row['latency_ms'] = round((time.perf_counter() - started) * 1000)
+    row['status_code'] = response.status_code
+
+    try:
+        json_obj = response.json()
+    except ValueError:
+        json_obj = None
+    fields = extract_fields(endpoint, json_obj)
+    failures = check_expectations(example.get('expect'), fields)
+    if response.status_code != 200:
+        failures.insert(0, f'HTTP {response.status_code}')
+    elif json_obj is None:
+        failures.insert(0, 'response is not JSON')
+    # Scenarios without `expect` only need a successful response; they are reported as
+    # unchecked (passed is None) rather than as passes
+    passed = not failures if failures or example.get('expect') else None
+    return {
+        **row,
+        **fields,
+        'passed': passed,
+        'failures': failures,
+        'response': json_obj if json_obj is not None else response.text,
+    }
+
+def run_scenarios(
+    base_url: str,
+    id_token: str,
+    cases: list[tuple[str, str]],
+    workers: int = REGRESSION_WORKERS,
+    timeout: int = REGRESSION_TIMEOUT
+) -> Iterator[dict]:
+    """Send every (endpoint, scenario) case with at most `workers` requests in flight.
+
+    Yields one result row per case as soon as it completes. All requests share a session
+    (one connection pool sized to `workers`); closing the generator early cancels the
+    cases that have not started yet and waits for the running ones before closing it.
+    """
+    workers = max(1, min(workers, REGRESSION_MAX_WORKERS))
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({
+        'Authorization': f'Bearer {id_token}',
+        'Content-Type': 'application/json',
+    })
+
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='regression')
+    try:
+        futures = [
+            pool.submit(_run_case, session, base_url.rstrip('/'), endpoint, scenario, timeout)
+            for endpoint, scenario in cases
+        ]
+        for future in as_completed(futures):
+            yield future.result()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+        session.close()
+
+def summarize(rows: list[dict], wall_seconds: float) -> dict:
+    """Pass/fail/unchecked counts and latency figures of a finished run."""
+    latencies = sorted(r['latency_ms'] for r in rows if r['latency_ms'] is not None)
+    return {
+        'total': len(rows),
+        'passed': sum(r['passed'] is True for r in rows),
+        'failed': sum(r['passed'] is False for r in rows),
+        'unchecked': sum(r['passed'] is None for r in rows),
+        'wall_seconds': round(wall_seconds, 1),
+        'median_ms': latencies[len(latencies) // 2] if latencies else None,
+        'max_ms': latencies[-1] if latencies else None,
+    }
@@ -0,0 +1,194 @@
+# app/src/search.py
+
+import streamlit as st
+
+from collections import defaultdict
+import unicodedata
+import threading
+import logging
+import bisect
+import gzip
+import json
+import math
+import time
+import re
+
+from src.gcs import read_bytes, read_text, write_bytes, prefetch_blobs
+from src.manifest import load_manifest, manifest_areas
+from src.storage import NotFound
+
+logger = logging.getLogger(__name__)
+
+SEARCH_INDEX_FILE = 'search/index.json.gz'
+SEARCH_INDEX_VERSION = 1
+SEARCH_REFRESH_SECONDS = 30
+SEARCH_MAX_SNIPPETS = 3
+TOKEN_RX = re.compile(r'\w+')
+
+def fold(text: str) -> str:
+    """Lower-case and strip accents, so `miércoles` matches `miercoles`."""
+    decomposed = unicodedata.normalize('NFKD', text.lower())
+    return ''.join(c for c in decomposed if not unicodedata.combining(c))
+
+def tokenize(text: str) -> list[str]:
+    return TOKEN_RX.findall(fold(text))
+
+def search_index_blob() -> str:
+    return st.secrets['gcs'].get('search_index_file', SEARCH_INDEX_FILE)
+
+class SearchIndex:
+    """Line-level inverted index over the prompts, client configs and legacy client data.
+
+    Documents (generation and lines) are persisted as a gzip JSON artifact; postings are
+    rebuilt in memory from it, so a cold start needs one download plus the blobs whose
+    generation changed since the artifact was written.
+    """
+
+    def __init__(self):
+        self.docs = dict()
+        self.postings = defaultdict(dict)
+        self.terms = list()
+        self.checked_at = 0.0
+        self.lock = threading.Lock()
+
+    def _add(self, name: str, generation: int, text: str):
+        lines = text.splitlines()
+        self.docs[name] = {'generation': generation, 'lines': lines}
+        for i, line in enumerate(lines, start=1):
+            for token in set(tokenize(line)):
+                self.postings[token].setdefault(name, list()).append(i)
+
+    def _remove(self, name: str):
+        doc = self.docs.pop(name, None)
+        if doc is None:
+            return
+        for token in {t for line in doc['lines'] for t in tokenize(line)}:
+            self.postings[token].pop(name, None)
+            if not self.postings[token]:
+                del self.postings[token]
+
+    def _load_artifact(self, bucket_name: str):
+        try:
+            data = json.loads(gzip.decompress(read_bytes(bucket_name, search_index_blob())))
+        except NotFound:
+            return
+        if data.get('version') != SEARCH_INDEX_VERSION:
+            return
+        for name, doc in data['docs'].items():
+            self._add(name, doc['generation'], '\n'.join(doc['lines']))
+
+    def _save_artifact(self, bucket_name: str):
+        data = {'version': SEARCH_INDEX_VERSION, 'docs': self.docs}
+        payload = gzip.compress(
+            json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8'),
+            mtime=0
+        )
+        write_bytes(bucket_name, search_index_blob(), payload, content_type='application/gzip')
+
+    def refresh(self, bucket_name: str, force: bool = False) -> dict:
+        """Sync with the area manifests, re-reading only blobs whose generation moved."""
+        with self.lock:
+            if not force and time.monotonic() - self.checked_at < SEARCH_REFRESH_SECONDS:
+                return {'updated': 0, 'removed': 0, 'skipped': list()}
+            if not self.docs:
+                self._load_artifact(bucket_name)
+
+            current = dict()
+            for prefix, extension in manifest_areas():
+                manifest = load_manifest(bucket_name, prefix, extension)
+                for name, entry in manifest['files'].items():
+                    current[name] = entry['generation']
+
+            stale = [n for n, g in current.items() if self.docs.get(n, {}).get('generation') != g]
+            removed = [n for n in self.docs if n not in current]
+            errors = prefetch_blobs(bucket_name, stale) if stale else dict()
+            for name in removed:
+                self._remove(name)
+            undecodable = list()
+            for name in stale:
+                if name in errors:
+                    continue
+                try:
+                    text = read_text(bucket_name, name)
+                except UnicodeDecodeError as e:
+                    # e.g. a legacy .txt saved in another encoding; the rest still refreshes
+                    logger.warning('Search index skips %s: not UTF-8 (%s)', name, e)
+                    undecodable.append(name)
+                    continue
+                self._remove(name)
+                self._add(name, current[name], text)
+
+            if stale or removed:
+                self.terms = sorted(self.postings)
+                self._save_artifact(bucket_name)
+            elif not self.terms:
+                self.terms = sorted(self.postings)
+            self.checked_at = time.monotonic()
+            return {
+                'updated': len(stale) - len(errors) - len(undecodable),
+                'removed': len(removed),
+                'skipped': undecodable,
+            }
+
+    def _expand(self, token: str) -> list[str]:
+        """Indexed terms starting with `token` (prefix match on the sorted term list)."""
+        i = bisect.bisect_left(self.terms, token)
+        matches = list()
+        while i < len(self.terms) and self.terms[i].startswith(token):
+            matches.append(self.terms[i])
+            i += 1
+        return matches
+
+    def search(self, query: str, limit: int = 20) -> list[dict]:
+        """Ranked documents containing every query token (as a word prefix), with snippets."""
+        tokens = tokenize(query)
+        if not tokens:
+            return list()
+        with self.lock:
+            return self._search(tokens, limit)
+
+    def _search(self, tokens: list[str], limit: int) -> list[dict]:
+        n_docs = max(len(self.docs), 1)
+        scores, lines_hit = defaultdict(float), defaultdict(lambda: defaultdict(int))
+        candidates = None
+        for token in tokens:
+            hits = defaultdict(set)
+            for term in self._expand(token):
+                for name, lines in self.postings[term].items():
+                    hits[name].update(lines)
+            if not hits:
+                return list()
+            idf = math.log(1 + n_docs / len(hits))
+            for name, lines in hits.items():
+                scores[name] += (1 + math.log(len(lines))) * idf
+                for line in lines:
+                    lines_hit[name][line] += 1
+            candidates = set(hits) if candidates is None else candidates & set(hits)
+
+        results = list()
+        for name in sorted(candidates, key=lambda n: (-scores[n], n))[:limit]:
+            doc_lines = self.docs[name]['lines']
+            best = sorted(lines_hit[name].items(), key=lambda x: (-x[1], x[0]))
+            results.append({
+                'name': name,
+                'score': round(scores[name], 3),
+                'snippets': [(i, doc_lines[i - 1].strip()) for i, _ in best[:SEARCH_MAX_SNIPPETS]],
+            })
+        return results
+
+    def stats(self) -> dict:
+        return {
+            'documents': len(self.docs),
+            'terms': len(self.postings),
+            'lines': sum(len(d['lines']) for d in self.docs.values()),
+        }
+
+@st.cache_resource(show_spinner=False)
+def search_index() -> SearchIndex:
+    return SearchIndex()
+
+def search(query: str, limit: int = 20) -> list[dict]:
+    """Refresh the shared index if due and run `query` against it."""
+    index = search_index()
+    index.refresh(st.secrets['gcs']['bucket'])
+    return index.search(query, limit=limit)
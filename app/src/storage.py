@@ -0,0 +1,466 @@
+# app/src/storage.py
+
+import streamlit as st
+
+from google.api_core import exceptions as google_exceptions
+from google.auth.transport import requests as google_requests
+from google.oauth2 import service_account
+from google.cloud import storage
+from requests.adapters import HTTPAdapter
+import google.auth
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Iterator
+import threading
+import hashlib
+import base64
+import time
+import os
+
+STORAGE_MODE_ENV = 'CHATTGP_STORAGE_MODE'
+STORAGE_DIR_ENV = 'CHATTGP_STORAGE_DIR'
+DEFAULT_STORAGE_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'storage')
+
+STORAGE_SCOPES = ['https://www.googleapis.com/auth/devstorage.read_write']
+HTTP_POOL_CONNECTIONS = 4
+HTTP_POOL_MAXSIZE = 32
+LIST_PAGE_SIZE = 1000
+LIST_FIELDS = 'items(name,generation,size,updated,md5Hash,crc32c),prefixes,nextPageToken'
+
+_BUILDS_LOCK = threading.Lock()
+_BUILDS = {'count': 0}
+
+class StorageError(Exception):
+    """Base error raised by storage backends."""
+
+class NotFound(StorageError):
+    """The requested blob does not exist."""
+
+class PreconditionFailed(StorageError):
+    """The blob generation did not match the requested precondition."""
+
+@dataclass(frozen=True)
+class BlobInfo:
+    """Lean blob metadata returned by every backend."""
+    name: str
+    generation: int
+    size: int
+    updated: datetime | None = None
+    md5_hash: str | None = None
+    crc32c: str | None = None
+
+def md5_b64(data: bytes) -> str:
+    """Base64 MD5 digest, in the format Cloud Storage reports it."""
+    return base64.b64encode(hashlib.md5(data).digest()).decode()
+
+class StorageBackend:
+    """Blob store with Cloud Storage generation semantics.
+
+    Generations are positive integers that change on every write; a precondition of `0`
+    means "the blob must not exist yet".
+    """
+
+    name = 'base'
+
+    def stat(self, bucket_name: str, blob_name: str) -> BlobInfo | None:
+        """Return metadata for a blob, or None when it does not exist."""
+        raise NotImplementedError
+
+    def download(
+        self,
+        bucket_name: str,
+        blob_name: str,
+        if_generation_match: int | None = None
+    ) -> tuple[bytes, int]:
+        """Return (content, generation); raise NotFound or PreconditionFailed."""
+        raise NotImplementedError
+
+    def upload(
+        self,
+        bucket_name: str,
+        blob_name: str,
+        data: bytes,
+        content_type: str,
+        if_generation_match: int | None = None
+    ) -> BlobInfo:
+        """Store `data` and return the new metadata; raise PreconditionFailed."""
+        raise NotImplementedError
+
+    def delete(self, bucket_name: str, blob_name: str, if_generation_match: int | None = None):
+        """Delete a blob; raise NotFound or PreconditionFailed."""
+        raise NotImplementedError
+
+    def iter_blobs(
+        self,
+        bucket_name: str,
+        prefix: str,
+        extension: str = '',
+        page_size: int = LIST_PAGE_SIZE
+    ) -> Iterator[BlobInfo]:
+        """Stream metadata of blobs under `prefix` ending in `extension`."""
+        raise NotImplementedError
+
+    def list_dir(
+        self,
+        bucket_name: str,
+        prefix: str,
+        extension: str = ''
+    ) -> tuple[list[str], list[BlobInfo]]:
+        """List one level under `prefix` (ending in '/'): (sub-folder prefixes, files)."""
+        folders, files = set(), list()
+        for info in self.iter_blobs(bucket_name, prefix):
+            rest = info.name[len(prefix):]
+            if '/' in rest:
+                folders.add(prefix + rest.split('/', 1)[0] + '/')
+            elif info.name.endswith(extension):
+                files.append(info)
+        return sorted(folders), files
+
+    def stats(self) -> dict:
+        """Backend-specific diagnostics."""
+        return {'backend': self.name}
+
+################################################################################
+
+def _credentials(mode: str) -> tuple:
+    """Resolve storage credentials and project for the current environment mode."""
+    if mode == 'cloud':
+        credentials = service_account.Credentials.from_service_account_info(
+            st.secrets['gcp_credentials'],
+            scopes=STORAGE_SCOPES
+        )
+        return credentials, credentials.project_id
+    return google.auth.default(scopes=STORAGE_SCOPES)
+
+def _http_session(credentials) -> google_requests.AuthorizedSession:
+    """Create an authorized HTTP session with a keep-alive connection pool."""
+    session = google_requests.AuthorizedSession(credentials)
+    adapter = HTTPAdapter(
+        pool_connections=HTTP_POOL_CONNECTIONS,
+        pool_maxsize=HTTP_POOL_MAXSIZE,
+        pool_block=False
+    )
+    session.mount('https://', adapter)
+    session.headers['Connection'] = 'keep-alive'
+    return session
+
+class GCSBackend(StorageBackend):
+    """Google Cloud Storage through one pooled client shared by all sessions and threads."""
+
+    name = 'gcs'
+
+    def __init__(self, mode: str):
+        credentials, project = _credentials(mode)
+        self.client = storage.Client(
+            project=project,
+            credentials=credentials,
+            _http=_http_session(credentials)
+        )
+        self._lock = threading.Lock()
+        self._calls = 0
+
+    def _bucket(self, bucket_name: str) -> storage.Bucket:
+        with self._lock:
+            self._calls += 1
+        return self.client.bucket(bucket_name)
+
+    @staticmethod
+    def _info(blob: storage.Blob) -> BlobInfo:
+        return BlobInfo(
+            blob.name, blob.generation, blob.size or 0, blob.updated, blob.md5_hash, blob.crc32c
+        )
+
+    def stat(self, bucket_name, blob_name):
+        blob = self._bucket(bucket_name).get_blob(blob_name)
+        return self._info(blob) if blob is not None else None
+
+    def download(self, bucket_name, blob_name, if_generation_match=None):
+        blob = self._bucket(bucket_name).blob(blob_name)
+        try:
+            data = blob.download_as_bytes(if_generation_match=if_generation_match)
+        except google_exceptions.NotFound as e:
+            raise NotFound(f'{bucket_name}/{blob_name}') from e
+        except google_exceptions.PreconditionFailed as e:
+            raise PreconditionFailed(f'{bucket_name}/{blob_name}') from e
+        return data, blob.generation
+
+    def upload(self, bucket_name, blob_name, data, content_type, if_generation_match=None):
+        blob = self._bucket(bucket_name).blob(blob_name)
+        try:
+            blob.upload_from_string(
+                data, content_type=content_type, if_generation_match=if_generation_match
+            )
+        except google_exceptions.PreconditionFailed as e:
+            raise PreconditionFailed(f'{bucket_name}/{blob_name}') from e
+        return self._info(blob)
+
+    def delete(self, bucket_name, blob_name, if_generation_match=None):
+        try:
+            self._bucket(bucket_name).delete_blob(
+                blob_name, if_generation_match=if_generation_match
+            )
+        except google_exceptions.NotFound as e:
+            raise NotFound(f'{bucket_name}/{blob_name}') from e
+        except google_exceptions.PreconditionFailed as e:
+            raise PreconditionFailed(f'{bucket_name}/{blob_name}') from e
+
+    def iter_blobs(self, bucket_name, prefix, extension='', page_size=LIST_PAGE_SIZE):
+        with self._lock:
+            self._calls += 1
+        iterator = self.client.list_blobs(
+            bucket_name,
+            prefix=prefix,
+            match_glob=f'{prefix}**{extension}' if extension else None,
+            fields=LIST_FIELDS,
+            page_size=page_size
+        )
+        for blob in iterator:
+            yield self._info(blob)
+
+    def list_dir(self, bucket_name, prefix, extension=''):
+        with self._lock:
+            self._calls += 1
+        iterator = self.client.list_blobs(
+            bucket_name,
+            prefix=prefix,
+            delimiter='/',
+            fields=LIST_FIELDS,
+            page_size=LIST_PAGE_SIZE
+        )
+        # `prefixes` is only filled in once every page has been read
+        files = [self._info(blob) for blob in iterator if blob.name.endswith(extension)]
+        return sorted(iterator.prefixes), files
+
+    def stats(self):
+        """Report client reuse and HTTP connection reuse of the shared pool."""
+        connections, requests_sent = 0, 0
+        pools = self.client._http.get_adapter('https://').poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is not None:
+                connections += pool.num_connections
+                requests_sent += pool.num_requests
+        with self._lock:
+            calls = self._calls
+        return {
+            'backend': self.name,
+            'client_hits': calls,
+            'http_connections': connections,
+            'http_requests': requests_sent,
+            'http_reused': max(requests_sent - connections, 0),
+        }
+
+################################################################################
+
+class MemoryBackend(StorageBackend):
+    """Process-local dict store with generation semantics, for tests and benchmarks."""
+
+    name = 'memory'
+
+    def __init__(self, seed_dir: str | None = None):
+        self._blobs = dict()
+        self._lock = threading.Lock()
+        self._generation = time.time_ns() // 1000
+        if seed_dir and os.path.isdir(seed_dir):
+            seed = LocalBackend(seed_dir)
+            for bucket_name in os.listdir(seed_dir):
+                for info in seed.iter_blobs(bucket_name, ''):
+                    data, _ = seed.download(bucket_name, info.name)
+                    self.upload(bucket_name, info.name, data, 'application/octet-stream')
+
+    def _check(self, key: tuple, if_generation_match: int | None):
+        current = self._blobs.get(key)
+        if if_generation_match is None:
+            return
+        if (current[1].generation if current else 0) != if_generation_match:
+            raise PreconditionFailed('/'.join(key))
+
+    def stat(self, bucket_name, blob_name):
+        with self._lock:
+            current = self._blobs.get((bucket_name, blob_name))
+            return current[1] if current else None
+
+    def download(self, bucket_name, blob_name, if_generation_match=None):
+        key = (bucket_name, blob_name)
+        with self._lock:
+            if key not in self._blobs:
+                raise NotFound('/'.join(key))
+            self._check(key, if_generation_match)
+            data, info = self._blobs[key]
+            return data, info.generation
+
+    def upload(self, bucket_name, blob_name, data, content_type, if_generation_match=None):
+        key = (bucket_name, blob_name)
+        with self._lock:
+            self._check(key, if_generation_match)
+            self._generation += 1
+            info = BlobInfo(
+                blob_name, self._generation, len(data), datetime.now(timezone.utc), md5_b64(data)
+            )
+            self._blobs[key] = (bytes(data), info)
+            return info
+
+    def delete(self, bucket_name, blob_name, if_generation_match=None):
+        key = (bucket_name, blob_name)
+        with self._lock:
+            if key not in self._blobs:
+                raise NotFound('/'.join(key))
+            self._check(key, if_generation_match)
+            del self._blobs[key]
+
+    def iter_blobs(self, bucket_name, prefix, extension='', page_size=LIST_PAGE_SIZE):
+        with self._lock:
+            infos = sorted(
+                (info for (bucket, name), (_, info) in self._blobs.items()
+                 if bucket == bucket_name and name.startswith(prefix) and name.endswith(extension)),
+                key=lambda x: x.name
+            )
+        yield from infos
+
+    def stats(self):
+        with self._lock:
+            return {
+                'backend': self.name,
+                'blobs': len(self._blobs),
+                'bytes': sum(len(data) for data, _ in self._blobs.values()),
+            }
+
+################################################################################
+
+class LocalBackend(StorageBackend):
+    """Directory store (`<root>/<bucket>/<blob>`) using file mtime_ns as the generation."""
+
+    name = 'filesystem'
+    TMP_SUFFIX = '.chattgp-tmp'
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+        self._lock = threading.Lock()
+        self._md5 = dict()
+
+    def _path(self, bucket_name: str, blob_name: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, bucket_name, *blob_name.split('/')))
+        if not path.startswith(os.path.join(self.root, bucket_name) + os.sep):
+            raise StorageError(f'Invalid blob name: {blob_name}')
+        return path
+
+    def _info(self, blob_name: str, path: str, data: bytes | None = None) -> BlobInfo:
+        """Blob metadata; the md5 is cached by (mtime_ns, size) so only changed files are read."""
+        meta = os.stat(path)
+        version = (meta.st_mtime_ns, meta.st_size)
+        cached = self._md5.get(path)
+        if data is not None:
+            md5 = md5_b64(data)
+        elif cached and cached[0] == version:
+            md5 = cached[1]
+        else:
+            with open(path, 'rb') as f:
+                md5 = md5_b64(f.read())
+        self._md5[path] = (version, md5)
+        updated = datetime.fromtimestamp(meta.st_mtime_ns / 1e9, tz=timezone.utc)
+        return BlobInfo(blob_name, meta.st_mtime_ns, meta.st_size, updated, md5)
+
+    def _generation(self, path: str) -> int:
+        try:
+            return os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return 0
+
+    def stat(self, bucket_name, blob_name):
+        path = self._path(bucket_name, blob_name)
+        try:
+            return self._info(blob_name, path)
+        except FileNotFoundError:
+            return None
+
+    def download(self, bucket_name, blob_name, if_generation_match=None):
+        path = self._path(bucket_name, blob_name)
+        with self._lock:
+            generation = self._generation(path)
+            if not generation:
+                raise NotFound(f'{bucket_name}/{blob_name}')
+            if if_generation_match is not None and generation != if_generation_match:
+                raise PreconditionFailed(f'{bucket_name}/{blob_name}')
+            with open(path, 'rb') as f:
+                return f.read(), generation
+
+    def upload(self, bucket_name, blob_name, data, content_type, if_generation_match=None):
+        path = self._path(bucket_name, blob_name)
+        with self._lock:
+            previous = self._generation(path)
+            if if_generation_match is not None and previous != if_generation_match:
+                raise PreconditionFailed(f'{bucket_name}/{blob_name}')
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = path + self.TMP_SUFFIX
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            generation = max(time.time_ns(), previous + 1)
+            os.utime(tmp_path, ns=(generation, generation))
+            os.replace(tmp_path, path)
+            return self._info(blob_name, path, data)
+
+    def delete(self, bucket_name, blob_name, if_generation_match=None):
+        path = self._path(bucket_name, blob_name)
+        with self._lock:
+            generation = self._generation(path)
+            if not generation:
+                raise NotFound(f'{bucket_name}/{blob_name}')
+            if if_generation_match is not None and generation != if_generation_match:
+                raise PreconditionFailed(f'{bucket_name}/{blob_name}')
+            os.remove(path)
+            self._md5.pop(path, None)
+
+    def iter_blobs(self, bucket_name, prefix, extension='', page_size=LIST_PAGE_SIZE):
+        bucket_root = os.path.join(self.root, bucket_name)
+        names = list()
+        for dirpath, _, filenames in os.walk(bucket_root):
+            rel_dir = os.path.relpath(dirpath, bucket_root).replace(os.sep, '/')
+            for filename in filenames:
+                name = filename if rel_dir == '.' else f'{rel_dir}/{filename}'
+                if filename.endswith(self.TMP_SUFFIX):
+                    continue
+                if name.startswith(prefix) and name.endswith(extension):
+                    names.append(name)
+        for name in sorted(names):
+            try:
+                yield self._info(name, self._path(bucket_name, name))
+            except FileNotFoundError:
+                continue
+
+    def stats(self):
+        return {'backend': self.name, 'root': self.root}
+
+################################################################################
+
+def storage_mode() -> str:
+    """Storage mode from the environment variable, falling back to `st.secrets['env']['mode']`."""
+    return os.environ.get(STORAGE_MODE_ENV) or st.secrets['env']['mode']
+
+def storage_dir() -> str:
+    """Root directory used by the filesystem backend (and to seed the memory backend)."""
+    return (
+        os.environ.get(STORAGE_DIR_ENV)
+        or st.secrets['env'].get('storage_dir', DEFAULT_STORAGE_DIR)
+    )
+
+@st.cache_resource(show_spinner=False)
+def get_backend() -> StorageBackend:
+    """Return the process-wide storage backend for the configured mode.
+
+    `memory` and `filesystem` run fully offline; any other mode uses Cloud Storage
+    (`cloud` with the service account from secrets, otherwise default credentials).
+    """
+    with _BUILDS_LOCK:
+        _BUILDS['count'] += 1
+    mode = storage_mode()
+    if mode == 'memory':
+        return MemoryBackend(seed_dir=storage_dir())
+    if mode == 'filesystem':
+        return LocalBackend(storage_dir())
+    return GCSBackend(mode)
+
+def backend_builds() -> int:
+    """Number of times the shared backend was built in this process (pool misses)."""
+    with _BUILDS_LOCK:
+        return _BUILDS['count']
@@ -0,0 +1,41 @@
+# app/src/tokens.py
+
+from functools import lru_cache
+import re
+
+CHARS_PER_TOKEN = 4
+TOKEN_CACHE_SIZE = 4096
+PIECE_RX = re.compile(r'[^\W\d_]+|\d+|[^\w\s]|\s+')
+
+def _word_tokens(word: str) -> int:
+    """BPE vocabularies keep short words whole and split long ones into ~4-char pieces."""
+    return 1 if len(word) <= CHARS_PER_TOKEN + 1 else -(-len(word) // CHARS_PER_TOKEN)
+
+@lru_cache(maxsize=TOKEN_CACHE_SIZE)
+def estimate_tokens(text: str) -> int:
+    """Offline approximation of the LLM token count of `text` (no tokenizer download).
+
+    Letter runs cost one token per ~4 characters, digit runs one per 3 digits, punctuation
+    one per mark, and a whitespace run costs one token only when it breaks the line.
+    Results are cached by content.
+    """
+    total = 0
+    for piece in PIECE_RX.findall(text or ''):
+        first = piece[0]
+        if first.isalpha():
+            total += _word_tokens(piece)
+        elif first.isdigit():
+            total += -(-len(piece) // 3)
+        elif first.isspace():
+            total += '\n' in piece
+        else:
+            total += 1
+    return total
+
+def token_stats(text: str) -> dict:
+    """Token estimate plus raw size of `text`."""
+    return {
+        'tokens': estimate_tokens(text),
+        'chars': len(text or ''),
+        'lines': len((text or '').splitlines()),
+    }
@@ -26,3 +26,41 @@ def blob_to_domain(blob_name: str, client_dir: str, ext: str) -> str:
     """Converts Google Cloud Storage blob to domain (mail domain)."""
     raw = blob_name.removeprefix(client_dir).removesuffix(ext)
     return raw.replace('-', '.')
+
+def show_write_result(result, label: str):
+    """Display the outcome of a conditional save (written, skipped or conflict)."""
+    if result.conflict:
+        st.error(
+            f'⚠️ `{label}` was changed by someone else since you opened it. '
+            'Reload to get the latest version, then re-apply your edits.'
+        )
+    elif result.skipped:
+        st.info(f'ℹ️ No changes to save in `{label}`')
+    else:
+        st.success(f'✅ Saved `{label}`')
+
+def prefetch_once(key: str, label: str, prefetch):
+    """Run a bulk `prefetch(on_progress=...)` once per session, showing a progress bar."""
+    flag = f'_prefetched::{key}'
+    if st.session_state.get(flag):
+        return
+
+    bar = st.progress(0.0, text=label)
+
+    def _on_progress(done: int, total: int, _name: str):
+        bar.progress(done / total, text=f'{label} ({done}/{total})')
+
+    errors = prefetch(on_progress=_on_progress)
+    bar.empty()
+    if errors:
+        st.warning(f'⚠️ Could not preload {len(errors)} file(s): {", ".join(sorted(errors))}')
+    st.session_state[flag] = True
+
+def show_issues(issues, label: str):
+    """Display line-anchored validation issues; errors block the save."""
+    errors = [x for x in issues if x.severity == 'error']
+    warnings = [x for x in issues if x.severity != 'error']
+    if errors:
+        st.error(f'❌ `{label}` has errors:\n\n' + '\n'.join(f'- {x}' for x in errors))
+    if warnings:
+        st.warning('\n'.join(f'- ⚠️ {x}' for x in warnings))
@@ -0,0 +1,165 @@
+# app/src/validation.py
+
+import streamlit as st
+
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+from dataclasses import dataclass
+import threading
+import hashlib
+import ast
+
+from src.clients import client_config_node, client_config_from_tree, ClientConfigError
+
+KIND_PROMPT = 'prompt'
+KIND_CLIENT = 'client'
+ERROR = 'error'
+WARNING = 'warning'
+
+VALIDATION_WORKERS = 4
+VALIDATION_CACHE_SIZE = 512
+PLACEHOLDER_MARKERS = ('[Agregar', '[Descripción', '[Servicio', '[Información')
+
+@dataclass(frozen=True)
+class Issue:
+    line: int
+    severity: str
+    message: str
+    col: int = 0
+
+    def __str__(self) -> str:
+        return f'L{self.line}: {self.message}'
+
+def _syntax_issue(e: SyntaxError) -> Issue:
+    return Issue(e.lineno or 1, ERROR, f'Syntax error: {e.msg}', e.offset or 0)
+
+def _top_level_targets(tree: ast.Module) -> list[tuple[str, ast.stmt]]:
+    """(name, statement) for every top-level `name = ...` / `name: T = ...`."""
+    targets = list()
+    for node in tree.body:
+        if isinstance(node, ast.Assign):
+            names = [t.id for t in node.targets if isinstance(t, ast.Name)]
+        elif isinstance(node, ast.AnnAssign) and isinstance(node.target, ast.Name):
+            names = [node.target.id]
+        else:
+            continue
+        targets.extend((name, node) for name in names)
+    return targets
+
+def _duplicate_issues(targets: list[tuple[str, ast.stmt]]) -> list[Issue]:
+    seen, issues = dict(), list()
+    for name, node in targets:
+        if name in seen:
+            issues.append(Issue(
+                node.lineno, WARNING, f'`{name}` is reassigned (overrides line {seen[name]})'
+            ))
+        seen[name] = node.lineno
+    return issues
+
+def _validate_prompt(tree: ast.Module) -> list[Issue]:
+    """Prompt modules should only define names; anything else runs when the backend loads them."""
+    issues = list()
+    allowed = (
+        ast.Assign, ast.AnnAssign, ast.Import, ast.ImportFrom, ast.FunctionDef, ast.ClassDef
+    )
+    for i, node in enumerate(tree.body):
+        is_docstring = (
+            i == 0 and isinstance(node, ast.Expr) and isinstance(node.value, ast.Constant)
+            and isinstance(node.value.value, str)
+        )
+        if not isinstance(node, allowed) and not is_docstring:
+            issues.append(Issue(
+                node.lineno, WARNING, f'Top-level `{type(node).__name__}` statement runs on import'
+            ))
+
+    targets = _top_level_targets(tree)
+    if not targets:
+        issues.append(Issue(1, WARNING, 'No top-level prompt variables are defined'))
+    issues.extend(_duplicate_issues(targets))
+    return issues
+
+def _validate_client(tree: ast.Module) -> list[Issue]:
+    """`CLIENT_CONFIG` must be accepted by the client config parser; then lint its entries."""
+    issues = _duplicate_issues(_top_level_targets(tree))
+    node = client_config_node(tree)
+    try:
+        client_config_from_tree('', tree)
+    except ClientConfigError as e:
+        issues.append(Issue(node.lineno if node else 1, ERROR, str(e)))
+    if node is None or not isinstance(node.value, ast.Dict):
+        return issues
+
+    keys = dict()
+    for key, item in zip(node.value.keys, node.value.values):
+        if not (isinstance(key, ast.Constant) and isinstance(key.value, str)):
+            continue
+        if key.value in keys:
+            message = f'Duplicate key "{key.value}" (overrides line {keys[key.value]})'
+            issues.append(Issue(key.lineno, WARNING, message))
+        keys[key.value] = key.lineno
+
+        if not (isinstance(item, ast.Constant) and isinstance(item.value, str)):
+            continue
+        if not item.value.strip():
+            issues.append(Issue(item.lineno, WARNING, f'"{key.value}" is empty'))
+        elif any(marker in item.value for marker in PLACEHOLDER_MARKERS):
+            issues.append(Issue(item.lineno, WARNING, f'"{key.value}" still has template text'))
+    return issues
+
+VALIDATORS = {
+    KIND_PROMPT: _validate_prompt,
+    KIND_CLIENT: _validate_client,
+}
+
+def validate_source(source: str, kind: str) -> tuple[Issue, ...]:
+    """Parse `source` and run the checks for `kind`; issues are sorted by line."""
+    try:
+        tree = ast.parse(source or '')
+    except SyntaxError as e:
+        return (_syntax_issue(e),)
+    except ValueError as e:
+        # e.g. null bytes in the source (Python <= 3.11)
+        return (Issue(1, ERROR, f'Invalid source: {e}'),)
+    return tuple(sorted(VALIDATORS[kind](tree), key=lambda x: (x.line, x.severity)))
+
+def has_errors(issues) -> bool:
+    return any(issue.severity == ERROR for issue in issues)
+
+class _Validator:
+    """Runs validations in a worker pool and caches results by content hash."""
+
+    def __init__(self, max_workers: int = VALIDATION_WORKERS, size: int = VALIDATION_CACHE_SIZE):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='validate')
+        self._cache = OrderedDict()
+        self._size = size
+        self._lock = threading.Lock()
+
+    def _key(self, source: str, kind: str) -> tuple[str, str]:
+        return kind, hashlib.sha256((source or '').encode('utf-8')).hexdigest()
+
+    def submit(self, source: str, kind: str):
+        """Future with the issues of `source`, shared between callers of the same content."""
+        key = self._key(source, kind)
+        with self._lock:
+            future = self._cache.get(key)
+            if future is not None:
+                self._cache.move_to_end(key)
+                return future
+            future = self._pool.submit(validate_source, source, kind)
+            self._cache[key] = future
+            while len(self._cache) > self._size:
+                self._cache.popitem(last=False)
+        return future
+
+@st.cache_resource(show_spinner=False)
+def _validator() -> _Validator:
+    return _Validator()
+
+def validate(source: str, kind: str) -> tuple[Issue, ...]:
+    """Validate one file off the script thread; unchanged content is answered from cache."""
+    return _validator().submit(source, kind).result()
+
+def validate_many(sources: dict[str, str], kind: str) -> dict[str, tuple[Issue, ...]]:
+    """Validate several files concurrently; returns issues per name."""
+    futures = {name: _validator().submit(source, kind) for name, source in sources.items()}
+    return {name: future.result() for name, future in futures.items()}
@@ -0,0 +1,58 @@
+# scripts/bench_domain_matcher.py
+
+import random
+import string
+import sys
+import os
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+from src.domains import DomainMatcher, load_matcher
+
+TLDS = ['com', 'cl', 'io', 'pro', 'net', 'org', 'com.ar', 'co.uk']
+
+def random_domain(rng: random.Random) -> str:
+    """Generate a plausible random domain."""
+    name = ''.join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 12)))
+    return f'{name}.{rng.choice(TLDS)}'
+
+def bench(entries: int, lookups: int, seed: int = 7):
+    """Compile `entries` rules and time `lookups` classifications."""
+    rng = random.Random(seed)
+    domains = [random_domain(rng) for _ in range(entries)]
+    automation = domains[: entries // 2]
+    draft = domains[entries // 2:]
+    draft += [f'*.{d}' for d in rng.sample(automation, k=min(100, len(automation)))]
+
+    compile_s = timeit.timeit(lambda: DomainMatcher.compile(automation, draft), number=1)
+    matcher = DomainMatcher.compile(automation, draft)
+    artifact = matcher.dumps()
+    load_s = timeit.timeit(lambda: DomainMatcher.loads(artifact), number=1)
+
+    queries = [
+        rng.choice([
+            rng.choice(domains),
+            f'mail.{rng.choice(domains)}',
+            f'someone@{rng.choice(domains)}',
+            random_domain(rng),
+        ])
+        for _ in range(lookups)
+    ]
+    lookup_s = timeit.timeit(lambda: [matcher.classify(q) for q in queries], number=1)
+
+    print(f'entries={entries:>7}  compile={compile_s * 1e3:8.1f} ms  '
+          f'load={load_s * 1e3:8.1f} ms  artifact={len(artifact) / 1024:8.1f} KiB  '
+          f'lookup={lookup_s / lookups * 1e6:6.2f} us  overlaps={len(matcher.overlaps)}')
+
+if __name__ == '__main__':
+    if len(sys.argv) == 3 and sys.argv[1] == '--artifact':
+        matcher = load_matcher(sys.argv[2])
+        print(f'Loaded {len(matcher.exact)} exact and {len(matcher.wildcard)} wildcard rules')
+        sys.exit(0)
+    if len(sys.argv) > 2:
+        print('Usage: python bench_domain_matcher.py [lookups] | --artifact <path>')
+        sys.exit(1)
+    lookups = int(sys.argv[1]) if len(sys.argv) == 2 else 100_000
+    for entries in (1_000, 10_000, 50_000):
+        bench(entries, lookups)
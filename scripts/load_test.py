@@ -0,0 +1,70 @@
+# scripts/load_test.py
+
+import argparse
+import time
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+from src.loadtest import (
+    LOADTEST_MAX_INFLIGHT,
+    PERCENTILES,
+    load_test,
+    samples_frame,
+    summarize_samples
+)
+from src.scenarios import ENDPOINTS, CREATE_MEETING, scenario_payloads
+
+# Endpoint path tail -> scenarios label, e.g. `classify` or `close_thread_message_sent`
+TARGETS = {
+    spec['path'].rsplit('/', 1)[-1]: name
+    for name, spec in ENDPOINTS.items() if name != CREATE_MEETING
+}
+
+def _line(summary: dict) -> str:
+    percentiles = '  '.join(f"p{p}={summary[f'p{p}_ms']}" for p in PERCENTILES)
+    return (f"t={summary['elapsed_s']:>6}s  requests={summary['requests']:>6}  "
+            f"dropped={summary['dropped']:>5}  "
+            f"rps={summary['throughput_rps']:>7}  errors={summary['error_rate']:.1%}  "
+            f"inflight={summary['inflight']:>3}  {percentiles}")
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description='Load test a zero_effort endpoint.')
+    parser.add_argument('--url', required=True, help='API base URL')
+    parser.add_argument('--token', default=os.environ.get('ID_TOKEN'),
+                        help='Bearer ID token (default: $ID_TOKEN)')
+    parser.add_argument('--endpoint', choices=sorted(TARGETS), default='classify')
+    load = parser.add_mutually_exclusive_group(required=True)
+    load.add_argument('--rps', type=float, help='Target requests per second (open model)')
+    load.add_argument('--concurrency', type=int, help='Concurrent workers (closed model)')
+    parser.add_argument('--duration', type=float, default=30, help='Seconds to run')
+    parser.add_argument('--max-inflight', type=int, default=LOADTEST_MAX_INFLIGHT,
+                        help='With --rps, drop requests beyond this many pending')
+    parser.add_argument('--csv', help='Write the raw samples to this file')
+    args = parser.parse_args(argv)
+
+    endpoint = TARGETS[args.endpoint]
+    headers = {'Authorization': f'Bearer {args.token}'} if args.token else None
+    started = time.perf_counter()
+    samples = load_test(
+        f"{args.url.rstrip('/')}/{ENDPOINTS[endpoint]['path']}",
+        scenario_payloads(endpoint),
+        args.duration,
+        rps=args.rps,
+        concurrency=args.concurrency,
+        headers=headers,
+        max_inflight=args.max_inflight,
+        on_progress=lambda summary, _: print(_line(summary), flush=True)
+    )
+
+    summary = summarize_samples(samples, time.perf_counter() - started)
+    print('status codes:', summary['status_codes'])
+    if args.csv:
+        samples_frame(samples).to_csv(args.csv, index=False)
+        print(f'Wrote {len(samples)} samples to {args.csv}')
+    # Non-zero exit when any request failed or was dropped, so the script can gate a deploy
+    return 1 if summary['errors'] or summary['dropped'] else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,70 @@
+# tests/test_bundle.py
+
+import zipfile
+import json
+import io
+
+import pytest
+
+from src.bundle import BundleError, resolve_imports, _load_order, _module_name, build_bundle
+
+def test_module_name():
+    assert _module_name('zero_effort/classify.py') == 'zero_effort.classify'
+    assert _module_name('zero_effort/__init__.py') == 'zero_effort'
+
+def test_resolve_absolute_and_relative_imports():
+    sources = {
+        'common.py': 'GREETING = "hola"\n',
+        'flows/__init__.py': '',
+        'flows/base.py': 'def render(): pass\n',
+        'flows/meeting.py': (
+            'import os\n'
+            'import common\n'
+            'from prompts.common import GREETING\n'
+            'from . import base\n'
+            'from .base import render\n'
+        ),
+    }
+    deps, issues = resolve_imports(sources, 'prompts')
+    assert issues == {}
+    assert deps['flows/meeting.py'] == {'common.py', 'flows/base.py'}
+    assert deps['common.py'] == set()
+
+def test_resolve_reports_unresolved_imports():
+    sources = {
+        'common.py': 'GREETING = "hola"\n',
+        'a.py': 'import prompts.missing\nfrom common import FAREWELL\nfrom ... import x\n',
+    }
+    deps, issues = resolve_imports(sources, 'prompts')
+    assert issues == {'a.py': [
+        'L1: cannot resolve import `prompts.missing`',
+        'L2: `FAREWELL` not found in `common`',
+        'L3: relative import beyond the prompts root',
+    ]}
+    assert deps['a.py'] == set()
+
+def test_load_order_puts_dependencies_first():
+    deps = {'a.py': {'b.py'}, 'b.py': {'c.py'}, 'c.py': set(), 'd.py': {'c.py'}}
+    assert _load_order(deps) == ['c.py', 'b.py', 'a.py', 'd.py']
+
+def test_load_order_rejects_cycles():
+    deps, _ = resolve_imports({'a.py': 'import b\n', 'b.py': 'from a import *\n'}, 'prompts')
+    with pytest.raises(BundleError, match='Import cycle: a.py -> b.py -> a.py'):
+        _load_order(deps)
+
+def test_build_bundle_is_content_addressed():
+    sources = {'b.py': 'import a\n', 'a.py': 'X = 1\n'}
+    deps = {'a.py': set(), 'b.py': {'a.py'}}
+    data, manifest = build_bundle(sources, {'a.py': 3, 'b.py': 4}, deps, ['a.py', 'b.py'])
+    assert manifest['load_order'] == ['a.py', 'b.py']
+    assert manifest['files']['b.py']['imports'] == ['a.py']
+    assert manifest['files']['a.py']['generation'] == 3
+    assert manifest['bundle_id'] == manifest['sha256'][:16]
+
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        assert sorted(archive.namelist()) == ['a.py', 'b.py', 'manifest.json']
+        assert json.loads(archive.read('manifest.json'))['files'] == manifest['files']
+        assert archive.read('b.py') == b'import a\n'
+
+    _, again = build_bundle(sources, {'a.py': 5, 'b.py': 6}, deps, ['a.py', 'b.py'])
+    assert again['bundle_id'] == manifest['bundle_id']
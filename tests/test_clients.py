@@ -0,0 +1,56 @@
+# tests/test_clients.py
+
+import pytest
+
+from src.clients import compile_calendar_rules, parse_client_config, ClientConfigError
+
+WEEK = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday')
+
+def _days(text: str) -> dict:
+    return compile_calendar_rules(text).to_dict()['days']
+
+def test_unlabelled_hours_keep_the_colon_of_the_times():
+    rules = compile_calendar_rules('Lunes a viernes de 9:00 a 18:00')
+    days = rules.to_dict()['days']
+    assert all(days[d] == [['09:00', '18:00']] for d in WEEK)
+    assert days['saturday'] == days['sunday'] == list()
+    assert rules.unparsed == ()
+    assert not any('Días disponibles' in a for a in rules.assumptions)
+
+def test_labelled_rules():
+    days = _days(
+        'Horario de atención: 8:00 a 18:00\n'
+        'Almuerzo: 14:00 a 15:00\n'
+        'Días no disponibles: miércoles\n'
+        'Zona horaria: America/Santiago'
+    )
+    assert days['monday'] == [['08:00', '14:00'], ['15:00', '18:00']]
+    assert days['wednesday'] == list()
+
+def test_label_without_space_before_the_time():
+    assert _days('Horario:9:00 a 13:00')['tuesday'] == [['09:00', '13:00']]
+
+def test_free_form_exclusions():
+    days = _days('lunes a sábado 9 a 18\nNo agendar los sábados\nNo agendar viernes 16 a 18')
+    assert days['saturday'] == list()
+    assert days['friday'] == [['09:00', '16:00']]
+
+def test_defaults_are_reported():
+    rules = compile_calendar_rules('Horario: 9 a 17')
+    assert rules.timezone == 'America/Santiago'
+    assert len(rules.assumptions) == 2
+    assert rules.to_dict()['days']['saturday'] == list()
+
+def test_unknown_lines_are_unparsed():
+    rules = compile_calendar_rules('Horario: 9 a 17\nZona horaria: Marte/Olympus\nllamar antes')
+    assert [n for n, _ in rules.unparsed] == [2, 3]
+
+def test_parse_client_config_accepts_annotated_assignment():
+    code = 'CLIENT_CONFIG: dict = {"description": " x ", "calendar_rules": "", "tone": "formal"}'
+    config = parse_client_config('acme', code, generation=3)
+    assert (config.description, config.extra, config.generation) == ('x', {'tone': 'formal'}, 3)
+
+@pytest.mark.parametrize('code', ['CLIENT_CONFIG = {', 'OTHER = {}', 'CLIENT_CONFIG = f()'])
+def test_parse_client_config_rejects_invalid_files(code):
+    with pytest.raises(ClientConfigError):
+        parse_client_config('acme', code)
@@ -0,0 +1,83 @@
+# tests/test_domains.py
+
+import re
+
+from src.domains import (
+    DomainMatcher,
+    StagedDomainList,
+    domain_rules,
+    export_domain_lists,
+    parse_domain_import,
+    split_wildcards,
+    AUTOMATION,
+    DRAFT
+)
+
+PATTERN = re.compile(r'^(\*\.)?[a-z0-9.-]+\.[a-z]{2,}$', re.I)
+
+def test_matcher_exact_and_wildcard_rules():
+    matcher = DomainMatcher.compile(['acme.com', '*.corp.io'], ['Beta.org'])
+    assert matcher.classify('ana@ACME.com') == AUTOMATION
+    assert matcher.classify('beta.org') == DRAFT
+    assert matcher.classify('mail.eu.corp.io') == AUTOMATION
+    assert matcher.classify('corp.io') is None
+    assert matcher.classify('sub.acme.com') is None
+
+def test_matcher_precedence_and_overlaps():
+    matcher = DomainMatcher.compile(
+        ['*.corp.io', 'x.corp.io', 'both.com'], ['*.eu.corp.io', 'both.com']
+    )
+    assert matcher.classify('a.eu.corp.io') == DRAFT
+    assert matcher.classify('x.corp.io') == AUTOMATION
+    assert matcher.classify('both.com') == DRAFT
+    assert [x['domain'] for x in matcher.overlaps] == ['both.com']
+
+def test_matcher_round_trip():
+    matcher = DomainMatcher.compile(['acme.com', '*.corp.io'], ['beta.org'], source_generation=7)
+    loaded = DomainMatcher.loads(matcher.dumps())
+    assert loaded.source_generation == 7
+    assert (loaded.exact, loaded.wildcard) == (matcher.exact, matcher.wildcard)
+
+def test_subdomain_rules_live_under_their_own_key():
+    automation = {'automationlist': ['a.com'], 'automationlist_subdomains': ['b.com']}
+    assert domain_rules(automation, 'automationlist') == ['a.com', '*.b.com']
+    assert domain_rules(automation, 'draftlist') == list()
+    assert split_wildcards(['a.com', '*.b.com']) == ({'a.com'}, {'b.com'})
+
+def test_staged_list_add_remove_and_discard():
+    domains = StagedDomainList(['b.com', 'a.com'])
+    assert domains.add('c.com') and not domains.add('a.com')
+    assert domains.remove('a.com') and not domains.remove('zzz.com')
+    assert domains.items() == ['b.com', 'c.com']
+    assert domains.search('C.') == ['c.com']
+    assert domains.pending == 2
+    domains.discard()
+    assert domains.items() == ['a.com', 'b.com'] and domains.pending == 0
+
+def test_staged_list_re_adding_a_removed_domain_cancels_the_removal():
+    domains = StagedDomainList(['a.com'])
+    domains.remove('a.com')
+    domains.add('a.com')
+    assert domains.pending == 0
+
+def test_import_classifies_pasted_domains():
+    target, other = StagedDomainList(['have.com']), StagedDomainList(['move.com'])
+    plan = parse_domain_import(
+        'new.com; ana@Other.org\nhave.com move.com new.com not-a-domain', PATTERN, target, other
+    )
+    assert plan == {
+        'added': ['new.com', 'other.org'],
+        'moved': ['move.com'],
+        'skipped': ['have.com', 'new.com'],
+        'invalid': ['not-a-domain'],
+    }
+
+def test_export_imports_back_into_the_same_list():
+    csv_text = export_domain_lists(['a.com', '*.b.com'], ['c.com'])
+    assert csv_text.splitlines()[:3] == ['domain,list,match', 'a.com,automation,exact',
+                                         '*.b.com,automation,subdomains']
+    plan = parse_domain_import(
+        csv_text, PATTERN, StagedDomainList([]), StagedDomainList([]), target_name=AUTOMATION
+    )
+    assert plan['added'] == ['a.com', '*.b.com']
+    assert plan['skipped'] == ['c.com']
@@ -0,0 +1,12 @@
+# tests/test_history.py
+
+from src.history import content_digest, diff_versions
+
+def test_content_digest_is_the_utf8_sha256():
+    assert content_digest('') == 'e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855'
+    assert content_digest('miércoles') != content_digest('miercoles')
+
+def test_diff_versions():
+    diff = diff_versions('a\nb\n', 'a\nc\n', 'v1', 'v2')
+    assert diff.splitlines() == ['--- v1', '+++ v2', '@@ -1,2 +1,2 @@', ' a', '-b', '+c']
+    assert diff_versions('same\n', 'same\n', 'v1', 'v2') == ''
@@ -0,0 +1,115 @@
+# tests/test_intervals.py
+
+import numpy as np
+
+from datetime import timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from src.intervals import (
+    parse_minutes,
+    source_tz,
+    merge,
+    freeblock_arrays,
+    intersection,
+    union,
+    contains,
+    parse_slot,
+    check_proposed_slots,
+    heatmap_frame,
+    freeblocks_frame
+)
+
+def minute(iso: str) -> int:
+    return int(parse_minutes([iso])[0])
+
+FREEBLOCKS = {
+    'ana@acme.com': [
+        {'start': '2025-05-12T10:00:00-04:00', 'end': '2025-05-12T11:00:00-04:00'},
+        {'start': '2025-05-12T11:00:00-04:00', 'end': '2025-05-12T12:00:00-04:00'},
+    ],
+    'bob@acme.com': [
+        {'start': '2025-05-12T14:30:00Z', 'end': '2025-05-12T17:00:00Z'},
+        {'start': 'not a date', 'end': '2025-05-12T18:00:00Z'},
+    ],
+}
+
+def test_parse_minutes_normalizes_offsets():
+    values = parse_minutes(['2025-05-12T10:00:00-04:00', '2025-05-12T14:00:00Z', '', None])
+    assert values[0] == values[1] == 1747058400 // 60
+    assert list(values[2:]) == [-1, -1]
+
+def test_merge_joins_overlapping_and_touching_rows():
+    rows = np.array([[10, 20], [0, 5], [5, 8], [15, 30], [40, 50]], dtype=np.int64)
+    assert merge(rows).tolist() == [[0, 8], [10, 30], [40, 50]]
+    assert merge(np.empty((0, 2), dtype=np.int64)).shape == (0, 2)
+
+def test_freeblock_arrays_skip_invalid_slots():
+    arrays = freeblock_arrays(FREEBLOCKS)
+    assert arrays['ana@acme.com'].tolist() == [
+        [minute('2025-05-12T14:00:00Z'), minute('2025-05-12T16:00:00Z')]
+    ]
+    assert len(arrays['bob@acme.com']) == 1
+    assert len(freeblock_arrays({'x@acme.com': None})['x@acme.com']) == 0
+
+def test_intersection_union_and_contains():
+    arrays = freeblock_arrays(FREEBLOCKS)
+    both = intersection(arrays)
+    assert both.tolist() == [[minute('2025-05-12T14:30:00Z'), minute('2025-05-12T16:00:00Z')]]
+    assert union(arrays).tolist() == [
+        [minute('2025-05-12T14:00:00Z'), minute('2025-05-12T17:00:00Z')]
+    ]
+    starts = np.array([minute('2025-05-12T14:30:00Z'), minute('2025-05-12T15:45:00Z'), -1])
+    assert contains(both, starts, starts + 30).tolist() == [True, False, False]
+    assert intersection(dict()).shape == (0, 2)
+
+def test_parse_slot():
+    start = minute('2025-05-12T14:00:00Z')
+    assert parse_slot('2025-05-12 10:00-04:00') == (start, start + 30)
+    assert parse_slot('lunes 2025-05-12T14:00Z - 15:15') == (start, start + 75)
+    assert parse_slot('2025-05-12 10:00 a 10:45', timezone(timedelta(hours=-4))) == (
+        start, start + 45
+    )
+    assert parse_slot('2025-05-12 10:00 - 09:00') is None
+    assert parse_slot('mañana a las 10') is None
+
+def test_check_proposed_slots():
+    arrays = freeblock_arrays(FREEBLOCKS)
+    rows = check_proposed_slots([
+        ['ANA@acme.com', '2025-05-12 14:00Z'],
+        ['bob@acme.com', '2025-05-12 14:00Z'],
+        '2025-05-12 15:00Z',
+        'sin fecha',
+    ], arrays)
+    assert [(r['fits'], r['all_free'], r['parsed']) for r in rows] == [
+        (True, False, True),
+        (False, False, True),
+        (True, True, True),
+        (False, False, False),
+    ]
+
+def test_source_tz_follows_the_zone_only_when_offsets_agree():
+    santiago = ZoneInfo('America/Santiago')
+    summer = {'a': [{'start': '2025-01-10T10:00:00-03:00'}]}
+    winter = {'a': [{'start': '2025-07-10T10:00:00-04:00'}]}
+    assert source_tz(summer) == santiago
+    assert source_tz(winter) == santiago
+    assert source_tz({'a': [{'start': '2025-01-10T10:00:00-05:00'}]}) == timezone(
+        timedelta(hours=-5)
+    )
+    assert source_tz({'a': [{'start': '2025-01-10T10:00:00'}]}) == timezone.utc
+    assert source_tz({'a': [{'start': 'x'}]}) == santiago
+    assert source_tz(dict()) == santiago
+
+def test_heatmap_frame_counts_free_sellers_per_bin():
+    frame = heatmap_frame(freeblock_arrays(FREEBLOCKS), timezone(timedelta(hours=-4)))
+    assert frame['time'].tolist() == ['10:00', '10:30', '11:00', '11:30', '12:00', '12:30']
+    assert frame['free'].tolist() == [1, 2, 2, 2, 1, 1]
+    assert set(frame['date']) == {'Mon 2025-05-12'}
+    assert heatmap_frame(dict()).empty
+
+def test_freeblocks_frame_keeps_unparseable_values():
+    frame = freeblocks_frame(FREEBLOCKS, timezone(timedelta(hours=-4)))
+    assert frame.iloc[0].tolist() == [
+        'ana@acme.com', '2025-05-12 10:00', '2025-05-12 11:00', '1.0h'
+    ]
+    assert frame.iloc[3].tolist() == ['bob@acme.com', 'not a date', '2025-05-12 14:00', '']
@@ -0,0 +1,53 @@
+# tests/test_jsonpatch.py
+
+import pytest
+
+from src.jsonpatch import PatchError, apply_patch, make_patch, list_set_patch, pointer
+
+def test_pointer_escapes_tokens():
+    assert pointer('a/b', 'c~d', 0) == '/a~1b/c~0d/0'
+
+def test_apply_patch_does_not_modify_the_input():
+    doc = {'a': {'b': [1, 2]}}
+    new = apply_patch(doc, [
+        {'op': 'add', 'path': '/a/b/-', 'value': 3},
+        {'op': 'replace', 'path': '/a/b/0', 'value': 0},
+        {'op': 'add', 'path': '/c', 'value': 'x'},
+    ])
+    assert new == {'a': {'b': [0, 2, 3]}, 'c': 'x'}
+    assert doc == {'a': {'b': [1, 2]}}
+
+@pytest.mark.parametrize('op', [
+    {'op': 'test', 'path': '/a', 'value': 2},
+    {'op': 'remove', 'path': '/missing'},
+    {'op': 'replace', 'path': '/list/5', 'value': 1},
+    {'op': 'add', 'path': 'no-slash', 'value': 1},
+    {'op': 'move', 'path': '/a', 'from': '/b'},
+])
+def test_apply_patch_rejects_ops_that_do_not_apply(op):
+    with pytest.raises(PatchError):
+        apply_patch({'a': 1, 'list': [1]}, [op])
+
+def test_make_patch_round_trip():
+    old = {'keep': 1, 'drop': 2, 'nested': {'x': 1, 'y': [1]}}
+    new = {'keep': 1, 'nested': {'x': 2, 'y': [1], 'z': True}, 'added': 'v'}
+    assert apply_patch(old, make_patch(old, new)) == new
+
+def test_make_patch_guards_concurrent_changes():
+    ops = make_patch({'a': 1}, {'a': 2})
+    with pytest.raises(PatchError):
+        apply_patch({'a': 5}, ops)
+
+def test_make_patch_from_a_missing_key_is_a_plain_add():
+    assert make_patch(dict(), {'automation': {'x': 1}}) == [
+        {'op': 'add', 'path': '/automation', 'value': {'x': 1}}
+    ]
+
+def test_list_set_patch():
+    current = ['a', 'b', 'c']
+    ops = list_set_patch('/l', current, added={'d', 'a'}, removed={'a', 'c'})
+    assert apply_patch({'l': current}, ops) == {'l': ['b', 'd']}
+    # Removals are guarded, so a reordered list makes the patch fail instead of deleting
+    # the wrong value
+    with pytest.raises(PatchError):
+        apply_patch({'l': ['c', 'b', 'a']}, ops)
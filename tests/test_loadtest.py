@@ -0,0 +1,99 @@
+# tests/test_loadtest.py
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+import time
+
+import pytest
+
+from src.loadtest import DROPPED, load_test, summarize_samples, timeline
+
+def sample(
+    t: float,
+    status_code: int | None = 200,
+    latency_ms: float | None = 10.0,
+    error: str | None = None
+) -> dict:
+    return {
+        't': t, 'scenario': 's', 'status_code': status_code, 'latency_ms': latency_ms,
+        'error': error,
+    }
+
+SAMPLES = [
+    sample(0.1, latency_ms=10.0),
+    sample(0.5, latency_ms=30.0),
+    sample(0.9, status_code=500, latency_ms=5.0),
+    sample(1.2, status_code=None, latency_ms=None, error=DROPPED),
+    sample(1.4, status_code=None, latency_ms=2.0, error='ConnectError: refused'),
+    sample(1.6, latency_ms=20.0),
+]
+
+def test_summary_excludes_dropped_requests():
+    summary = summarize_samples(SAMPLES, elapsed=2.0)
+    assert summary['requests'] == 5
+    assert summary['dropped'] == 1
+    assert summary['errors'] == 2
+    assert summary['error_rate'] == 0.4
+    assert summary['throughput_rps'] == 2.5
+    assert summary['status_codes'] == {'200': 3, '500': 1, 'dropped': 1, 'ConnectError': 1}
+    assert (summary['p50_ms'], summary['max_ms']) == (20.0, 30.0)
+
+def test_summary_of_nothing():
+    summary = summarize_samples(list(), elapsed=0)
+    assert (summary['requests'], summary['error_rate'], summary['throughput_rps']) == (0, 0.0, 0.0)
+    assert summary['p90_ms'] is None
+
+def test_timeline_per_second():
+    frame = timeline(SAMPLES)
+    assert frame['second'].tolist() == [0, 1]
+    assert frame['requests'].tolist() == [3, 2]
+    assert frame['errors'].tolist() == [1, 1]
+    assert frame['dropped'].tolist() == [0, 1]
+    assert timeline(list()).empty
+
+@pytest.mark.parametrize('kwargs, message', [
+    (dict(), 'exactly one'),
+    (dict(rps=1, concurrency=1), 'exactly one'),
+    (dict(rps=0), 'must be positive'),
+    (dict(concurrency=0), 'must be positive'),
+    (dict(rps=1, max_inflight=0), 'max_inflight'),
+])
+def test_load_test_rejects_bad_arguments(kwargs, message):
+    with pytest.raises(ValueError, match=message):
+        load_test('http://127.0.0.1:9', [('s', dict())], 0.1, **kwargs)
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        self.rfile.read(int(self.headers['Content-Length']))
+        time.sleep(0.05)
+        self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server_url():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_address[1]}/'
+    server.shutdown()
+    server.server_close()
+
+def test_open_model_drops_at_the_inflight_limit(server_url):
+    samples = load_test(server_url, [('s', {'a': 1})], 0.3, rps=50, max_inflight=1)
+    summary = summarize_samples(samples, 0.3)
+    assert summary['requests'] >= 1 and summary['dropped'] >= 1
+    assert summary['errors'] == 0
+
+def test_closed_model_sends_back_to_back(server_url):
+    progress = list()
+    samples = load_test(
+        server_url, [('a', dict()), ('b', dict())], 0.3, concurrency=2,
+        on_progress=lambda summary, _: progress.append(summary)
+    )
+    assert {s['scenario'] for s in samples} == {'a', 'b'}
+    assert all(s['status_code'] == 200 for s in samples)
+    assert progress[-1]['requests'] == len(samples)
@@ -0,0 +1,49 @@
+# tests/test_search.py
+
+from src.search import SearchIndex, fold, tokenize
+
+def _index(docs: dict) -> SearchIndex:
+    index = SearchIndex()
+    for generation, (name, text) in enumerate(docs.items(), start=1):
+        index._add(name, generation, text)
+    index.terms = sorted(index.postings)
+    return index
+
+def test_fold_and_tokenize_ignore_case_and_accents():
+    assert fold('Miércoles ÑANDÚ') == 'miercoles nandu'
+    assert tokenize('Lunes: 9:00, miércoles.') == ['lunes', '9', '00', 'miercoles']
+
+def test_search_matches_prefixes_of_every_token():
+    index = _index({
+        'prompts/a.py': 'Agenda una reunión\nel miércoles',
+        'prompts/b.py': 'Reuniones virtuales',
+        'client_data/c.txt': 'sin coincidencias',
+    })
+    assert [r['name'] for r in index.search('reunion')] == ['prompts/a.py', 'prompts/b.py']
+    assert [r['name'] for r in index.search('REUNI miérc')] == ['prompts/a.py']
+    assert index.search('reunion jueves') == []
+    assert index.search('  ,. ') == []
+
+def test_search_ranks_and_snippets():
+    index = _index({
+        'a.py': 'hola\nhola mundo\nadiós',
+        'b.py': 'hola',
+    })
+    results = index.search('hola')
+    assert [r['name'] for r in results] == ['a.py', 'b.py']
+    assert results[0]['snippets'] == [(1, 'hola'), (2, 'hola mundo')]
+    assert index.search('hola mundo')[0]['snippets'][0] == (2, 'hola mundo')
+    assert len(index.search('hola', limit=1)) == 1
+
+def test_remove_drops_postings():
+    index = _index({'a.py': 'uno dos', 'b.py': 'dos'})
+    index._remove('a.py')
+    index._remove('missing.py')
+    assert 'uno' not in index.postings
+    assert set(index.postings['dos']) == {'b.py'}
+    assert index.stats() == {'documents': 1, 'terms': 1, 'lines': 1}
+
+def test_expand_uses_the_sorted_term_list():
+    index = _index({'a.py': 'casa casco cosa'})
+    assert index._expand('cas') == ['casa', 'casco']
+    assert index._expand('z') == []
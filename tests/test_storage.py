@@ -0,0 +1,83 @@
+# tests/test_storage.py
+
+import pytest
+
+from src.storage import (
+    LocalBackend,
+    MemoryBackend,
+    NotFound,
+    PreconditionFailed,
+    StorageError,
+    md5_b64
+)
+
+BUCKET = 'bkt'
+
+@pytest.fixture(params=['memory', 'filesystem'])
+def backend(request, tmp_path):
+    if request.param == 'memory':
+        return MemoryBackend()
+    return LocalBackend(str(tmp_path))
+
+def test_round_trip_and_metadata(backend):
+    info = backend.upload(BUCKET, 'prompts/a.py', b'X = 1\n', 'text/x-python')
+    assert (info.name, info.size, info.md5_hash) == ('prompts/a.py', 6, md5_b64(b'X = 1\n'))
+    assert backend.download(BUCKET, 'prompts/a.py') == (b'X = 1\n', info.generation)
+    assert backend.stat(BUCKET, 'prompts/a.py').generation == info.generation
+    assert backend.stat(BUCKET, 'prompts/missing.py') is None
+    with pytest.raises(NotFound):
+        backend.download(BUCKET, 'prompts/missing.py')
+
+def test_generation_preconditions(backend):
+    first = backend.upload(BUCKET, 'a.json', b'1', 'application/json', if_generation_match=0)
+    with pytest.raises(PreconditionFailed):
+        backend.upload(BUCKET, 'a.json', b'2', 'application/json', if_generation_match=0)
+    second = backend.upload(
+        BUCKET, 'a.json', b'2', 'application/json', if_generation_match=first.generation
+    )
+    assert second.generation > first.generation
+    with pytest.raises(PreconditionFailed):
+        backend.upload(
+            BUCKET, 'a.json', b'3', 'application/json', if_generation_match=first.generation
+        )
+    with pytest.raises(PreconditionFailed):
+        backend.download(BUCKET, 'a.json', if_generation_match=first.generation)
+    assert backend.download(BUCKET, 'a.json', if_generation_match=second.generation)[0] == b'2'
+
+def test_delete(backend):
+    info = backend.upload(BUCKET, 'a.txt', b'a', 'text/plain')
+    with pytest.raises(PreconditionFailed):
+        backend.delete(BUCKET, 'a.txt', if_generation_match=info.generation + 1)
+    backend.delete(BUCKET, 'a.txt', if_generation_match=info.generation)
+    assert backend.stat(BUCKET, 'a.txt') is None
+    with pytest.raises(NotFound):
+        backend.delete(BUCKET, 'a.txt')
+
+def test_listing(backend):
+    for name in ['p/b.py', 'p/a.py', 'p/notes.txt', 'p/sub/c.py', 'p/sub/deep/d.py', 'q/e.py']:
+        backend.upload(BUCKET, name, b'', 'text/plain')
+    backend.upload('other', 'p/x.py', b'', 'text/plain')
+
+    names = [info.name for info in backend.iter_blobs(BUCKET, 'p/', '.py')]
+    assert names == ['p/a.py', 'p/b.py', 'p/sub/c.py', 'p/sub/deep/d.py']
+    folders, files = backend.list_dir(BUCKET, 'p/', '.py')
+    assert folders == ['p/sub/']
+    assert [info.name for info in files] == ['p/a.py', 'p/b.py']
+    assert backend.list_dir(BUCKET, 'missing/') == ([], [])
+
+def test_local_backend_rejects_escaping_names(tmp_path):
+    backend = LocalBackend(str(tmp_path))
+    with pytest.raises(StorageError):
+        backend.upload(BUCKET, '../other/a.txt', b'', 'text/plain')
+
+def test_local_backend_md5_follows_external_edits(tmp_path):
+    backend = LocalBackend(str(tmp_path))
+    backend.upload(BUCKET, 'a.txt', b'old', 'text/plain')
+    (tmp_path / BUCKET / 'a.txt').write_bytes(b'edited')
+    assert backend.stat(BUCKET, 'a.txt').md5_hash == md5_b64(b'edited')
+
+def test_memory_backend_seeds_from_a_directory(tmp_path):
+    LocalBackend(str(tmp_path)).upload(BUCKET, 'p/a.py', b'X = 1', 'text/x-python')
+    backend = MemoryBackend(str(tmp_path))
+    assert backend.download(BUCKET, 'p/a.py')[0] == b'X = 1'
+    assert backend.stats()['blobs'] == 1
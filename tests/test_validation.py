@@ -0,0 +1,55 @@
+# tests/test_validation.py
+
+from src.validation import validate_source, has_errors, KIND_PROMPT, KIND_CLIENT, ERROR, WARNING
+
+CLIENT = '''
+CLIENT_CONFIG = {
+    "description": "Agencia",
+    "calendar_rules": "Horario: 9 a 18",
+}
+'''
+
+def _messages(source: str, kind: str) -> list[tuple[int, str, str]]:
+    return [(i.line, i.severity, i.message) for i in validate_source(source, kind)]
+
+def test_valid_client_has_no_issues():
+    assert validate_source(CLIENT, KIND_CLIENT) == ()
+
+def test_syntax_errors_carry_the_line():
+    issues = validate_source('x = 1\ny = (\n', KIND_PROMPT)
+    assert has_errors(issues) and issues[0].line == 2
+
+def test_null_bytes_are_reported_not_raised():
+    assert has_errors(validate_source('x = 1\0', KIND_PROMPT))
+
+def test_client_errors_come_from_the_client_parser():
+    assert _messages('', KIND_CLIENT) == [(1, ERROR, '`CLIENT_CONFIG` is not defined')]
+    assert _messages('CLIENT_CONFIG: dict\n', KIND_CLIENT) == [
+        (1, ERROR, '`CLIENT_CONFIG` is not defined')
+    ]
+    assert _messages('CLIENT_CONFIG = {"description": 1}', KIND_CLIENT) == [
+        (1, ERROR, '`CLIENT_CONFIG` must map strings to strings')
+    ]
+    assert _messages('CLIENT_CONFIG = {"description": "d"}', KIND_CLIENT) == [
+        (1, ERROR, "missing required key 'calendar_rules'")
+    ]
+
+def test_client_warnings():
+    source = CLIENT.replace('"Agencia"', '"[Agregar descripción]"').replace(
+        '"calendar_rules": "Horario: 9 a 18",', '"calendar_rules": "",\n    "description": "x",'
+    )
+    assert _messages(source, KIND_CLIENT) == [
+        (3, WARNING, '"description" still has template text'),
+        (4, WARNING, '"calendar_rules" is empty'),
+        (5, WARNING, 'Duplicate key "description" (overrides line 3)'),
+    ]
+
+def test_prompt_checks():
+    source = '"""Doc."""\nPROMPT = "a"\nprint(PROMPT)\nPROMPT = "b"\n'
+    assert _messages(source, KIND_PROMPT) == [
+        (3, WARNING, 'Top-level `Expr` statement runs on import'),
+        (4, WARNING, '`PROMPT` is reassigned (overrides line 2)'),
+    ]
+    assert _messages('import os\n', KIND_PROMPT) == [
+        (1, WARNING, 'No top-level prompt variables are defined')
+    ]